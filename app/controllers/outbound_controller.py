@@ -2,12 +2,15 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog
 from pathlib import Path
-import json
-from collections import defaultdict
 import datetime
-from services.xsd_parser import XsdParser
+import time
+from concurrent.futures import ThreadPoolExecutor
 from services.xml_builder import XmlBuilder
-from domain.validation.xsd_validator import XsdValidator
+from services.schema_registry import schema_registry
+from services.schema_prewarmer import schema_prewarmer
+from domain.validation.xsd_validator import format_issues
+from domain.rules.rule_compiler import compile_rule_set, load_compiled_rules
+from domain.rules.rule_engine import build_form_model
 from infra import config
 from infra.logger import get_logger
 from app.views.widgets.dynamic_form import DynamicForm
@@ -17,6 +20,9 @@ from services.preset_manager import PresetManager
 
 log = get_logger(__name__)
 
+# Co ile ms sprawdzać, czy model formularza budowany w tle jest gotowy.
+MODEL_POLL_MS = 20
+
 class OutboundController:
     def __init__(self, view, status_bar):
         self.view = view
@@ -26,10 +32,16 @@ class OutboundController:
         self.preset_manager = PresetManager()
         self.xsd_parser = None
         self.xsd_validator = None
+        self.schema_name = None
         self.form_sections_definitions = None
+        self._build_pending = False
+        # Numer bieżącego budowania - model z anulowanego (lub zastąpionego) budowania jest odrzucany.
+        self._build_generation = 0
+        self._model_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="form-model")
         
         self.current_message_code = None
         self.rules = {}
+        self.rule_set = None
 
         self._setup_process_selection()
         self._bind_events()
@@ -127,95 +139,153 @@ class OutboundController:
         try:
             process_info = config.SUPPORTED_PROCESSES[self.view.process_combobox.get()]
             message_info = process_info["messages"][self.view.message_type_combobox.get()]
-            xsd_path = config.XSD_OUTBOUND_DIR / message_info["xsd_file"]
+
+            if not schema_prewarmer.is_ready(message_info["xsd_file"]):
+                if not self._build_pending:
+                    self._build_pending = True
+                    self.status_bar.config(text=f"Oczekiwanie na wczytanie schematu '{message_info['xsd_file']}'...")
+                    schema_prewarmer.run_when_ready(self.view, message_info["xsd_file"], self._on_pending_schema_ready)
+                return
             
-            self.rules = {}
+            self.rule_set = compile_rule_set({})
             rules_dir_name = message_info.get("rules_dir_name")
             if rules_dir_name:
                 rules_path = config.MESSAGE_RULES_DIR / rules_dir_name / f"{selected_rule_set}.json"
                 if rules_path.exists():
-                    with open(rules_path, 'r', encoding='utf-8') as f:
-                        self.rules = json.load(f).get("rules", {})
-                    log.info(f"Pomyślnie załadowano {len(self.rules)} reguł z pliku {rules_path.name}")
+                    self.rule_set = load_compiled_rules(rules_path)
+                    log.info(f"Pomyślnie załadowano {len(self.rule_set)} reguł z pliku {rules_path.name}")
                 else:
                     log.warning(f"Plik reguł '{rules_path.name}' nie istnieje.")
+            self.rules = self.rule_set.rules
             
-            self.xsd_parser = XsdParser(str(xsd_path))
-            self.xsd_validator = XsdValidator(self.xsd_parser.schema)
+            schema_entry = schema_registry.acquire(message_info["xsd_file"])
+            if self.schema_name:
+                schema_registry.release(self.schema_name)
+            self.schema_name = message_info["xsd_file"]
+            self.xsd_parser = schema_entry.parser
+            self.xsd_validator = schema_entry.validator
             
-            element_to_parse = list(self.xsd_parser.schema.elements.keys())[0]
+            element_to_parse = self.xsd_parser.get_root_element_name()
             self.form_sections_definitions = self.xsd_parser.get_form_structure_for_element(element_to_parse)
             
-            if self.dynamic_form: self.dynamic_form.destroy()
-            
+            if self.dynamic_form:
+                old_form, self.dynamic_form = self.dynamic_form, None
+                old_form.destroy()
+
+            if config.FORM_INCREMENTAL_BUILD:
+                self._start_incremental_build(process_info, message_info, selected_rule_set)
+                return
+
             self.dynamic_form = DynamicForm(
                 self.view.form_container, 
                 self.form_sections_definitions, 
-                rules=self.rules, 
+                rules=self.rule_set, 
                 process_info=process_info, 
                 message_info=message_info
             )
             self.dynamic_form.pack(fill="both", expand=True, padx=5, pady=5)
-
-            timestamp = datetime.datetime.now().replace(microsecond=0).isoformat()
-            self.dynamic_form.set_field_value_by_name("MessageTimestamp", timestamp)
-            log.info(f"Automatycznie ustawiono MessageTimestamp w formularzu: {timestamp}")
-            
-            self._load_and_display_presets()
-            
-            self.status_bar.config(text=f"Zbudowano formularz dla '{self.view.message_type_combobox.get()}' używając reguł '{selected_rule_set}'.")
+            self._on_form_built(selected_rule_set)
         except Exception as e:
             log.error(f"Błąd podczas budowania formularza: {e}", exc_info=True)
             messagebox.showerror("Błąd budowania formularza", f"Wystąpił nieoczekiwany błąd:\n\n{e}")
 
-    def _build_dependency_hierarchy(self):
-        log.info("Rozpoczynanie budowania hierarchii zależności...")
-        all_fields = set(self.dynamic_form.fields_by_path.keys())
-        dependencies = defaultdict(set)
-        dependents = defaultdict(set)
-        
-        for target_path, rule_definitions in self.rules.items():
-            for rule in rule_definitions.values():
-                condition = rule.get("condition")
-                if not condition: continue
-                
-                conditions = condition.get("conditions", [condition])
-                for cond in conditions:
-                    if "field_path" in cond:
-                        trigger_path = cond["field_path"]
-                        if trigger_path in all_fields:
-                            dependencies[target_path].add(trigger_path)
-                            dependents[trigger_path].add(target_path)
-                            
-        levels = []
-        in_degree = {field: 0 for field in all_fields}
-        for target_path, deps in dependencies.items():
-            if target_path in in_degree:
-                in_degree[target_path] = len(deps)
-        
-        queue = [field for field, degree in in_degree.items() if degree == 0]
+    def _on_form_built(self, selected_rule_set, details=""):
+        timestamp = datetime.datetime.now().replace(microsecond=0).isoformat()
+        self.dynamic_form.set_field_value_by_name("MessageTimestamp", timestamp)
+        log.info(f"Automatycznie ustawiono MessageTimestamp w formularzu: {timestamp}")
         
-        while queue:
-            levels.append(queue)
-            next_queue = []
-            for u in sorted(queue):
-                for v in sorted(list(dependents[u])):
-                    if v in in_degree:
-                        in_degree[v] -= 1
-                        if in_degree[v] == 0:
-                            next_queue.append(v)
-            queue = sorted(next_queue)
+        self._load_and_display_presets()
         
-        remaining_nodes = {node: degree for node, degree in in_degree.items() if degree > 0}
-        if remaining_nodes:
-            log.error(f"Wykryto cykl w zależnościach reguł! Pola, których nie można było umieścić w hierarchii: {remaining_nodes}")
-            log.error("--- DIAGNOSTYKA CYKLU ---")
-            for node in remaining_nodes:
-                log.error(f"  -> Pole '{node}' nadal czeka na: {dependencies.get(node)}")
-            log.error("--------------------------")
-            return None
+        self.status_bar.config(text=f"Zbudowano formularz dla '{self.view.message_type_combobox.get()}' używając reguł '{selected_rule_set}'.{details}")
 
-        return levels
+    def _start_incremental_build(self, process_info, message_info, selected_rule_set):
+        """
+        Tryb przyrostowy: model formularza (stan, reguły, graf zależności) powstaje w wątku roboczym,
+        a widgety - porcjami między zdarzeniami Tk. Pasek statusu pokazuje postęp, a przycisk
+        budowania służy w tym czasie do anulowania.
+        """
+        started_at = time.perf_counter()
+        self._build_generation += 1
+        generation = self._build_generation
+        future = self._model_executor.submit(build_form_model, self.form_sections_definitions, self.rule_set, process_info, message_info)
+        self._set_building(True)
+        self.status_bar.config(text="Budowanie modelu formularza...")
+
+        def poll_model():
+            if generation != self._build_generation: return
+            if not future.done():
+                self.view.after(MODEL_POLL_MS, poll_model)
+                return
+            try:
+                model = future.result()
+            except Exception as e:
+                self._set_building(False)
+                log.error(f"Błąd podczas budowania modelu formularza: {e}", exc_info=True)
+                messagebox.showerror("Błąd budowania formularza", f"Wystąpił nieoczekiwany błąd:\n\n{e}")
+                return
+
+            form = DynamicForm(
+                self.view.form_container,
+                self.form_sections_definitions,
+                process_info=process_info,
+                message_info=message_info,
+                model=model
+            )
+            self.dynamic_form = form
+            form.pack(fill="both", expand=True, padx=5, pady=5)
+            form.build_incrementally(
+                config.FORM_BUILD_CHUNK_MS,
+                on_progress=self._on_build_progress,
+                on_done=lambda metrics: self._on_incremental_build_done(form, model, metrics, selected_rule_set),
+                started_at=started_at
+            )
+
+        poll_model()
+
+    def _on_build_progress(self, completed, expected):
+        percent = completed * 100 // expected if expected else 100
+        self.status_bar.config(text=f"Budowanie formularza... {percent}% ({completed}/{expected} sekcji)")
+
+    def _on_incremental_build_done(self, form, model, metrics, selected_rule_set):
+        if form is not self.dynamic_form: return
+        self._set_building(False)
+        if metrics.cancelled:
+            self.dynamic_form = None
+            form.destroy()
+            self._load_and_display_presets()
+            self.status_bar.config(text="Anulowano budowanie formularza.")
+            return
+
+        first_field = f"{metrics.first_field * 1000:.0f} ms" if metrics.first_field is not None else "-"
+        log.info(f"Metryki budowania formularza: model {model.build_time * 1000:.1f} ms, pierwsze interaktywne pole po {first_field}, "
+                 f"całość {metrics.total * 1000:.1f} ms ({metrics.tasks} sekcji, {metrics.chunks} porcji).")
+        self._on_form_built(selected_rule_set, f" Pierwsze pole po {first_field}, całość {metrics.total * 1000:.0f} ms.")
+
+    def cancel_form_build(self):
+        self._build_generation += 1
+        if self.dynamic_form is not None and self.dynamic_form.build is not None and self.dynamic_form.build.running:
+            self.dynamic_form.build.cancel()
+        else:
+            # Anulowanie na etapie budowania modelu - wynik z wątku roboczego zostanie odrzucony.
+            self._set_building(False)
+            self.status_bar.config(text="Anulowano budowanie formularza.")
+        log.info("Użytkownik anulował budowanie formularza.")
+
+    def _set_building(self, is_building):
+        """Na czas budowania przycisk budowania anuluje je, a akcje na formularzu są niedostępne."""
+        if is_building:
+            self.view.build_form_button.config(text="Anuluj budowanie", command=self.cancel_form_build)
+        else:
+            self.view.build_form_button.config(text="Zbuduj formularz", command=self.build_form_from_selection)
+        action_state = "disabled" if is_building else "normal"
+        for button in (self.view.populate_button, self.view.generate_button, self.view.save_button):
+            button.config(state=action_state)
+        if is_building:
+            self.view.preset_combobox.config(state="disabled")
+
+    def _on_pending_schema_ready(self):
+        self._build_pending = False
+        self.build_form_from_selection()
 
     def populate_with_test_data(self):
         if not self.dynamic_form:
@@ -226,14 +296,15 @@ class OutboundController:
         reset_address_generation_state()
         
         self.dynamic_form.clear_generated_data(self.rules)
-        self.dynamic_form.rule_engine.apply_all_rules()
+        self.dynamic_form.apply_all_rules()
         
-        hierarchy = self._build_dependency_hierarchy()
-        if hierarchy is None:
+        graph = self.dynamic_form.rule_engine.dependency_graph()
+        if graph.has_cycles:
+             graph.log_cycle_report()
              messagebox.showerror("Błąd krytyczny", "Wykryto cykl w regułach zależności. Sprawdź pliki JSON z regułami i logi aplikacji.")
              return
              
-        self.dynamic_form.populate_with_data(generate_valid_data, self.rules, hierarchy)
+        self.dynamic_form.populate_with_data(generate_valid_data, self.rules, graph.levels)
         
     def generate_xml(self):
         if not self.dynamic_form or not self.xsd_parser:
@@ -252,39 +323,23 @@ class OutboundController:
                 form_data[root_key]["Header"]["MessageTimestamp"] = timestamp
                 log.info(f"Automatycznie wstawiono/nadpisano MessageTimestamp: {timestamp}")
 
-            nsmap = self.xsd_parser.schema.namespaces.copy()
-            if '' in nsmap:
-                nsmap[None] = nsmap.pop('')
-            if 'xs' in nsmap:
-                del nsmap['xs']
-            
-            qname_map = {}
-            def build_map_recursively(sections):
-                for section in sections:
-                    qname_map[section.name] = section.qname
-                    for field in section.fields:
-                        qname_map[field.name] = field.qname
-                    build_map_recursively(section.sub_sections)
-            
             root_element_name = list(form_data.keys())[0]
-            root_qname = self.xsd_parser.schema.elements[root_element_name].name
-            qname_map[root_element_name] = root_qname
-            build_map_recursively(self.form_sections_definitions)
-            
-            xml_string = self.xml_builder.build(form_data, qname_map, nsmap)
+            bindings = self.xsd_parser.get_xml_bindings(root_element_name)
+            xml_string = self.xml_builder.build(form_data, bindings)
             
             self.view.xml_viewer.show_xml(xml_string)
             
             if not self.xsd_validator:
                 raise Exception("Walidator XSD nie został zainicjalizowany.")
 
-            is_valid_xsd, error_message = self.xsd_validator.validate(xml_string)
+            is_valid_xsd, issues = self.xsd_validator.validate_all(xml_string)
             
             if is_valid_xsd:
                 self.status_bar.config(text="Pomyślnie wygenerowano i zwalidowano XML.")
             else:
-                self.status_bar.config(text="Błąd walidacji XSD. Sprawdź szczegóły w oknie błędu.")
-                messagebox.showerror("Błąd walidacji XSD", f"Wygenerowany XML nie jest zgodny ze schematem:\n\n{error_message}")
+                highlighted = self.dynamic_form.show_schema_errors(issues)
+                self.status_bar.config(text=f"Błąd walidacji XSD ({len(issues)} błędów, podświetlono {highlighted} pól). Sprawdź szczegóły w oknie błędu.")
+                messagebox.showerror("Błąd walidacji XSD", f"Wygenerowany XML nie jest zgodny ze schematem:\n\n{format_issues(issues)}")
 
         except Exception as e:
             log.error(f"Błąd podczas generowania XML: {e}", exc_info=True)
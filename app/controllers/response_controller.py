@@ -2,16 +2,16 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from pathlib import Path
-import json
 import datetime
 from typing import Optional
-from collections import defaultdict
 
 from infra import config
 from infra.logger import get_logger
-from services.xsd_parser import XsdParser
 from services.xml_builder import XmlBuilder
-from domain.validation.xsd_validator import XsdValidator
+from services.schema_registry import schema_registry
+from services.schema_prewarmer import schema_prewarmer
+from domain.validation.xsd_validator import format_issues
+from domain.rules.rule_compiler import compile_rule_set, load_compiled_rules
 from app.views.widgets.dynamic_form import DynamicForm
 from infra.file_handler import read_file, write_file
 from services.converters import extract_ids_from_json_envelope
@@ -30,17 +30,20 @@ class ResponseController:
         self.xsd_validator = None
         self.dynamic_form = None
         self.rules = {}
+        self.rule_set = None
 
-        self._setup_dynamic_form()
+        # Formularz R_1 jest budowany dopiero, gdy schemat zostanie wczytany w tle.
+        schema_prewarmer.run_when_ready(self.view, "Response_R1", self._setup_dynamic_form)
         self._bind_events()
 
     def _setup_dynamic_form(self):
         try:
             log.info(f"Próba załadowania schematu odpowiedzi R_1 z: {config.XSD_RESPONSE_R1_PATH}")
 
-            self.xsd_parser = XsdParser(config.XSD_RESPONSE_R1_PATH)
-            self.xsd_validator = XsdValidator(self.xsd_parser.schema)
-            self.root_element_name = list(self.xsd_parser.schema.elements.keys())[0]
+            schema_entry = schema_registry.acquire("Response_R1")
+            self.xsd_parser = schema_entry.parser
+            self.xsd_validator = schema_entry.validator
+            self.root_element_name = self.xsd_parser.get_root_element_name()
             self.form_sections = self.xsd_parser.get_form_structure_for_element(self.root_element_name)
             
             self.dynamic_form = DynamicForm(self.view.form_container, self.form_sections, rules={}, process_info={}, message_info={})
@@ -73,16 +76,16 @@ class ResponseController:
 
         rules_path = config.MESSAGE_RULES_DIR / rules_file_to_load
         if rules_path.exists():
-            with open(rules_path, 'r', encoding='utf-8') as f:
-                self.rules = json.load(f).get("rules", {})
-            log.info(f"Pomyślnie załadowano {len(self.rules)} reguł z pliku {rules_file_to_load}.")
+            self.rule_set = load_compiled_rules(rules_path)
+            log.info(f"Pomyślnie załadowano {len(self.rule_set)} reguł z pliku {rules_file_to_load}.")
         else:
-            self.rules = {}
+            self.rule_set = compile_rule_set({})
             log.error(f"Plik reguł '{rules_path}' nie został znaleziony!")
+        self.rules = self.rule_set.rules
 
         if self.dynamic_form:
-            self.dynamic_form.rule_engine.update_rules(self.rules)
-            self.dynamic_form.rule_engine.apply_all_rules()
+            self.dynamic_form.rule_engine.update_rules(self.rule_set)
+            self.dynamic_form.apply_all_rules()
             log.debug("Zaktualizowano i przeładowano reguły w silniku formularza.")
 
     def _bind_events(self):
@@ -117,51 +120,6 @@ class ResponseController:
             log.error(f"Nie udało się przetworzyć importowanego pliku JSON: {file_path_str}", exc_info=True)
             messagebox.showerror("Błąd importu", f"Błąd przetwarzania pliku JSON:\n\n{e}")
 
-    def _build_dependency_hierarchy(self):
-        log.info("Rozpoczynanie budowania hierarchii zależności dla odpowiedzi...")
-        if not self.dynamic_form:
-            log.error("Nie można zbudować hierarchii - formularz dynamiczny nie istnieje.")
-            return None
-
-        all_fields = set(self.dynamic_form.fields_by_path.keys())
-        dependencies = defaultdict(set)
-        dependents = defaultdict(set)
-        
-        for target_path, rule_definitions in self.rules.items():
-            for rule in rule_definitions.values():
-                condition = rule.get("condition")
-                if not condition: continue
-                
-                conditions_to_check = condition.get("conditions", [condition])
-                for cond in conditions_to_check:
-                    if "field_path" in cond:
-                        trigger_path = cond["field_path"]
-                        if trigger_path in all_fields:
-                            dependencies[target_path].add(trigger_path)
-                            dependents[trigger_path].add(target_path)
-                            
-        levels = []
-        in_degree = {field: len(dependencies.get(field, [])) for field in all_fields}
-        queue = [field for field, degree in in_degree.items() if degree == 0]
-        
-        while queue:
-            levels.append(sorted(queue))
-            next_queue = []
-            for u in sorted(queue):
-                for v in sorted(list(dependents.get(u, []))):
-                    if v in in_degree:
-                        in_degree[v] -= 1
-                        if in_degree[v] == 0:
-                            next_queue.append(v)
-            queue = next_queue
-        
-        remaining_nodes = {node for node, degree in in_degree.items() if degree > 0}
-        if remaining_nodes:
-            log.error(f"Wykryto cykl w zależnościach reguł! Pola, których nie można było umieścić w hierarchii: {remaining_nodes}")
-            return None
-
-        return levels
-
     def populate_with_test_data(self):
         from services.data_generators import generate_valid_data, reset_address_generation_state
         
@@ -173,14 +131,15 @@ class ResponseController:
         reset_address_generation_state()
         
         self.dynamic_form.clear_generated_data(self.rules)
-        self.dynamic_form.rule_engine.apply_all_rules()
+        self.dynamic_form.apply_all_rules()
         
-        hierarchy = self._build_dependency_hierarchy()
-        if hierarchy is None:
+        graph = self.dynamic_form.rule_engine.dependency_graph()
+        if graph.has_cycles:
+             graph.log_cycle_report()
              messagebox.showerror("Błąd krytyczny", "Wykryto cykl w regułach zależności. Sprawdź pliki JSON z regułami i logi aplikacji.")
              return
 
-        self.dynamic_form.populate_with_data(generate_valid_data, self.rules, hierarchy)
+        self.dynamic_form.populate_with_data(generate_valid_data, self.rules, graph.levels)
         
         self.status_bar.config(text="Wypełniono formularz odpowiedzi danymi testowymi.")
 
@@ -199,37 +158,22 @@ class ResponseController:
                 form_data[root_key]["Header"]["MessageTimestamp"] = timestamp
                 log.info(f"Automatycznie wstawiono/nadpisano MessageTimestamp: {timestamp}")
 
-            nsmap = self.xsd_parser.schema.namespaces.copy()
-            if '' in nsmap:
-                nsmap[None] = nsmap.pop('')
-            if 'xs' in nsmap:
-                del nsmap['xs']
-
-            qname_map = {}
-            def build_map_recursively(sections):
-                for section in sections:
-                    qname_map[section.name] = section.qname
-                    for field in section.fields:
-                        qname_map[field.name] = field.qname
-                    build_map_recursively(section.sub_sections)
-            
-            qname_map[self.root_element_name] = self.xsd_parser.schema.elements[self.root_element_name].name
-            build_map_recursively(self.form_sections)
-            
-            xml_string = self.xml_builder.build(form_data, qname_map, nsmap)
+            bindings = self.xsd_parser.get_xml_bindings(self.root_element_name)
+            xml_string = self.xml_builder.build(form_data, bindings)
             
             self.view.xml_viewer.show_xml(xml_string)
             
             if not self.xsd_validator:
                 raise Exception("Walidator XSD nie został zainicjalizowany.")
             
-            is_valid_xsd, error_message = self.xsd_validator.validate(xml_string)
+            is_valid_xsd, issues = self.xsd_validator.validate_all(xml_string)
             
             if is_valid_xsd:
                 self.status_bar.config(text="Komunikat R_1 wygenerowany i zwalidowany pomyślnie.")
             else:
-                self.status_bar.config(text="Błąd walidacji XSD dla R_1.")
-                messagebox.showerror("Błąd walidacji XSD", f"Wygenerowany XML nie jest zgodny ze schematem R_1:\n\n{error_message}")
+                highlighted = self.dynamic_form.show_schema_errors(issues)
+                self.status_bar.config(text=f"Błąd walidacji XSD dla R_1 ({len(issues)} błędów, podświetlono {highlighted} pól).")
+                messagebox.showerror("Błąd walidacji XSD", f"Wygenerowany XML nie jest zgodny ze schematem R_1:\n\n{format_issues(issues)}")
                 
         except Exception as e:
             log.error("Błąd podczas budowania XML dla R_1 przez XmlBuilder", exc_info=True)
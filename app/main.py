@@ -13,10 +13,25 @@ log = get_logger(__name__)
 from app.views.main_window import MainWindow
 from app.controllers.response_controller import ResponseController
 from app.controllers.outbound_controller import OutboundController
+from services.schema_prewarmer import schema_prewarmer
+
+
+def show_prewarm_progress(root, status_bar, last_done=-1):
+    """Cyklicznie pokazuje na pasku statusu postęp wstępnego ładowania schematów XSD."""
+    done, total = schema_prewarmer.get_progress()
+    if done < total:
+        if done != last_done:
+            status_bar.config(text=f"Wczytywanie schematów XSD w tle... ({done}/{total})")
+        root.after(200, show_prewarm_progress, root, status_bar, done)
+    elif total:
+        status_bar.config(text=f"Schematy XSD gotowe ({done}/{total}).")
 
 if __name__ == "__main__":
     log.info(f"Uruchamianie aplikacji {config.APP_NAME}...")
     try:
+        if config.SCHEMA_PREWARM_ENABLED:
+            schema_prewarmer.start()
+
         root = tk.Tk()
         root.title(config.APP_NAME)
         root.geometry(config.DEFAULT_GEOMETRY)
@@ -27,11 +42,14 @@ if __name__ == "__main__":
         # Utwórz kontrolery, przekazując im odpowiednie widoki i pasek statusu
         response_controller = ResponseController(app_view.response_frame, app_view.status_bar)
         outbound_controller = OutboundController(app_view.outbound_frame, app_view.status_bar)
+        show_prewarm_progress(root, app_view.status_bar)
 
         log.info("Aplikacja została pomyślnie zainicjowana. Uruchamianie pętli głównej.")
         root.mainloop()
 
     except Exception as e:
         log.critical("Wystąpił nieobsługiwany błąd krytyczny. Aplikacja zostanie zamknięta.", exc_info=True)
-    
+    finally:
+        schema_prewarmer.shutdown()
+
     log.info(f"Aplikacja {config.APP_NAME} została zamknięta.")
\ No newline at end of file
@@ -3,10 +3,15 @@
 import tkinter as tk
 from tkinter import ttk
 from collections import defaultdict
+from contextlib import contextmanager
 from infra.logger import get_logger
-from .dynamic_form_components.rule_engine import RuleEngine, FormElement
+from domain.rules.form_state import FormState
+from domain.rules.rule_compiler import as_rule_set
+from domain.rules.rule_engine import RuleEngine, controlled_section_paths
+from .dynamic_form_components.form_state_view import FormStateView, FormElement
 from .dynamic_form_components.form_renderer import FormRenderer
 from .dynamic_form_components.form_data_handler import FormDataHandler
+from .dynamic_form_components.widget_store import WidgetValueStore
 from typing import Dict, Any
 
 log = get_logger(__name__)
@@ -14,27 +19,62 @@ log = get_logger(__name__)
 class DynamicForm(ttk.Frame):
     """
     Klasa-Fasada koordynująca pracę wyspecjalizowanych komponentów formularza.
+
+    Bez `model` formularz jest renderowany i przeliczany regułami od razu w konstruktorze.
+    Z gotowym modelem (build_form_model, np. z wątku roboczego) widgety powstają dopiero
+    w build_incrementally() - porcjami, od razu w stanie wynikającym z reguł.
     """
-    def __init__(self, master, form_sections_definitions, rules=None, process_info=None, message_info=None, *args, **kwargs):
+    def __init__(self, master, form_sections_definitions, rules=None, process_info=None, message_info=None, model=None, *args, **kwargs):
         super().__init__(master, *args, **kwargs)
 
         self.form_sections_definitions = form_sections_definitions
-        self.rules = rules or {}
+        rule_set = as_rule_set(rules) if model is None else model.engine.rule_set
+        self.rules = rule_set.rules
         self.process_info = process_info or {}
         self.message_info = message_info or {}
 
         self.fields_by_path = self._flatten_fields(form_sections_definitions)
         self.rendered_sections = defaultdict(list)
         self.widget_groups = defaultdict(list)
+        # Indeks ścieżka pola -> listy widgetów kolejnych instancji sekcji (utrzymywany przez FormRenderer).
+        self.field_widgets = defaultdict(list)
+        # Indeks odwrotny: nazwa widgetu Tk -> WidgetEntry (pole, instancja sekcji, numer widgetu).
+        self.widget_index = {}
+        # Wartości, stany i widoczność instancji pól po stronie Pythona - odczyty bez wywołań Tcl.
+        self.widget_store = WidgetValueStore()
+
+        self._batch_depth = 0
+        self.build = None
 
         self._setup_styles_and_canvas()
 
+        # Stan formularza i reguły działają bez Tk; widok tylko obserwuje stan (FormStateView).
+        if model is not None:
+            self.form_state, self.rule_engine = model.state, model.engine
+        else:
+            self.form_state = FormState(form_sections_definitions, controlled_section_paths(rule_set))
+            self.rule_engine = RuleEngine(self.form_state, rule_set, self.process_info, self.message_info)
+        # Zestaw wyspecjalizowany dla uprawnień, z którym renderujemy - elementy trwale ukryte nie mają widgetów.
+        self.rule_set = self.rule_engine.rule_set
+
         self.data_handler = FormDataHandler(self)
-        self.rule_engine = RuleEngine(self, self.rules, self.process_info, self.message_info)
+        self.state_view = FormStateView(self)
         self.renderer = FormRenderer(self, self.rules)
 
-        self.renderer.render()
-        self.rule_engine.apply_all_rules()
+        if model is None:
+            self.renderer.render()
+            self.apply_all_rules()
+
+    def build_incrementally(self, chunk_ms: int, on_progress=None, on_done=None, started_at=None):
+        """Tworzy widgety formularza zbudowanego z modelu porcjami po `chunk_ms` ms. Zwraca IncrementalBuild (cancel())."""
+        self.build = self.renderer.render_incrementally(chunk_ms, on_progress, on_done, started_at)
+        return self.build
+
+    def destroy(self):
+        if self.build is not None:
+            self.build.cancel()
+        self.unbind_class(self.scroll_tag, "<MouseWheel>")
+        super().destroy()
 
     def _flatten_fields(self, sections):
         flat_map = {}
@@ -65,8 +105,11 @@ class DynamicForm(ttk.Frame):
         self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
         self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
         
-        self.canvas.bind("<MouseWheel>", self._on_mouse_wheel)
-        self.scrollable_frame.bind("<MouseWheel>", self._on_mouse_wheel)
+        # Jeden znacznik bindtags na formularz: obsługa kółka myszy jest wiązana raz (bind_class),
+        # a każdy nowy widget dostaje tylko znacznik (route_scroll) - bez przeglądania drzew widgetów.
+        self.scroll_tag = f"DynamicFormScroll{id(self)}"
+        self.bind_class(self.scroll_tag, "<MouseWheel>", self._on_mouse_wheel)
+        self.route_scroll(self.canvas, self.scrollable_frame)
 
 
     def _on_mouse_wheel(self, event):
@@ -74,21 +117,62 @@ class DynamicForm(ttk.Frame):
         self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
         return "break"
 
-    def bind_scroll_recursively(self, widget):
-        """Rekurencyjnie przypisuje handler przewijania do widgetu i wszystkich jego potomków."""
-        widget.bind("<MouseWheel>", self._on_mouse_wheel)
-        for child in widget.winfo_children():
-            self.bind_scroll_recursively(child)
+    def route_scroll(self, *widgets):
+        """
+        Kieruje kółko myszy z widgetów do przewijania formularza: znacznik formularza trafia do bindtags
+        widgetu tuż za jego własnym, przed znacznikiem klasy, więc "break" z obsługi nadal blokuje
+        domyślne zachowanie klasy (np. zmianę wartości Combobox). Koszt stały na widget.
+        """
+        for widget in widgets:
+            tags = widget.bindtags()
+            widget.bindtags((tags[0], self.scroll_tag) + tags[1:])
+
+    @property
+    def in_batch(self) -> bool:
+        return self._batch_depth > 0
+
+    @contextmanager
+    def batch(self):
+        """
+        Paczka zmian GUI: zmiany widoczności, dostępności, etykiet i list opcji wynikające z reguł
+        są odkładane i scalane (pole przełączone kilka razy dostaje tylko stan końcowy), a po wyjściu
+        z najbardziej zewnętrznej paczki stosowane w jednym przebiegu z jednym update_idletasks().
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            if self._batch_depth == 1:
+                # Stosowanie zmian wciąż w paczce - przełączane sekcje nie wymuszają własnych odświeżeń.
+                applied = self.state_view.flush()
+                log.debug(f"Zastosowano {applied} scalonych zmian GUI z paczki.")
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.update_idletasks()
+
+    def request_idle_update(self):
+        """update_idletasks() od razu albo - w paczce zmian - raz, przy jej zamknięciu."""
+        if not self.in_batch:
+            self.update_idletasks()
+
+    def apply_all_rules(self):
+        with self.batch():
+            self.rule_engine.apply_all_rules()
 
     def populate_with_data(self, data_generator_func, rules=None, hierarchy=None):
-        self.data_handler.populate_with_data(data_generator_func, rules, hierarchy)
+        with self.batch():
+            self.data_handler.populate_with_data(data_generator_func, rules, hierarchy)
 
     def populate_from_dict(self, data: dict):
-        self.data_handler.populate_from_dict(data)
+        with self.batch():
+            self.data_handler.populate_from_dict(data)
 
     def get_values(self):
         return self.data_handler.get_values()
 
+    def show_schema_errors(self, issues) -> int:
+        return self.data_handler.show_schema_errors(issues)
+
     def clear_form(self):
         self.data_handler.clear_form()
 
@@ -100,28 +184,20 @@ class DynamicForm(ttk.Frame):
         self.data_handler.set_field_value_by_name(field_name, value)
 
     def get_widget_by_path(self, path: str):
-        for key, widgets in self.widget_groups.items():
-            base_key = key.split('[')[0]
-            if base_key == path and widgets:
+        for widgets in self.field_widgets.get(path, ()):
+            if widgets:
                 return widgets[0]
         log.warning(f"Nie udało się znaleźć widgetu dla ścieżki '{path}'")
         return None
 
     def get_elements_by_path(self, path: str):
-        elements = []
-        log.debug(f"GET_ELEMENTS: Szukam elementów dla ścieżki '{path}'.")
-        
-        if path in self.rendered_sections:
-            log.debug(f"GET_ELEMENTS: Znaleziono pasującą sekcję w `rendered_sections`. Liczba instancji: {len(self.rendered_sections[path])}")
-            elements.extend([FormElement(inst, self) for inst in self.rendered_sections[path]])
+        elements = [FormElement(inst, self) for inst in self.rendered_sections.get(path, ())]
 
-        for key, widgets in self.widget_groups.items():
-            base_key = key.split('[')[0]
-            if base_key == path:
-                log.debug(f"GET_ELEMENTS: Znaleziono pasujące widgety w `widget_groups` dla klucza '{key}'. Liczba: {len(widgets)}")
-                field_def = self.fields_by_path.get(base_key)
-                elements.extend([FormElement(w, self, field_def) for w in widgets])
+        instance_widgets = self.field_widgets.get(path)
+        if instance_widgets:
+            field_def = self.fields_by_path.get(path)
+            elements.extend(FormElement(w, self, field_def) for widgets in instance_widgets for w in widgets)
 
         if not elements:
-            log.warning(f"GET_ELEMENTS: Nie znaleziono ŻADNYCH elementów dla ścieżki '{path}'")
-        return elements
\ No newline at end of file
+            log.debug(f"GET_ELEMENTS: Brak elementów dla ścieżki '{path}' (sekcja jeszcze nierenderowana).")
+        return elements
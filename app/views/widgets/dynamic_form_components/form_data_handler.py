@@ -1,126 +1,103 @@
 # csire_message_studio/app/views/widgets/dynamic_form_components/form_data_handler.py
 
-import tkinter as tk
 from tkinter import ttk
 from infra.logger import get_logger
+from domain.rules.form_state import FillWorklist
+from .form_state_view import combobox_values
+from services.field_validators import validate_field_value
 from typing import List, Optional, Dict, Any
 
 log = get_logger(__name__)
 
+# Ile razy najwyżej wracamy do jednego pola podczas generowania danych (ochrona przed cyklami reguł).
+MAX_FILL_VISITS = 10
+
 class FormDataHandler:
     """Odpowiada za wszystkie operacje na danych formularza (wypełnianie, walidacja, zbieranie)."""
 
     def __init__(self, form_facade):
         self.form = form_facade
         self.validation_errors = set()
+        self._schema_error_targets = []
 
     def _set_widget_value_no_trigger(self, widget, value, *, caller: str) -> bool:
         """
         Bezpiecznie ustawia wartość widgetu bez wywoływania zdarzeń walidacji/reguł.
+        Wartość i stan widgetu czyta z magazynu (WidgetValueStore), zapis idzie przez zmienną widgetu.
         """
-        widget_name = f"'{widget.winfo_name()}' ({widget.winfo_class()})"
+        store = self.form.widget_store
+        widget_name = f"'{widget}' ({type(widget).__name__})"
         safe_value = value if value is not None else ""
 
-        if widget.get() == safe_value:
+        if not store.exists(widget):
+            log.warning(f"[SET_VALUE] Widget {widget_name} nie istnieje w magazynie widgetów. Pomijam zapis.")
+            return False
+
+        if store.value(widget) == safe_value:
             log.debug(f"[SET_VALUE] Wartość w {widget_name} jest już poprawna ('{safe_value}'). Pomijam zapis.")
             return False
 
-        original_state = str(widget.cget('state'))
-        temporarily_enabled = False
-        
+        if not store.is_enabled(widget):
+            privileged_callers = ('rule_engine_set_value', 'rule_engine_import', 'unconditional_clear', 'rule_engine_generation')
+            if caller not in privileged_callers:
+                log.warning(f"[SET_VALUE] ZABLOKOWANO zapis do wyłączonego widgetu {widget_name} przez '{caller}'.")
+                return False
+            log.debug(f"[SET_VALUE] {widget_name} jest wyłączony. Zapis przez zmienną widgetu na żądanie '{caller}'.")
+
         try:
-            if original_state == 'disabled':
-                privileged_callers = ('rule_engine_set_value', 'rule_engine_import', 'unconditional_clear', 'rule_engine_generation')
-                if caller in privileged_callers:
-                    log.debug(f"[SET_VALUE] {widget_name} jest wyłączony. Tymczasowe włączenie przez '{caller}'.")
-                    widget.config(state='normal')
-                    temporarily_enabled = True
-                else:
-                    log.warning(f"[SET_VALUE] ZABLOKOWANO zapis do wyłączonego widgetu {widget_name} przez '{caller}'.")
-                    return False
-            
             log.debug(f"[SET_VALUE] Ustawianie wartości '{safe_value}' w {widget_name}.")
-            if isinstance(widget, ttk.Combobox):
-                widget.set(safe_value)
-            else:
-                widget.delete(0, tk.END)
-                widget.insert(0, safe_value)
-            
-            return True
-
+            return store.set_value(widget, safe_value)
         except Exception:
             log.error(f"[SET_VALUE] Błąd podczas ustawiania wartości w {widget_name}.", exc_info=True)
             return False
-        finally:
-            if temporarily_enabled:
-                log.debug(f"[SET_VALUE] Przywracanie stanu 'disabled' dla {widget_name}.")
-                widget.config(state='disabled')
 
     def populate_with_data(self, data_generator_func, rules: Dict, hierarchy: List[List[str]]):
         """
-        Wypełnia formularz danymi w sposób hybrydowy: najpierw deterministycznie wg hierarchii,
-        a następnie iteracyjnie, aby uzupełnić pola ujawnione dynamicznie.
+        Wypełnia formularz danymi: najpierw pola w kolejności hierarchii zależności, potem pozostałe,
+        a następnie tylko pola, które reguły ujawniły, odblokowały lub wyczyściły po kolejnych zapisach
+        (kolejka FillWorklist zasilana zmianami stanu formularza).
+
+        Działa w paczce zmian GUI (DynamicForm.batch), więc o tym, czy pole można wypełnić, decyduje
+        stan formularza, a nie - jeszcze nieodświeżony - stan widgetu.
         """
-        log.info("Rozpoczynanie hybrydowego generowania danych.")
-        self.form.update_idletasks()
+        log.info("Rozpoczynanie generowania danych.")
 
-        # Faza 1: Przebieg deterministyczny oparty na grafie zależności
-        log.info("==> Faza 1: Przebieg deterministyczny...")
-        for level, field_paths in enumerate(hierarchy):
-            log.debug(f"  -> Przetwarzanie poziomu {level+1}/{len(hierarchy)} hierarchii...")
-            for field_path in field_paths:
-                field_def = self.form.fields_by_path.get(field_path)
-                if not field_def: continue
-
-                widgets_to_fill = []
-                for key, widgets in self.form.widget_groups.items():
-                    if key.startswith(field_path):
-                        widgets_to_fill.extend(widgets)
-                
-                for widget in widgets_to_fill:
-                    if widget.winfo_exists() and str(widget.cget('state')) != 'disabled' and not widget.get():
-                        available_choices = widget['values'] if isinstance(widget, ttk.Combobox) else None
-                        value = data_generator_func(field_def, rules, available_choices)
-                        
-                        if value is not None:
-                            self.set_value_and_trigger_dependencies(widget, value, caller="populate_with_data_deterministic")
-
-        # Faza 2: Iteracyjne uzupełnianie pól, które stały się widoczne
-        log.info("==> Faza 2: Iteracyjne uzupełnianie (mop-up)...")
-        MAX_MOP_UP_LOOPS = 10
-        mop_up_loops = 0
-        while mop_up_loops < MAX_MOP_UP_LOOPS:
-            mop_up_loops += 1
-            filled_in_this_pass = 0
-            log.debug(f"  -> Pętla uzupełniająca nr {mop_up_loops}")
-
-            for field_path, field_def in self.form.fields_by_path.items():
-                widgets_to_check = []
-                for key, widgets in self.form.widget_groups.items():
-                    if key.startswith(field_path):
-                        widgets_to_check.extend(widgets)
-                
-                for widget in widgets_to_check:
-                    if widget.winfo_exists() and str(widget.cget('state')) != 'disabled' and not widget.get():
-                        available_choices = widget['values'] if isinstance(widget, ttk.Combobox) else None
-                        value = data_generator_func(field_def, rules, available_choices)
-                        
-                        if value is not None:
-                            self.set_value_and_trigger_dependencies(widget, value, caller="populate_with_data_mopup")
-                            filled_in_this_pass += 1
-            
-            if filled_in_this_pass == 0:
-                log.info(f"  -> Formularz stabilny. Zakończono fazę uzupełniającą po {mop_up_loops} pętlach.")
-                break
-            else:
-                log.info(f"  -> W pętli {mop_up_loops} wypełniono {filled_in_this_pass} pól. Kontynuuję...")
-                self.form.update_idletasks() # Pozwól UI zareagować na zmiany
-        
-        if mop_up_loops >= MAX_MOP_UP_LOOPS:
-            log.warning("Przekroczono maksymalną liczbę pętli uzupełniających. Przerywam, aby uniknąć zawieszenia.")
+        ordered_paths = [path for level in (hierarchy or []) for path in level]
+        ordered_paths.extend(self.form.fields_by_path)
+        filled = 0
+        with FillWorklist(self.form.form_state, ordered_paths, MAX_FILL_VISITS) as worklist:
+            for field_path in worklist:
+                filled += self._fill_empty_widgets(field_path, data_generator_func, rules)
 
-        log.info("Zakończono generowanie danych.")
-        self.form.update_idletasks()
+        if worklist.exhausted:
+            log.warning(f"Przekroczono maksymalną liczbę odwiedzin pól {sorted(worklist.exhausted)}. Przerywam, aby uniknąć zawieszenia.")
+        log.info(f"Zakończono generowanie danych. Wypełniono {filled} pól w {sum(worklist.visits.values())} odwiedzinach.")
+
+    def _fill_empty_widgets(self, field_path, data_generator_func, rules) -> int:
+        field_def = self.form.fields_by_path.get(field_path)
+        if not field_def or not self.form.form_state.is_editable(field_path): return 0
+
+        filled = 0
+        choices = self.form.form_state.fields[field_path].choices
+        if field_path not in self.form.field_widgets:
+            # Sekcja czeka na (leniwe) renderowanie - wartość trafia do modelu, widget dostanie ją przy tworzeniu.
+            if self.form.form_state.get_value(field_path): return 0
+            value = data_generator_func(field_def, rules, choices)
+            if value is None: return 0
+            self.form.rule_engine.set_value(field_path, value)
+            return 1
+
+        for widgets in list(self.form.field_widgets.get(field_path, ())):
+            for widget in list(widgets):
+                if self.form.widget_store.exists(widget) and not self.form.widget_store.value(widget):
+                    available_choices = combobox_values(field_def, choices) if isinstance(widget, ttk.Combobox) else None
+                    value = data_generator_func(field_def, rules, available_choices)
+
+                    if value is not None:
+                        # Widget może czekać na odblokowanie w paczce zmian - stan formularza już na to pozwala.
+                        self.set_value_and_trigger_dependencies(widget, value, caller="rule_engine_generation")
+                        filled += 1
+        return filled
 
     def populate_from_dict(self, data: dict):
         log.info("Rozpoczynanie wypełniania formularza z presetu.")
@@ -129,6 +106,7 @@ class FormDataHandler:
         def populate_recursive(data_level, section_defs_level, parent_tk, parent_instance, depth):
             for section_def in section_defs_level:
                 if section_def.name not in data_level: continue
+                if section_def.path in self.form.rule_set.hidden_paths: continue
 
                 section_data = data_level[section_def.name]
                 instances_data = section_data if isinstance(section_data, list) else [section_data]
@@ -145,7 +123,8 @@ class FormDataHandler:
                     for field_def in instance_ui['section_def'].fields:
                         if field_def.name in instance_data_dict:
                             field_values = instance_data_dict[field_def.name]
-                            widgets = instance_ui['widgets'][field_def.path]
+                            widgets = instance_ui['widgets'].get(field_def.path)
+                            if not widgets: continue
                             
                             if isinstance(field_values, list):
                                 for w, val in zip(widgets, field_values):
@@ -158,12 +137,15 @@ class FormDataHandler:
         
         populate_recursive(data, self.form.form_sections_definitions, self.form.scrollable_frame, None, 0)
         self.form.rule_engine.apply_all_rules()
+        self.form.renderer.pool.log_stats()
         log.info("Zakończono wypełnianie formularza z presetu.")
 
     def get_values(self):
+        self.clear_schema_errors()
         self.validation_errors.clear()
         first_invalid_widget = None
-        
+        store = self.form.widget_store
+
         def validate_recursively(sections):
             nonlocal first_invalid_widget
             for section_def in sections:
@@ -171,8 +153,8 @@ class FormDataHandler:
                     if not instance['check_var'].get(): continue
                     for field_def in section_def.fields:
                         for widget in instance['widgets'].get(field_def.path, []):
-                            if widget.winfo_exists() and widget.cget('state') != 'disabled':
-                                if not self._validate_entry(widget.get(), widget.winfo_name()):
+                            if store.is_enabled(widget) and store.is_visible(widget):
+                                if not self._validate_entry(store.value(widget), str(widget)):
                                     if first_invalid_widget is None:
                                         first_invalid_widget = widget
                     validate_recursively(section_def.sub_sections)
@@ -187,21 +169,97 @@ class FormDataHandler:
         data = self._collect_data()
         return data, True
 
+    def show_schema_errors(self, issues) -> int:
+        """
+        Podświetla w formularzu wszystkie błędy walidacji XSD (ValidationIssue) naraz.
+
+        Błąd pola trafia do etykiety błędu widgetu, a błąd sekcji do nagłówka jej instancji.
+        Ścieżki nieznane formularzowi są przypisywane najbliższej znanej sekcji nadrzędnej,
+        a błędy instancji, których formularz nie ma, nagłówkowi najbliższej istniejącej instancji.
+        Zwraca liczbę podświetlonych elementów.
+        """
+        self.clear_schema_errors()
+        first_widget = None
+        for issue in issues:
+            path = issue.field_path
+            while path and path not in self.form.fields_by_path and path not in self.form.rendered_sections:
+                path = path.rpartition('.')[0]
+            if not path:
+                continue
+
+            is_field = path in self.form.fields_by_path
+            section_path = path.rpartition('.')[0] if is_field else path
+            instance, is_exact = self._find_issue_instance(section_path, issue.instance_path)
+            if instance is None:
+                continue
+
+            if is_field and is_exact:
+                widgets = instance['widgets'].get(path, [])
+                if not widgets:
+                    continue
+                widget = widgets[min(issue.value_index, len(widgets) - 1)]
+                self._schema_error_targets.append((widget.error_label, ""))
+                widget.error_label.config(text=issue.message)
+                first_widget = first_widget or widget
+            else:
+                header_label = instance['header_label']
+                original_text = header_label.cget('text')
+                self._schema_error_targets.append((header_label, original_text))
+                header_label.config(text=f"{original_text}  ⚠ {issue.message}", foreground="red")
+
+        if first_widget is not None:
+            first_widget.focus_set()
+        log.info(f"Podświetlono {len(self._schema_error_targets)} elementów z błędami walidacji XSD.")
+        return len(self._schema_error_targets)
+
+    def _find_issue_instance(self, section_path, instance_path):
+        """
+        Przechodzi od sekcji najwyższego poziomu do `section_path`, wybierając na każdym poziomie
+        instancję o numerze z `instance_path` wśród aktywnych instancji w instancji rodzica
+        (jak w _collect_data). Zwraca (instancja, czy_dokładnie): gdy numeru nie ma w formularzu,
+        zwraca ostatnią znalezioną instancję nadrzędną.
+        """
+        names = section_path.split('.')
+        instance, resolved_path = None, None
+        for depth, index in enumerate(instance_path[:len(names) - 1]):
+            level_path = '.'.join(names[:depth + 2])
+            if level_path not in self.form.rendered_sections:
+                continue  # Element bez własnej sekcji w formularzu - instancja rodzica bez zmian.
+            candidates = self._active_instances(level_path, instance)
+            if index >= len(candidates):
+                return instance, False
+            instance, resolved_path = candidates[index], level_path
+        return instance, resolved_path == section_path
+
+    def _active_instances(self, section_path, parent_instance):
+        """Aktywne instancje sekcji należące do instancji rodzica, w kolejności zapisu do dokumentu."""
+        return [i for i in self.form.rendered_sections.get(section_path, [])
+                if i['parent_instance'] is parent_instance and i['check_var'].get()]
+
+    def clear_schema_errors(self):
+        # Przy kilku błędach tego samego elementu przywracamy tekst w odwrotnej kolejności.
+        for target, original_text in reversed(self._schema_error_targets):
+            if target.winfo_exists():
+                target.config(text=original_text)
+                if original_text:
+                    target.config(foreground="")
+        self._schema_error_targets.clear()
+
     def _collect_data(self) -> Dict[str, Any]:
-        """Zbiera dane z aktywnych pól formularza do zagnieżdżonego słownika."""
-        def collect_recursively(parent_dict, sections_definitions):
+        """Zbiera dane z aktywnych pól formularza do zagnieżdżonego słownika (wartości z magazynu widgetów)."""
+        store = self.form.widget_store
+
+        def collect_recursively(parent_dict, sections_definitions, parent_instance):
             for section_def in sections_definitions:
                 active_instances_data = []
-                for instance in self.form.rendered_sections.get(section_def.path, []):
-                    if not instance['check_var'].get(): continue
-                    
+                for instance in self._active_instances(section_def.path, parent_instance):
                     instance_data = {}
                     for field_def in section_def.fields:
-                        values = [w.get() for w in instance['widgets'].get(field_def.path, []) if w.get() and w.cget('state') != 'disabled']
+                        values = [store.value(w) for w in instance['widgets'].get(field_def.path, []) if store.value(w) and store.is_enabled(w)]
                         if values:
                             instance_data[field_def.name] = values if field_def.is_list else values[0]
                     
-                    collect_recursively(instance_data, section_def.sub_sections)
+                    collect_recursively(instance_data, section_def.sub_sections, instance)
                     
                     if instance_data: active_instances_data.append(instance_data)
                 
@@ -212,7 +270,7 @@ class FormDataHandler:
         
         root_name = self.form.form_sections_definitions[0].path.split('.')[0]
         data = {root_name: {}}
-        collect_recursively(data[root_name], self.form.form_sections_definitions)
+        collect_recursively(data[root_name], self.form.form_sections_definitions, None)
         return data
 
     def clear_form(self):
@@ -231,6 +289,7 @@ class FormDataHandler:
                 for field_path, widgets in instance['widgets'].items():
                     if widgets:
                        self._set_widget_value_no_trigger(widgets[0], "", caller="unconditional_clear")
+        self.form.state_view.pull_all_values()
         log.info("Formularz został wyczyszczony.")
 
     def clear_generated_data(self, rules: Dict[str, Any]):
@@ -240,9 +299,10 @@ class FormDataHandler:
         log.info("Inteligentne czyszczenie danych (pola zablokowane nie będą czyszczone)...")
         for widgets in self.form.widget_groups.values():
             for widget in widgets:
-                if widget.winfo_exists() and str(widget.cget('state')) != 'disabled':
+                if self.form.widget_store.is_enabled(widget):
                     self._set_widget_value_no_trigger(widget, "", caller="unconditional_clear")
                     
+        self.form.state_view.pull_all_values(keep_locked_unrendered=True)
         log.info("Zakończono czyszczenie danych generowanych.")
         self.form.update_idletasks()
 
@@ -258,40 +318,39 @@ class FormDataHandler:
                             return
         log.warning(f"Nie znaleziono aktywnego pola o nazwie '{field_name}'.")
 
+    def on_field_edited(self, field_path: str):
+        """Zmiana wartości pola w GUI: aktualizuje stan formularza i uruchamia zależne reguły (jedną paczką zmian GUI)."""
+        with self.form.batch():
+            self.form.state_view.pull_value(field_path)
+            self.form.rule_engine.evaluate_rules_for_trigger(field_path)
+
     def set_value_and_trigger_dependencies(self, widget, value, caller="set_value_and_trigger"):
         if self._set_widget_value_no_trigger(widget, value, caller=caller):
             field_def = self._get_field_def_for_widget(widget)
             if field_def:
                 log.debug(f"Uruchamianie reguł zależnych od '{field_def.path}' po zmianie wartości.")
-                self.form.rule_engine.evaluate_rules_for_trigger(field_def.path)
-                # Dajemy szansę UI na odświeżenie się po zmianie wartości
-                self.form.update_idletasks()
+                self.on_field_edited(field_def.path)
+                # Dajemy szansę UI na odświeżenie się po zmianie wartości (w paczce zmian - raz, na końcu)
+                self.form.request_idle_update()
 
     def _get_field_def_for_widget(self, widget) -> Optional[Any]:
-        for path, widgets in self.form.widget_groups.items():
-            if widget in widgets:
-                return self.form.fields_by_path.get(path.split('[')[0])
-        return None
+        entry = self.form.widget_index.get(str(widget))
+        return entry.field_def if entry else None
 
     def _validate_entry(self, value, widget_name) -> bool:
-        try:
-            widget = self.form.nametowidget(widget_name)
-        except KeyError:
+        entry = self.form.widget_index.get(widget_name)
+        if entry is None:
             self.validation_errors.discard(widget_name)
             return True
-            
-        field_def = self._get_field_def_for_widget(widget)
-        if not field_def: return True
+        widget, field_def = entry.widget, entry.field_def
         
         is_valid, error_message = True, ""
-        if field_def.is_required and not value:
+        if self.form.form_state.fields[field_def.path].required and not value:
             is_valid, error_message = False, "Pole jest wymagane."
         elif value:
-            try:
-                if field_def.xsd_type_obj:
-                    field_def.xsd_type_obj.validate(value)
-            except Exception as e:
-                is_valid, error_message = False, str(e).splitlines()[0]
+            error = validate_field_value(field_def, value)
+            if error:
+                is_valid, error_message = False, error
                 
         if hasattr(widget, 'error_label'):
             widget.error_label.config(text=error_message if not is_valid else "")
@@ -1,10 +1,119 @@
 # csire_message_studio/app/views/widgets/dynamic_form_components/form_renderer.py
+import time
 import tkinter as tk
 from tkinter import ttk
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from infra import config
 from infra.logger import get_logger
+from domain.rules.rule_engine import controlled_section_paths
+from .section_pool import SectionInstancePool
 
 log = get_logger(__name__)
 
+
+class WidgetEntry(NamedTuple):
+    """Wpis indeksu odwrotnego widget -> pole: definicja pola, instancja sekcji i numer widgetu w polu listowym."""
+    widget: Any
+    field_def: Any
+    instance: Dict[str, Any]
+    index: int
+
+
+class BuildMetrics(NamedTuple):
+    """Czasy przyrostowego budowania formularza liczone od `started_at` (np. kliknięcia "Zbuduj formularz")."""
+    first_field: Optional[float]
+    total: float
+    chunks: int
+    tasks: int
+    cancelled: bool
+
+
+class IncrementalBuild:
+    """
+    Przyrostowe tworzenie widgetów formularza. Zadaniem jest wyrenderowanie jednej definicji sekcji
+    (jej instancji i pól); podsekcje wyrenderowanej instancji trafiają na stos jako kolejne zadania,
+    więc kolejność jest taka jak w render() - w głąb, w kolejności schematu.
+
+    Porcja wykonuje zadania do wyczerpania budżetu czasu, po czym oddaje sterowanie pętli zdarzeń Tk
+    (after), dzięki czemu okno odświeża się, pasek postępu działa, a użytkownik może anulować budowanie.
+    """
+    def __init__(self, renderer, chunk_ms: int, on_progress: Optional[Callable[[int, int], None]] = None,
+                 on_done: Optional[Callable[[BuildMetrics], None]] = None, started_at: Optional[float] = None):
+        self.renderer = renderer
+        self.form = renderer.form
+        self.chunk_seconds = chunk_ms / 1000
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.tasks: List[tuple] = []
+        self.expected = 0
+        self.completed = 0
+        self.chunks = 0
+        self.first_field_at: Optional[float] = None
+        self.metrics: Optional[BuildMetrics] = None
+        self._after_id = None
+
+    @property
+    def running(self) -> bool:
+        return self.metrics is None
+
+    def start(self) -> "IncrementalBuild":
+        sections = self.form.form_sections_definitions
+        self.expected = self.renderer._count_tasks(sections)
+        self.tasks = [(self.form.scrollable_frame, section_def, 0, None) for section_def in reversed(sections)]
+        self.renderer._deferred = self.tasks
+        log.info(f"Rozpoczynanie przyrostowego renderowania formularza ({self.expected} sekcji, porcje po {self.chunk_seconds * 1000:.0f} ms)...")
+        self._after_id = self.form.after_idle(self._run_chunk)
+        return self
+
+    def cancel(self) -> None:
+        if not self.running: return
+        if self._after_id is not None:
+            self.form.after_cancel(self._after_id)
+            self._after_id = None
+        log.info(f"Anulowano przyrostowe renderowanie formularza po {self.completed}/{self.expected} sekcjach.")
+        self._finish(cancelled=True)
+
+    def _run_chunk(self) -> None:
+        self._after_id = None
+        deadline = time.perf_counter() + self.chunk_seconds
+        self.chunks += 1
+        with self.form.batch():
+            while self.tasks and time.perf_counter() < deadline:
+                self._render_task(*self.tasks.pop())
+        # Paczka zakończyła się update_idletasks() - utworzone widgety są już na ekranie.
+        if self.first_field_at is None and self.form.field_widgets:
+            self.first_field_at = time.perf_counter()
+        if self.on_progress:
+            self.on_progress(self.completed, max(self.expected, self.completed))
+        if self.tasks:
+            self._after_id = self.form.after(1, self._run_chunk)
+        else:
+            self._finish(cancelled=False)
+
+    def _render_task(self, parent_widget, section_def, depth, parent_instance) -> None:
+        self.completed += 1
+        if not parent_widget.winfo_exists(): return
+        self.renderer._render_section_recursively(parent_widget, section_def, depth, parent_instance)
+        # Instancja rodzica wyłączona w trakcie budowania - nowe pola dziedziczą jej blokadę.
+        if parent_instance is not None and not parent_instance['check_var'].get():
+            self.renderer._set_children_state_disabled(parent_widget)
+
+    def _finish(self, cancelled: bool) -> None:
+        self.tasks.clear()
+        self.renderer._deferred = None
+        if not cancelled:
+            with self.form.batch():
+                self.form.state_view.sync_sections()
+        now = time.perf_counter()
+        first_field = self.first_field_at - self.started_at if self.first_field_at is not None else None
+        self.metrics = BuildMetrics(first_field, now - self.started_at, self.chunks, self.completed, cancelled)
+        if not cancelled:
+            log.info(f"Zakończono przyrostowe renderowanie formularza: {self.completed} sekcji w {self.chunks} porcjach.")
+        if self.on_done:
+            self.on_done(self.metrics)
+
+
 class FormRenderer:
     """Odpowiada za budowanie interfejsu graficznego formularza."""
 
@@ -13,15 +122,15 @@ class FormRenderer:
         self.rules = rules
         self.vcmd = (self.form.register(self.form.data_handler._validate_entry), '%P', '%W')
         self.list_control_vars = {} 
+        self._controlled_paths = controlled_section_paths(rules)
+        # Stos zadań przyrostowego budowania; None - podsekcje są renderowane od razu (rekurencyjnie).
+        self._deferred: Optional[List[tuple]] = None
+        # Odłączone instancje sekcji powtarzalnych do ponownego użycia zamiast niszczenia i tworzenia od nowa.
+        self.pool = SectionInstancePool(config.FORM_INSTANCE_POOL_PER_SECTION, config.FORM_INSTANCE_POOL_MAX)
 
     def _is_controlled_by_rule(self, section_path: str) -> bool:
         """Sprawdza, czy sekcja jest kontrolowana przez regułę widoczności lub wymagalności."""
-        if section_path in self.rules:
-            for rule_definitions in self.rules[section_path].values():
-                action = rule_definitions.get("action", "")
-                if action in ("show_if_value", "require_if_value", "forbid_if_value", "hide"):
-                    return True
-        return False
+        return section_path in self._controlled_paths
 
     def render(self):
         log.info("Rozpoczynanie renderowania formularza dynamicznego...")
@@ -29,7 +138,27 @@ class FormRenderer:
             self._render_section_recursively(self.form.scrollable_frame, section_def, 0, None)
         log.info("Zakończono renderowanie formularza dynamicznego.")
 
+    def render_incrementally(self, chunk_ms: int, on_progress=None, on_done=None, started_at=None) -> IncrementalBuild:
+        """Renderuje formularz porcjami (zob. IncrementalBuild). Stan formularza musi mieć już zastosowane reguły."""
+        return IncrementalBuild(self, chunk_ms, on_progress, on_done, started_at).start()
+
+    def _count_tasks(self, section_defs) -> int:
+        """Liczba zadań (definicji sekcji do wyrenderowania), które wykona budowanie formularza w bieżącym stanie."""
+        total = 0
+        for section_def in section_defs:
+            if section_def.path in self.form.rule_set.hidden_paths: continue
+            total += 1
+            is_controlled = self._is_controlled_by_rule(section_def.path)
+            if is_controlled and not self.form.form_state.is_section_active(section_def.path): continue
+            instances = 1 if is_controlled or section_def.min_occurs == 0 else section_def.min_occurs
+            total += instances * self._count_tasks(section_def.sub_sections)
+        return total
+
     def _render_section_recursively(self, parent_widget, section_def, depth, parent_instance):
+        if section_def.path in self.form.rule_set.hidden_paths:
+            log.debug(f"[RENDER] Pomijam sekcję '{section_def.path}' - trwale ukryta przez reguły.")
+            return
+
         is_controlled = self._is_controlled_by_rule(section_def.path)
         is_optional = section_def.min_occurs == 0
 
@@ -54,72 +183,141 @@ class FormRenderer:
                     for instance in list(self.form.rendered_sections.get(section_def.path, [])):
                         self._remove_section_instance(instance, update_buttons=False)
                     instance_container.pack_forget()
+                self.form.state_view.pull_section(section_def.path)
 
             check_var.trace_add("write", toggle_visibility)
+            if parent_instance is not None:
+                # Ramki nagłówka należą do instancji rodzica - przy jej odłożeniu do puli są niszczone.
+                parent_instance['sub_frames'].extend((header_frame, instance_container))
+            self.form.route_scroll(header_frame, check, instance_container)
             self.add_section_instance(instance_container, section_def, 0, True, parent_instance, header_frame=header_frame)
-            self.form.bind_scroll_recursively(header_frame)
 
         else:
             num_to_render = section_def.min_occurs if not is_controlled else 1
-            is_initially_enabled = not is_controlled
+            # Sekcja kontrolowana regułą startuje nieaktywna, chyba że reguły już ją pokazały
+            # (renderowanie podsekcji w leniwie budowanej instancji rodzica).
+            is_initially_enabled = not is_controlled or self.form.form_state.is_section_active(section_def.path)
 
             for _ in range(num_to_render):
                 self.add_section_instance(parent_widget, section_def, depth, is_initially_enabled, parent_instance)
 
     def add_section_instance(self, parent_widget, section_def, depth, is_initially_enabled, parent_instance, after_instance=None, header_frame=None):
         instance_idx = len(self.form.rendered_sections.get(section_def.path, []))
-        log.debug(f"[RENDER] Tworzenie instancji {instance_idx} dla sekcji '{section_def.path}'")
-        
-        container = ttk.Frame(parent_widget, style="Section.TFrame")
-
         is_optional_list = section_def.min_occurs == 0 and not self._is_controlled_by_rule(section_def.path)
-        if not is_optional_list:
-             container.config(padding=(depth * 20, 5, 0, 5))
+
+        instance_data = self.pool.acquire(parent_widget, section_def.path) if header_frame is None else None
+        if instance_data is not None:
+            log.debug(f"[RENDER] Ponowne użycie instancji z puli jako instancji {instance_idx} sekcji '{section_def.path}'")
+            self._reset_instance(instance_data, instance_idx, is_initially_enabled)
+            container = instance_data['container']
+        else:
+            log.debug(f"[RENDER] Tworzenie instancji {instance_idx} dla sekcji '{section_def.path}'")
+            instance_data = self._create_instance(parent_widget, section_def, depth, is_initially_enabled, parent_instance, header_frame, instance_idx)
+            container = instance_data['container']
 
         if after_instance:
             container.pack(fill=tk.X, anchor="n", after=after_instance['container'])
         else:
             container.pack(fill=tk.X, anchor="n")
 
+        # Zawartość (pola i podsekcje) nieaktywnej instancji powstaje dopiero przy jej pierwszym włączeniu.
+        if instance_data['content_rendered']:
+            self._restore_instance_content(instance_data)
+        elif is_initially_enabled:
+            self._render_instance_content(instance_data)
+            
+        self.form.rendered_sections[section_def.path].append(instance_data)
+        if not is_optional_list:
+            instance_data['check_var'].trace_add("write", lambda *args, i=instance_data: self._toggle_section_state(i))
+        
+        self._toggle_section_state(instance_data, is_initial_call=True)
+
+    def _create_instance(self, parent_widget, section_def, depth, is_initially_enabled, parent_instance, header_frame, instance_idx):
+        container = ttk.Frame(parent_widget, style="Section.TFrame")
+
+        is_optional_list = section_def.min_occurs == 0 and not self._is_controlled_by_rule(section_def.path)
+        if not is_optional_list:
+             container.config(padding=(depth * 20, 5, 0, 5))
+
         header = ttk.Frame(container, style="Header.TFrame")
         header.pack(fill=tk.X)
         content = ttk.Labelframe(container, style="Content.TLabelframe", padding=10)
         check_var = tk.BooleanVar(value=is_initially_enabled)
-        is_list = section_def.max_occurs is None or section_def.max_occurs > 1
-        
-        label_text = section_def.name
-        if is_list and not is_optional_list:
-            label_text = f"{section_def.name} [{instance_idx + 1}]"
 
-        ttk.Label(header, text=label_text, style="Section.TLabel").pack(side=tk.LEFT)
+        header_label = ttk.Label(header, text=self._instance_label(section_def, instance_idx), style="Section.TLabel")
+        header_label.pack(side=tk.LEFT)
 
+        section_state = self.form.form_state.sections.get(section_def.path)
         instance_data = {
             'container': container, 'content': content, 'check_var': check_var,
             'widgets': {}, 'section_def': section_def, 'parent_instance': parent_instance,
-            'add_button': None, 'remove_button': None, '_allow_multiple': True,
-            'header_frame': header_frame
+            'add_button': None, 'remove_button': None,
+            '_allow_multiple': section_state.allow_multiple if section_state else True,
+            'header_frame': header_frame, 'header_label': header_label,
+            'depth': depth, 'index': instance_idx, 'content_rendered': False, 'sub_frames': []
         }
 
+        is_list = section_def.max_occurs is None or section_def.max_occurs > 1
         if is_list and not is_optional_list:
             add_button = ttk.Button(header, text="+", width=2, command=lambda p=parent_widget, sd=section_def, d=depth, pi=parent_instance, current_instance=instance_data: self.add_section_instance(p, sd, d, True, pi, after_instance=current_instance))
             instance_data['add_button'] = add_button
             remove_button = ttk.Button(header, text="-", width=2, command=lambda i_data=instance_data: self._remove_section_instance(i_data))
             instance_data['remove_button'] = remove_button
+            self.form.route_scroll(add_button, remove_button)
+        self.form.route_scroll(container, header, content, header_label)
+        return instance_data
+
+    def _instance_label(self, section_def, instance_idx) -> str:
+        is_list = section_def.max_occurs is None or section_def.max_occurs > 1
+        is_optional_list = section_def.min_occurs == 0 and not self._is_controlled_by_rule(section_def.path)
+        return f"{section_def.name} [{instance_idx + 1}]" if is_list and not is_optional_list else section_def.name
+
+    def _reset_instance(self, instance_data, instance_idx, is_initially_enabled):
+        """Przygotowuje instancję z puli jak nowo utworzoną: numer, zaznaczenie, stan widgetów pól."""
+        section_def = instance_data['section_def']
+        section_state = self.form.form_state.sections.get(section_def.path)
+        instance_data['index'] = instance_idx
+        instance_data['_allow_multiple'] = section_state.allow_multiple if section_state else True
+        # Nowa zmienna - śledzenie starej mogłoby przełączyć instancję, zanim wróci do formularza.
+        instance_data['check_var'] = tk.BooleanVar(value=is_initially_enabled)
+        instance_data['header_label'].config(text=self._instance_label(section_def, instance_idx), foreground="")
+        self.form.state_view.reset_instance(instance_data)
+
+    def _render_instance_content(self, instance_data):
+        """
+        Tworzy pola i podsekcje instancji sekcji. Dotąd ich stan (wartości, widoczność, opcje) żył
+        wyłącznie w FormState - reguły działają na modelu - więc nowe widgety dostają go ze stanu.
+        """
+        if instance_data['content_rendered']: return
+        instance_data['content_rendered'] = True
+        section_def, content = instance_data['section_def'], instance_data['content']
 
         for field_def in section_def.fields:
-            indexed_path = f"{field_def.path}[{instance_idx}]"
-            field_widgets = self._create_field_row(content, field_def, indexed_path)
+            if field_def.path in self.form.rule_set.hidden_paths: continue
+            indexed_path = f"{field_def.path}[{instance_data['index']}]"
+            field_widgets = self._create_field_row(content, field_def, indexed_path, instance_data)
             instance_data['widgets'][field_def.path] = field_widgets
-        
-        for sub_section_def in section_def.sub_sections:
-            self._render_section_recursively(content, sub_section_def, depth + 1, parent_instance=instance_data)
-            
-        self.form.rendered_sections[section_def.path].append(instance_data)
-        if not is_optional_list:
-            check_var.trace_add("write", lambda *args, i=instance_data: self._toggle_section_state(i))
-        
-        self._toggle_section_state(instance_data, is_initial_call=True)
-        self.form.bind_scroll_recursively(container)
+            self.form.field_widgets[field_def.path].append(field_widgets)
+
+        self._render_sub_sections(instance_data)
+        self.form.state_view.sync_instance(instance_data)
+
+    def _restore_instance_content(self, instance_data):
+        """Wpina do indeksów formularza pola instancji z puli i odtwarza jej podsekcje (także z puli)."""
+        for field_path, field_widgets in instance_data['widgets'].items():
+            self.form.widget_groups[f"{field_path}[{instance_data['index']}]"].extend(field_widgets)
+            self.form.field_widgets[field_path].append(field_widgets)
+        self._render_sub_sections(instance_data)
+        self.form.state_view.sync_instance(instance_data)
+
+    def _render_sub_sections(self, instance_data):
+        sub_tasks = [(instance_data['content'], sub_section_def, instance_data['depth'] + 1, instance_data)
+                     for sub_section_def in instance_data['section_def'].sub_sections]
+        if self._deferred is not None:
+            self._deferred.extend(reversed(sub_tasks))
+        else:
+            for task in sub_tasks:
+                self._render_section_recursively(*task)
 
     def _remove_section_instance(self, instance_data, update_buttons=True):
         section_path = instance_data['section_def'].path
@@ -129,15 +327,9 @@ class FormRenderer:
             log.warning(f"Próba usunięcia instancji sekcji, której nie ma na liście: {section_path}")
             return
 
-        for field_path in instance_data['widgets'].keys():
-            instance_idx = self.form.rendered_sections[section_path].index(instance_data)
-            indexed_path = f"{field_path}[{instance_idx}]"
-            if indexed_path in self.form.widget_groups:
-                del self.form.widget_groups[indexed_path]
-
-        instance_data['container'].destroy()
-        self.form.rendered_sections[section_path].remove(instance_data)
+        self._detach_instance(instance_data, recycle=True)
         log.debug(f"[RENDER] Pomyślnie usunięto instancję sekcji '{section_path}'.")
+        self.form.state_view.pull_section(section_path)
         
         if update_buttons:
             self._update_section_buttons(section_path)
@@ -147,6 +339,45 @@ class FormRenderer:
                 log.debug(f"Ostatnia instancja '{section_path}' usunięta, odznaczam główny checkbox.")
                 self.list_control_vars[section_path].set(False)
 
+    def _detach_instance(self, instance_data, recycle):
+        """
+        Wypina instancję sekcji z indeksów formularza razem z instancjami jej podsekcji, po czym
+        odkłada jej widgety do puli (recycle) albo je niszczy. Podsekcje idą do puli tylko razem
+        z rodzicem - ich widgety leżą w jego drzewie.
+        """
+        section_path = instance_data['section_def'].path
+        instances = self.form.rendered_sections[section_path]
+        instance_idx = instances.index(instance_data)
+        for field_path, field_widgets in instance_data['widgets'].items():
+            self.form.widget_groups.pop(f"{field_path}[{instance_idx}]", None)
+            self._unindex_field_widgets(field_path, field_widgets)
+        instances.remove(instance_data)
+
+        recycle = recycle and self.pool.accepts(instance_data)
+        for sub_section_def in instance_data['section_def'].sub_sections:
+            for nested in [i for i in self.form.rendered_sections.get(sub_section_def.path, ()) if i['parent_instance'] is instance_data]:
+                self._detach_instance(nested, recycle)
+            if not self.form.rendered_sections.get(sub_section_def.path):
+                self.form.state_view.pull_section(sub_section_def.path)
+        for frame in instance_data['sub_frames']:
+            frame.destroy()
+        instance_data['sub_frames'].clear()
+
+        if recycle and self.pool.release(instance_data):
+            instance_data['container'].pack_forget()
+        else:
+            instance_data['container'].destroy()
+
+    def _unindex_field_widgets(self, field_path, field_widgets):
+        """Usuwa z indeksu ścieżek listę widgetów usuwanej instancji (porównanie tożsamości, nie zawartości)."""
+        instance_widgets = self.form.field_widgets.get(field_path, [])
+        for i, widgets in enumerate(instance_widgets):
+            if widgets is field_widgets:
+                del instance_widgets[i]
+                break
+        if not instance_widgets:
+            self.form.field_widgets.pop(field_path, None)
+
     def toggle_multiplicity_controls(self, section_path: str, allow_multiple: bool):
         instances = self.form.rendered_sections.get(section_path, [])
         if not instances: return
@@ -191,16 +422,16 @@ class FormRenderer:
     def _set_children_state_disabled(self, parent_widget):
         for child in parent_widget.winfo_children():
             if isinstance(child, (ttk.Entry, ttk.Combobox)):
-                child.config(state='disabled')
+                self.form.widget_store.set_state(child, 'disabled')
             elif isinstance(child, (ttk.Frame, ttk.Labelframe)):
                 self._set_children_state_disabled(child)
 
     def _restore_children_default_state(self, parent_widget):
         for child in parent_widget.winfo_children():
             if isinstance(child, ttk.Combobox):
-                child.config(state='readonly')
+                self.form.widget_store.set_state(child, 'readonly')
             elif isinstance(child, ttk.Entry):
-                child.config(state='normal')
+                self.form.widget_store.set_state(child, 'normal')
             elif isinstance(child, (ttk.Frame, ttk.Labelframe)):
                 self._restore_children_default_state(child)
 
@@ -212,56 +443,83 @@ class FormRenderer:
             log.debug(f"[RENDER] Przełączanie stanu sekcji '{section_path}' na Włączony={is_enabled}")
 
         if is_enabled:
+            if not instance_data['content_rendered']:
+                log.debug(f"[RENDER] Leniwe renderowanie zawartości sekcji '{section_path}'")
+                self._render_instance_content(instance_data)
             instance_data['content'].pack(fill=tk.X, padx=10, pady=(0, 5))
             self._restore_children_default_state(instance_data['content'])
+            self.form.state_view.refresh_enabled(instance_data)
         else:
             instance_data['content'].pack_forget()
             self._set_children_state_disabled(instance_data['content'])
-        
+
+        # Przy budowaniu przyrostowym stan (z zastosowanymi regułami) jest źródłem prawdy - nowa instancja
+        # nie nadpisuje aktywności sekcji; rozbieżności wyrównuje FormStateView.sync_sections() na końcu.
+        if not (is_initial_call and self._deferred is not None):
+            self.form.state_view.pull_section(section_path)
         self._update_section_buttons(section_path)
-        self.form.update_idletasks()
+        self.form.request_idle_update()
 
-    def _create_field_row(self, parent, field_def, indexed_path):
+    def _create_field_row(self, parent, field_def, indexed_path, instance_data):
         row_frame = ttk.Frame(parent)
         row_frame.pack(fill=tk.X, pady=3, padx=5)
         label_text = f"{field_def.name}{' *' if field_def.is_required else ''}"
         label = ttk.Label(row_frame, text=label_text, width=25, anchor="w")
         label.pack(side=tk.LEFT, padx=(0, 5))
-        field_def.label_widget = label
 
         fields_container = ttk.Frame(row_frame)
         fields_container.pack(side=tk.LEFT, expand=True, fill=tk.X)
+        self.form.route_scroll(row_frame, label, fields_container)
         created_widgets = []
         
         def add_field_gui_instance():
             widget = self._add_field_instance(fields_container, field_def, indexed_path)
+            # Powiązania z GUI trzymamy na widgetach, a nie w modelu schematu (FormField).
+            widget.row_frame = row_frame
+            widget.label_widget = label
+            self._index_widget(WidgetEntry(widget, field_def, instance_data, len(created_widgets)))
             created_widgets.append(widget)
 
         add_field_gui_instance()
 
         if field_def.is_list:
-            ttk.Button(row_frame, text="+", width=2, command=add_field_gui_instance).pack(side=tk.LEFT, padx=5)
-
-        for widget in created_widgets:
-            widget.row_frame = row_frame
+            add_button = ttk.Button(row_frame, text="+", width=2, command=add_field_gui_instance)
+            add_button.pack(side=tk.LEFT, padx=5)
+            self.form.route_scroll(add_button)
 
         return created_widgets
 
+    def _index_widget(self, entry: WidgetEntry):
+        """Rejestruje widget w indeksie odwrotnym (klucz: nazwa ścieżki Tk) i usuwa go z indeksu przy zniszczeniu."""
+        name = str(entry.widget)
+        self.form.widget_index[name] = entry
+
+        def unindex(event, widget=entry.widget):
+            current = self.form.widget_index.get(name)
+            if current is not None and current.widget is widget:
+                del self.form.widget_index[name]
+
+        entry.widget.bind("<Destroy>", unindex, add="+")
+
     def _add_field_instance(self, parent, field_def, indexed_path):
         instance_frame = ttk.Frame(parent)
         instance_frame.pack(fill=tk.X, pady=(0, 2))
 
+        # Wartość pola żyje w zmiennej Tk śledzonej przez magazyn widgetów (WidgetValueStore).
+        variable = tk.StringVar(instance_frame)
         if (field_def.xsd_type or "").lower() == 'boolean':
-            widget = ttk.Combobox(instance_frame, values=['', 'true', 'false'], state="readonly")
+            widget = ttk.Combobox(instance_frame, values=['', 'true', 'false'], state="readonly", textvariable=variable)
         elif field_def.enumerations:
-            widget = ttk.Combobox(instance_frame, values=[''] + field_def.enumerations, state="readonly")
+            widget = ttk.Combobox(instance_frame, values=[''] + list(field_def.enumerations), state="readonly", textvariable=variable)
         else:
-            widget = ttk.Entry(instance_frame, validate="focusout", validatecommand=self.vcmd)
+            widget = ttk.Entry(instance_frame, validate="focusout", validatecommand=self.vcmd, textvariable=variable)
+        self.form.widget_store.register(widget, variable, "readonly" if isinstance(widget, ttk.Combobox) else "normal")
         
         widget.pack(side=tk.LEFT, expand=True, fill=tk.X)
         error_label = ttk.Label(instance_frame, text="", style="Error.TLabel", wraplength=250, justify=tk.LEFT)
         error_label.pack(side=tk.LEFT, padx=(5, 0), fill=tk.X, expand=True)
         widget.error_label = error_label
+        self.form.route_scroll(instance_frame, widget, error_label)
 
         if not isinstance(indexed_path, str):
             log.critical(f"KRYTYCZNY BŁĄD RENDEROWANIA: Próba użycia klucza innego niż string dla widget_groups! Typ: {type(indexed_path)}, Wartość: {indexed_path}")
@@ -269,7 +527,7 @@ class FormRenderer:
 
         self.form.widget_groups[indexed_path].append(widget)
 
-        callback = lambda event, p=field_def.path: self.form.rule_engine.evaluate_rules_for_trigger(p)
+        callback = lambda event, p=field_def.path: self.form.data_handler.on_field_edited(p)
         if isinstance(widget, ttk.Combobox):
             widget.bind("<<ComboboxSelected>>", callback)
         else:
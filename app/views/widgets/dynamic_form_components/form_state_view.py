@@ -0,0 +1,256 @@
+# csire_message_studio/app/views/widgets/dynamic_form_components/form_state_view.py
+import tkinter as tk
+from tkinter import ttk
+from infra.logger import get_logger
+
+log = get_logger(__name__)
+
+
+def combobox_values(field_def, choices=None):
+    """Lista opcji Combobox: dozwolone wartości ze stanu albo pełna lista (enumeracje lub true/false)."""
+    full_list = choices if choices is not None else (field_def.enumerations or ('true', 'false'))
+    return [''] + list(full_list)
+
+
+class FormElement:
+    """Klasa-adapter ujednolicająca interfejs do manipulacji polami i sekcjami."""
+    def __init__(self, widget_or_section_instance, form_facade, field_def=None):
+        self.element = widget_or_section_instance
+        self.form = form_facade
+        self.field_def = field_def
+
+    def show(self, should_show=True):
+        if isinstance(self.element, dict): # To jest sekcja
+            container = self.element['container']
+            header = self.element.get('header_frame')
+
+            if header:
+                parent_container_of_content = container.master
+                if should_show:
+                    header.pack(fill=tk.X, anchor="n")
+                    parent_container_of_content.pack(fill=tk.X, anchor="n", after=header)
+                    if not self.element['check_var'].get():
+                        self.element['check_var'].set(True)
+                else:
+                    header.pack_forget()
+                    parent_container_of_content.pack_forget()
+                    if self.element['check_var'].get():
+                        self.element['check_var'].set(False)
+            else:
+                if should_show:
+                    container.pack(fill=tk.X, anchor="n")
+                    if not self.element['check_var'].get():
+                        self.element['check_var'].set(True)
+                else:
+                    container.pack_forget()
+                    if self.element['check_var'].get():
+                        self.element['check_var'].set(False)
+        else: # To jest widget (pole)
+            widget = self.element
+            if hasattr(widget, 'row_frame'):
+                if should_show:
+                    widget.row_frame.pack(fill=tk.X, pady=3, padx=5)
+                else:
+                    widget.row_frame.pack_forget()
+            self.form.widget_store.set_visible(widget, should_show)
+
+    def set_enabled(self, should_enable=True):
+        elements_to_process = []
+        if isinstance(self.element, dict):
+            for widgets in self.element['widgets'].values():
+                elements_to_process.extend(widgets)
+        else:
+            elements_to_process.append(self.element)
+
+        for elem in elements_to_process:
+            new_state = "disabled"
+            if should_enable:
+                new_state = "readonly" if isinstance(elem, ttk.Combobox) else "normal"
+
+            self.form.widget_store.set_state(elem, new_state)
+
+    def set_required(self, should_be_required=True):
+        label = getattr(self.element, 'label_widget', None)
+        if self.field_def and label is not None:
+            current_text = label.cget("text")
+            base_text = current_text.strip().removesuffix(" *")
+
+            if should_be_required and not current_text.endswith(" *"):
+                label.config(text=f"{base_text} *")
+            elif not should_be_required and current_text.endswith(" *"):
+                label.config(text=base_text)
+
+    def set_value(self, value: str):
+        """Wpisuje wartość ze stanu formularza (także do pól zablokowanych)."""
+        if isinstance(self.element, dict): return
+        caller = "rule_engine_set_value" if value else "unconditional_clear"
+        self.form.data_handler._set_widget_value_no_trigger(self.element, value, caller=caller)
+
+    def set_multiple_allowed(self, should_allow=True):
+        if isinstance(self.element, dict):
+            section_path = self.element['section_def'].path
+            self.form.renderer.toggle_multiplicity_controls(section_path, should_allow)
+
+    def set_choices(self, choices=None):
+        """Ustawia listę opcji Combobox; None przywraca pełną listę (enumeracje lub true/false)."""
+        if not isinstance(self.element, ttk.Combobox): return
+        widget = self.element
+
+        if choices is None:
+            log.debug(f"RULE ENGINE: Przywracanie pełnej listy dla Combobox '{self.field_def.path}'.")
+        else:
+            log.debug(f"RULE ENGINE: Ustawianie listy opcji dla '{self.field_def.path}': {choices}")
+        new_list = combobox_values(self.field_def, choices)
+
+        current_value = self.form.widget_store.value(widget)
+        if current_value and current_value not in new_list:
+            log.info(f"Wartość '{current_value}' w polu '{self.field_def.path}' nie jest już dozwolona. Czyszczenie pola.")
+            self.form.widget_store.set_value(widget, '')
+
+        widget['values'] = new_list
+
+
+class FormStateView:
+    """
+    Cienki obserwator modelu FormState: odwzorowuje zmiany stanu (wynik działania silnika reguł)
+    na widgetach Tk oraz przenosi do stanu zmiany wprowadzone w GUI (wartości, zaznaczenie sekcji).
+
+    Silnik reguł (domain.rules) nie odwołuje się do widgetów - czyta i zmienia wyłącznie stan.
+
+    W paczce zmian (DynamicForm.batch) zmiany inne niż wartości są odkładane i scalane:
+    dla każdej pary (rodzaj, ścieżka) zostaje tylko ostatnia wartość, zastosowana w flush().
+    Wartości trafiają do widgetów od razu, bo kod formularza je odczytuje.
+    """
+    def __init__(self, form_facade):
+        self.form = form_facade
+        self.state = form_facade.form_state
+        self._pulling = False
+        self._pending = {}
+        self._handlers = {
+            "value": lambda element, value: element.set_value(value),
+            "visible": lambda element, value: element.show(value),
+            "active": lambda element, value: element.show(value),
+            "enabled": lambda element, value: element.set_enabled(value),
+            "required": lambda element, value: element.set_required(value),
+            "choices": lambda element, value: element.set_choices(value),
+            "allow_multiple": lambda element, value: element.set_multiple_allowed(value),
+        }
+        self.state.add_observer(self.on_state_changed)
+
+    def detach(self):
+        self.state.remove_observer(self.on_state_changed)
+
+    def on_state_changed(self, kind, path, value):
+        if self._pulling or self.form.rule_set.is_hidden(path): return
+        if kind not in self._handlers: return
+        if kind != "value" and self.form.in_batch:
+            self._pending.pop((kind, path), None)
+            self._pending[(kind, path)] = value
+            return
+        self._apply(kind, path, value)
+
+    def _apply(self, kind, path, value):
+        handler = self._handlers[kind]
+        for element in self.form.get_elements_by_path(path):
+            handler(element, value)
+
+    def flush(self) -> int:
+        """Stosuje odłożone zmiany w kolejności ich ostatniej modyfikacji. Zwraca liczbę zastosowanych zmian."""
+        applied = 0
+        while self._pending:
+            (kind, path), value = next(iter(self._pending.items()))
+            del self._pending[(kind, path)]
+            self._apply(kind, path, value)
+            applied += 1
+        return applied
+
+    def pull_value(self, field_path):
+        """Przenosi do stanu wartość pola z GUI (reguły czytają wartość pierwszego widgetu ścieżki)."""
+        widget = self.form.get_widget_by_path(field_path)
+        self._pulling = True
+        try:
+            self.state.set_value(field_path, self.form.widget_store.value(widget) if widget else "")
+        finally:
+            self._pulling = False
+
+    def pull_all_values(self, keep_locked_unrendered=False):
+        """
+        Przenosi do stanu wartości wszystkich pól. Pola bez widgetów (sekcje jeszcze nierenderowane)
+        są w stanie czyszczone - z keep_locked_unrendered poza polami zablokowanymi przez reguły.
+        """
+        for field_path in self.form.fields_by_path:
+            if self.form.rule_set.is_hidden(field_path): continue
+            if field_path in self.form.field_widgets:
+                self.pull_value(field_path)
+            elif not (keep_locked_unrendered and not self.state.fields[field_path].enabled):
+                self.state.set_value(field_path, "")
+
+    def pull_section(self, section_path):
+        """Przenosi do stanu aktywność sekcji (aktywna, gdy zaznaczona jest którakolwiek instancja)."""
+        # Odłożona zmiana aktywności z reguł musi trafić do GUI, zanim odczytamy z niego zaznaczenie.
+        if ("active", section_path) in self._pending:
+            self._apply("active", section_path, self._pending.pop(("active", section_path)))
+        instances = self.form.rendered_sections.get(section_path, [])
+        self._pulling = True
+        try:
+            self.state.set_active(section_path, any(inst['check_var'].get() for inst in instances))
+        finally:
+            self._pulling = False
+
+    def sync_instance(self, instance_data):
+        """Nowo utworzonym widgetom instancji sekcji nadaje stan pól z modelu (wartość - tylko w pierwszej instancji)."""
+        for field_path, widgets in instance_data['widgets'].items():
+            field_state = self.state.fields.get(field_path)
+            if field_state is None: continue
+            is_first_instance = self.form.field_widgets[field_path][0] is widgets
+            for widget in widgets:
+                element = FormElement(widget, self.form, field_state.field_def)
+                if field_state.value and is_first_instance:
+                    element.set_value(field_state.value)
+                if not field_state.visible:
+                    element.show(False)
+                if field_state.required != field_state.field_def.is_required:
+                    element.set_required(field_state.required)
+                if field_state.choices is not None:
+                    element.set_choices(field_state.choices)
+
+    def reset_instance(self, instance_data):
+        """
+        Przywraca widgetom instancji sekcji z puli stan jak po utworzeniu: jeden widget na pole,
+        puste wartości, wiersze widoczne w kolejności schematu, domyślne etykiety i listy opcji.
+        Stan z modelu nadaje im potem sync_instance().
+        """
+        for field_path, widgets in instance_data['widgets'].items():
+            field_def = self.form.fields_by_path[field_path]
+            for extra in widgets[1:]:
+                extra.master.destroy()
+            del widgets[1:]
+            widget = widgets[0]
+            element = FormElement(widget, self.form, field_def)
+            element.set_value("")
+            element.set_required(field_def.is_required)
+            if isinstance(widget, ttk.Combobox):
+                widget['values'] = combobox_values(field_def)
+            widget.error_label.config(text="")
+            widget.row_frame.pack_forget()
+            widget.row_frame.pack(fill=tk.X, pady=3, padx=5)
+            self.form.widget_store.set_visible(widget, True)
+
+    def sync_sections(self):
+        """
+        Nadaje wyrenderowanym sekcjom aktywność ze stanu. Używane po zbudowaniu widgetów z modelu,
+        na którym reguły już zadziałały (sekcje niekontrolowane regułą widoczności startują zaznaczone).
+        """
+        for section_path, instances in list(self.form.rendered_sections.items()):
+            if not instances or self.form.rule_set.is_hidden(section_path): continue
+            is_active = self.state.is_section_active(section_path)
+            if any(inst['check_var'].get() for inst in instances) != is_active:
+                self._apply("active", section_path, is_active)
+
+    def refresh_enabled(self, instance_data):
+        """Po ponownym włączeniu instancji sekcji przywraca blokady pól wynikające z reguł."""
+        for field_path, widgets in instance_data['widgets'].items():
+            field_state = self.state.fields.get(field_path)
+            if field_state is not None and not field_state.enabled:
+                for widget in widgets:
+                    FormElement(widget, self.form).set_enabled(False)
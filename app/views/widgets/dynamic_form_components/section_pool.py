@@ -0,0 +1,88 @@
+# csire_message_studio/app/views/widgets/dynamic_form_components/section_pool.py
+from collections import defaultdict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from infra.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class PoolStats(NamedTuple):
+    """Statystyki puli: trafienia i chybienia przy pobieraniu, instancje odłożone i zniszczone (pula pełna)."""
+    hits: int
+    misses: int
+    recycled: int
+    discarded: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+class SectionInstancePool:
+    """
+    Pula odłączonych (pack_forget) drzew widgetów instancji sekcji powtarzalnych.
+
+    Widgetu Tk nie można przenieść do innego rodzica, więc kluczem jest para (widget rodzica,
+    ścieżka sekcji) - instancja wraca tylko tam, skąd została usunięta. Pula ma limit na klucz
+    i limit całkowity; instancja, która się nie mieści, jest niszczona jak dotąd.
+    """
+    def __init__(self, max_per_section: int, max_total: int):
+        self.max_per_section = max_per_section
+        self.max_total = max_total
+        self._free: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        self._size = 0
+        self._hits = self._misses = self._recycled = self._discarded = 0
+
+    @staticmethod
+    def _key(parent_widget, section_path: str) -> Tuple[str, str]:
+        return str(parent_widget), section_path
+
+    def accepts(self, instance_data: Dict[str, Any]) -> bool:
+        """Czy instancja może trafić do puli (sekcje opcjonalne z nagłówkiem mają ramkę rodzica tworzoną za każdym razem na nowo)."""
+        if instance_data['header_frame'] is not None:
+            return False
+        if self._size >= self.max_total:
+            self._prune()
+        key = self._key(instance_data['container'].master, instance_data['section_def'].path)
+        return self._size < self.max_total and len(self._free.get(key, ())) < self.max_per_section
+
+    def release(self, instance_data: Dict[str, Any]) -> bool:
+        """Odkłada odłączoną instancję do puli. Zwraca False, gdy się nie mieści - wtedy wywołujący ją niszczy."""
+        if not self.accepts(instance_data):
+            self._discarded += 1
+            return False
+        self._free[self._key(instance_data['container'].master, instance_data['section_def'].path)].append(instance_data)
+        self._size += 1
+        self._recycled += 1
+        return True
+
+    def acquire(self, parent_widget, section_path: str) -> Optional[Dict[str, Any]]:
+        """Zwraca odłożoną instancję sekcji dla rodzica albo None (trzeba ją utworzyć)."""
+        free = self._free.get(self._key(parent_widget, section_path))
+        while free:
+            instance_data = free.pop()
+            self._size -= 1
+            if instance_data['container'].winfo_exists():
+                self._hits += 1
+                return instance_data
+        self._misses += 1
+        return None
+
+    def _prune(self) -> None:
+        """Usuwa wpisy, których widgety zostały zniszczone razem z rodzicem."""
+        for key, free in list(self._free.items()):
+            free[:] = [i for i in free if i['container'].winfo_exists()]
+            if not free:
+                del self._free[key]
+        self._size = sum(len(free) for free in self._free.values())
+
+    @property
+    def stats(self) -> PoolStats:
+        return PoolStats(self._hits, self._misses, self._recycled, self._discarded, self._size)
+
+    def log_stats(self) -> None:
+        stats = self.stats
+        log.info(f"Pula instancji sekcji: trafienia {stats.hits}/{stats.hits + stats.misses} ({stats.hit_rate:.0%}), "
+                 f"odłożono {stats.recycled}, zniszczono (pula pełna) {stats.discarded}, w puli {stats.size}.")
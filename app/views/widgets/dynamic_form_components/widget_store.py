@@ -0,0 +1,108 @@
+# csire_message_studio/app/views/widgets/dynamic_form_components/widget_store.py
+import tkinter as tk
+from typing import Dict, Optional
+
+
+class WidgetShadow:
+    """Lustrzany stan jednej instancji pola (widgetu Entry/Combobox) po stronie Pythona."""
+    __slots__ = ('widget', 'variable', 'value', 'state', 'visible')
+
+    def __init__(self, widget, variable: tk.StringVar, state: str):
+        self.widget = widget
+        self.variable = variable
+        self.value = ""
+        self.state = state
+        self.visible = True
+
+    @property
+    def enabled(self) -> bool:
+        return self.state != 'disabled'
+
+
+class WidgetValueStore:
+    """
+    Wartość, stan (normal/readonly/disabled) i widoczność każdej instancji pola formularza
+    przechowywane w Pythonie, aby odczyty w gorących ścieżkach (generowanie danych, zbieranie
+    danych, zapis wartości) nie wymagały wywołań Tcl.
+
+    Wartość jest zsynchronizowana z Tk przez zmienną -textvariable widgetu: zmiany wpisane
+    przez użytkownika przychodzą śledzeniem zmiennej, zapisy z kodu przechodzą przez set_value().
+    Stan i widoczność zmienia wyłącznie kod formularza - przez set_state() i set_visible().
+    Wpisy znikają razem z widgetem (<Destroy>).
+    """
+    def __init__(self):
+        self._shadows: Dict[str, WidgetShadow] = {}
+        self._writing = False
+
+    def register(self, widget, variable: tk.StringVar, state: str) -> WidgetShadow:
+        """Rejestruje widget pola utworzony z `-textvariable variable` i stanem początkowym `state`."""
+        name = str(widget)
+        shadow = self._shadows[name] = WidgetShadow(widget, variable, state)
+
+        def on_variable_written(*args):
+            if not self._writing:
+                shadow.value = variable.get()
+
+        def on_destroy(event):
+            current = self._shadows.get(name)
+            if current is shadow:
+                del self._shadows[name]
+
+        variable.trace_add("write", on_variable_written)
+        widget.bind("<Destroy>", on_destroy, add="+")
+        return shadow
+
+    def get(self, widget) -> Optional[WidgetShadow]:
+        return self._shadows.get(str(widget))
+
+    def exists(self, widget) -> bool:
+        return str(widget) in self._shadows
+
+    def value(self, widget) -> str:
+        shadow = self._shadows.get(str(widget))
+        return shadow.value if shadow else ""
+
+    def is_enabled(self, widget) -> bool:
+        shadow = self._shadows.get(str(widget))
+        return bool(shadow and shadow.enabled)
+
+    def is_visible(self, widget) -> bool:
+        shadow = self._shadows.get(str(widget))
+        return bool(shadow and shadow.visible)
+
+    def set_value(self, widget, value: str) -> bool:
+        """
+        Zapisuje wartość do widgetu przez jego zmienną. Zmienna przyjmuje zapis także w widgecie
+        zablokowanym, więc nie trzeba go tymczasowo odblokowywać. Zwraca True, jeśli wartość się zmieniła.
+        """
+        shadow = self._shadows[str(widget)]
+        if shadow.value == value:
+            return False
+        self._writing = True
+        try:
+            shadow.variable.set(value)
+        finally:
+            self._writing = False
+        shadow.value = value
+        return True
+
+    def set_state(self, widget, state: str) -> bool:
+        """Ustawia stan widgetu; wywołanie Tcl tylko przy faktycznej zmianie. Widgety spoza magazynu - bez zmian zachowania."""
+        shadow = self._shadows.get(str(widget))
+        if shadow is None:
+            widget.config(state=state)
+            return True
+        if shadow.state == state:
+            return False
+        widget.config(state=state)
+        shadow.state = state
+        return True
+
+    def set_visible(self, widget, visible: bool) -> None:
+        """Zapisuje widoczność wiersza pola (ukrywanego przez reguły); walidacja pomija pola ukryte."""
+        shadow = self._shadows.get(str(widget))
+        if shadow is not None:
+            shadow.visible = visible
+
+    def __len__(self) -> int:
+        return len(self._shadows)
@@ -0,0 +1,76 @@
+# csire_message_studio/benchmarks/field_validation.py
+"""
+Porównanie walidacji wartości pól: skompilowane predykaty (services.field_validators)
+kontra `xsd_type_obj.validate` z xmlschema, na wszystkich polach formularza 3_1_1_1.
+Przy okazji sprawdza zgodność werdyktów obu ścieżek. Niezgodności są rozdzielone na wartości
+przepuszczane przez predykat, a odrzucane przez xmlschema (błąd predykatu), i odwrotnie -
+xmlschema przyjmuje np. cyfry spoza ASCII w xs:integer, czego XSD i libxml2 nie dopuszczają.
+
+Uruchomienie: python -m benchmarks.field_validation [nazwa_xsd] [liczba_powtórzeń]
+"""
+import sys
+import time
+
+from services.data_generators import generate_valid_data
+from services.schema_registry import schema_registry
+
+
+def _iter_fields(sections):
+    for section in sections:
+        yield from section.fields
+        yield from _iter_fields(section.sub_sections)
+
+
+def _xmlschema_error(field_def, value):
+    try:
+        field_def.xsd_type_obj.validate(value)
+    except Exception as e:
+        return str(e).splitlines()[0]
+    return None
+
+
+def _sample_values(field_def):
+    valid = str(generate_valid_data(field_def, {}, None) or "")
+    # Cyfry spoza ASCII (arabsko-indyjskie) - XSD przyjmuje w typach liczbowych i datach tylko 0-9.
+    return [valid, valid + "X", " " + valid + " ", valid * 3, "abc", "-1", "12.345", "2024-02-30", "1",
+            "٣", "١٢", "٢٠٢٤-01-01", "2024-01-01T١٢:00:00"]
+
+
+def main(xsd_name: str = "3_1_1_1.xsd", repeats: int = 20) -> None:
+    parser = schema_registry.get_parser(xsd_name)
+    fields = [f for f in _iter_fields(parser.get_form_structure_for_element(parser.get_root_element_name()))
+              if f.xsd_type_obj is not None]
+    compiled = [f for f in fields if f.field_type.validator is not None]
+    cases = [(f, v) for f in compiled for v in _sample_values(f)]
+
+    mismatches = [(f.path, v, f.field_type.validator(v) is None) for f, v in cases
+                  if (f.field_type.validator(v) is None) != (_xmlschema_error(f, v) is None)]
+    too_lenient = [(path, value) for path, value, accepted in mismatches if accepted]
+    too_strict = [(path, value) for path, value, accepted in mismatches if not accepted]
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for f, v in cases:
+            _xmlschema_error(f, v)
+    xmlschema_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for f, v in cases:
+            f.field_type.validator(v)
+    compiled_time = time.perf_counter() - start
+
+    calls = len(cases) * repeats
+    print(f"{xsd_name}: {len(compiled)}/{len(fields)} pól ze skompilowanym walidatorem, {len(cases)} przypadków")
+    print(f"  xmlschema:     {xmlschema_time / calls * 1e6:8.2f} us/wywołanie")
+    print(f"  skompilowane:  {compiled_time / calls * 1e6:8.2f} us/wywołanie  (x{xmlschema_time / compiled_time:.1f})")
+    print(f"  niezgodne werdykty: {len(mismatches)}")
+    for label, items in (("predykat przepuszcza, xmlschema odrzuca", too_lenient),
+                         ("predykat odrzuca, xmlschema przepuszcza", too_strict)):
+        print(f"    {label}: {len(items)}")
+        for path, value in items[:20]:
+            print(f"      {path}: {value!r}")
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] or ["3_1_1_1.xsd"]), *(int(a) for a in sys.argv[2:3]))
@@ -0,0 +1,82 @@
+# csire_message_studio/benchmarks/form_build.py
+"""
+Budowanie formularza Tk 3_1_1_1: dotychczasowe (render() i apply_all_rules w konstruktorze
+DynamicForm, pętla zdarzeń zablokowana do końca) kontra przyrostowe (model zbudowany w wątku
+roboczym, widgety tworzone porcjami przez after()). Mierzy czas do pierwszego interaktywnego pola,
+czas całkowity oraz najdłuższą przerwę w obsłudze zdarzeń Tk.
+
+Wymaga ekranu (Tk); okno formularza nie jest wyświetlane.
+
+Uruchomienie: python -m benchmarks.form_build [nazwa_zestawu_reguł] [budżet_porcji_ms]
+"""
+import sys
+import threading
+import time
+import tkinter as tk
+
+from app.views.widgets.dynamic_form import DynamicForm
+from domain.rules.rule_engine import build_form_model
+from services.message_generator import load_rule_set, resolve_message
+from services.schema_registry import schema_registry
+
+
+def _max_event_gap(root, until_done):
+    """Uruchamia pętlę zdarzeń do spełnienia `until_done` i zwraca najdłuższą przerwę między tyknięciami zegara after()."""
+    gaps, last = [0.0], [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        gaps[0] = max(gaps[0], now - last[0])
+        last[0] = now
+        if until_done():
+            root.quit()
+        else:
+            root.after(5, tick)
+
+    root.after(5, tick)
+    root.mainloop()
+    return gaps[0]
+
+
+def main(rule_set_name: str = "1. Umowa Dystrybucyjna", chunk_ms: int = 30) -> None:
+    process_info, message_info = resolve_message("3.1.1")
+    parser = schema_registry.get_parser(message_info["xsd_file"])
+    sections = parser.get_form_structure_for_element(parser.get_root_element_name())
+    rule_set = load_rule_set(message_info, rule_set_name)
+
+    root = tk.Tk()
+    root.withdraw()
+
+    start = time.perf_counter()
+    form = DynamicForm(root, sections, rules=rule_set, process_info=process_info, message_info=message_info)
+    form.update_idletasks()
+    blocking_total = time.perf_counter() - start
+    widgets = sum(len(w) for w in form.widget_groups.values())
+    form.destroy()
+
+    result = {}
+    start = time.perf_counter()
+    worker = threading.Thread(target=lambda: result.update(model=build_form_model(sections, rule_set, process_info, message_info)))
+    worker.start()
+
+    def model_ready():
+        if worker.is_alive() or "form" in result:
+            return "metrics" in result
+        result["form"] = DynamicForm(root, sections, process_info=process_info, message_info=message_info, model=result["model"])
+        result["form"].build_incrementally(chunk_ms, on_done=lambda m: result.update(metrics=m), started_at=start)
+        return False
+
+    max_gap = _max_event_gap(root, model_ready)
+    metrics, model = result["metrics"], result["model"]
+    incremental_widgets = sum(len(w) for w in result["form"].widget_groups.values())
+
+    print(f"Formularz '{rule_set_name}': {widgets} widgetów pól (przyrostowo: {incremental_widgets})")
+    print(f"  dotychczasowe: pierwsze pole i całość po {blocking_total * 1000:8.1f} ms (pętla zdarzeń zablokowana)")
+    print(f"  przyrostowe:   model w tle {model.build_time * 1000:6.1f} ms | pierwsze pole po {metrics.first_field * 1000:7.1f} ms"
+          f" | całość {metrics.total * 1000:8.1f} ms | {metrics.chunks} porcji po {chunk_ms} ms")
+    print(f"  najdłuższa przerwa w obsłudze zdarzeń (przyrostowo): {max_gap * 1000:.1f} ms")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] or ["1. Umowa Dystrybucyjna"]), *(int(a) for a in sys.argv[2:3]))
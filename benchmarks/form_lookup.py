@@ -0,0 +1,91 @@
+# csire_message_studio/benchmarks/form_lookup.py
+"""
+apply_all_rules na formularzu Tk 3_1_1_1: wyszukiwanie widgetów przez przeglądanie wszystkich
+kluczy widget_groups (dawne get_widget_by_path / get_elements_by_path) kontra indeks ścieżek
+DynamicForm.field_widgets. Mierzy także samo wyszukiwanie dla wszystkich ścieżek formularza.
+
+Wymaga ekranu (Tk); okno formularza nie jest wyświetlane.
+
+Uruchomienie: python -m benchmarks.form_lookup [nazwa_zestawu_reguł] [liczba_powtórzeń]
+"""
+import sys
+import time
+import tkinter as tk
+
+from app.views.widgets.dynamic_form import DynamicForm
+from app.views.widgets.dynamic_form_components.form_state_view import FormElement
+from domain.rules.form_state import FormState
+from domain.rules.rule_engine import controlled_section_paths
+from services.message_generator import load_rule_set, resolve_message
+from services.schema_registry import schema_registry
+
+
+def _legacy_get_widget_by_path(form, path):
+    for key, widgets in form.widget_groups.items():
+        if key.split('[')[0] == path and widgets:
+            return widgets[0]
+    return None
+
+
+def _legacy_get_elements_by_path(form, path):
+    elements = []
+    if path in form.rendered_sections:
+        elements.extend(FormElement(inst, form) for inst in form.rendered_sections[path])
+    for key, widgets in form.widget_groups.items():
+        if key.split('[')[0] == path:
+            elements.extend(FormElement(w, form, form.fields_by_path.get(path)) for w in widgets)
+    return elements
+
+
+def _apply_on_fresh_state(form):
+    """apply_all_rules na nowym stanie (jak tuż po renderowaniu), aby każda akcja trafiła do widoku Tk."""
+    form.state_view.detach()
+    form.form_state = FormState(form.form_sections_definitions, controlled_section_paths(form.rule_set))
+    form.state_view.state = form.rule_engine.state = form.form_state
+    form.form_state.add_observer(form.state_view.on_state_changed)
+    form.rule_engine.apply_all_rules()
+
+
+def _time(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def main(rule_set_name: str = "1. Umowa Dystrybucyjna", repeats: int = 20) -> None:
+    process_info, message_info = resolve_message("3.1.1")
+    parser = schema_registry.get_parser(message_info["xsd_file"])
+    sections = parser.get_form_structure_for_element(parser.get_root_element_name())
+    rule_set = load_rule_set(message_info, rule_set_name)
+
+    root = tk.Tk()
+    root.withdraw()
+    form = DynamicForm(root, sections, rules=rule_set, process_info=process_info, message_info=message_info)
+    field_paths = [p for p in form.fields_by_path if not form.rule_set.is_hidden(p)]
+    paths = field_paths + [p for p in form.rendered_sections if form.rendered_sections[p]]
+    print(f"Formularz '{rule_set_name}': {sum(len(w) for w in form.widget_groups.values())} widgetów pól, "
+          f"{sum(len(i) for i in form.rendered_sections.values())} instancji sekcji, {len(rule_set.compiled)} reguł")
+
+    def lookup_all():
+        for path in paths:
+            form.get_elements_by_path(path)
+        for path in field_paths:
+            form.get_widget_by_path(path)
+
+    indexed_lookup = _time(lookup_all, repeats)
+    indexed_apply = _time(lambda: _apply_on_fresh_state(form), repeats)
+
+    form.get_widget_by_path = lambda path: _legacy_get_widget_by_path(form, path)
+    form.get_elements_by_path = lambda path: _legacy_get_elements_by_path(form, path)
+    legacy_lookup = _time(lookup_all, repeats)
+    legacy_apply = _time(lambda: _apply_on_fresh_state(form), repeats)
+
+    print(f"  wyszukanie wszystkich {len(paths)} ścieżek: skan {legacy_lookup * 1000:8.2f} ms | indeks {indexed_lookup * 1000:7.2f} ms")
+    print(f"  apply_all_rules:                  skan {legacy_apply * 1000:8.2f} ms | indeks {indexed_apply * 1000:7.2f} ms"
+          f"  (x{legacy_apply / indexed_apply:.1f})")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] or ["1. Umowa Dystrybucyjna"]), *(int(a) for a in sys.argv[2:3]))
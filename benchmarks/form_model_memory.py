@@ -0,0 +1,99 @@
+# csire_message_studio/benchmarks/form_model_memory.py
+"""
+Pomiar pamięci modelu formularza (tracemalloc): dawny model (klasa z __dict__,
+namedtuple z listami, własne słowniki ograniczeń w każdym polu) kontra model
+ze __slots__, internowanymi napisami i współdzielonymi typami pól (flyweight).
+
+Uruchomienie: python -m benchmarks.form_model_memory [nazwa_xsd] [liczba_formularzy]
+"""
+import gc
+import sys
+import tracemalloc
+from collections import namedtuple
+
+from services.form_model import FormField, FormSection
+from services.schema_registry import schema_registry
+
+
+class _LegacyFormField:
+    def __init__(self, name, qname, path, xsd_type, is_required, is_list,
+                 restrictions, documentation, xsd_type_obj, enumerations):
+        self.name = name
+        self.qname = qname
+        self.path = path
+        self.xsd_type = xsd_type
+        self.is_required = is_required
+        self.is_list = is_list
+        self.restrictions = restrictions
+        self.documentation = documentation
+        self.xsd_type_obj = xsd_type_obj
+        self.enumerations = enumerations
+        self.label_widget = None  # dawniej doklejane przez FormRenderer
+
+
+_LegacyFormSection = namedtuple('FormSection', [
+    'name', 'qname', 'path', 'min_occurs', 'max_occurs', 'fields', 'sub_sections'
+])
+
+
+def _build_legacy(section, prefix=""):
+    path = f"{prefix}.{section.name}" if prefix else f"{section.name}"
+    fields = [
+        _LegacyFormField(
+            name=f.name, qname=f.qname, path=f"{path}.{f.name}", xsd_type=f.xsd_type,
+            is_required=f.is_required, is_list=f.is_list, restrictions=dict(f.restrictions),
+            documentation=f.documentation, xsd_type_obj=None, enumerations=list(f.enumerations),
+        )
+        for f in section.fields
+    ]
+    return _LegacyFormSection(section.name, section.qname, path, section.min_occurs, section.max_occurs,
+                              fields, [_build_legacy(s, path) for s in section.sub_sections])
+
+
+def _build_compact(section, prefix=""):
+    path = f"{prefix}.{section.name}" if prefix else f"{section.name}"
+    fields = [
+        FormField(
+            name=f.name, qname=f.qname, path=f"{path}.{f.name}", xsd_type=f.xsd_type,
+            is_required=f.is_required, is_list=f.is_list, restrictions=dict(f.restrictions),
+            documentation=f.documentation, xsd_type_obj=None, enumerations=list(f.enumerations),
+            xsd_base_type=f.xsd_base_type,
+        )
+        for f in section.fields
+    ]
+    return FormSection(section.name, section.qname, path, section.min_occurs, section.max_occurs,
+                       fields, [_build_compact(s, path) for s in section.sub_sections])
+
+
+def _count_fields(sections) -> int:
+    return sum(len(s.fields) + _count_fields(s.sub_sections) for s in sections)
+
+
+def _measure(builder, sections, repeats: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    forms = [[builder(s) for s in sections] for _ in range(repeats)]
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del forms
+    return retained
+
+
+def main(xsd_name: str = "3_1_1_1.xsd", repeats: int = 10) -> None:
+    parser = schema_registry.get_parser(xsd_name)
+    sections = parser.get_form_structure_for_element(parser.get_root_element_name())
+    field_count = _count_fields(sections)
+
+    for label, repeat_count in (("1 formularz", 1), (f"{repeats} formularzy", repeats)):
+        legacy = _measure(_build_legacy, sections, repeat_count)
+        compact = _measure(_build_compact, sections, repeat_count)
+        per_field_legacy = legacy / (field_count * repeat_count)
+        per_field_compact = compact / (field_count * repeat_count)
+        print(f"{xsd_name} ({field_count} pól), {label}:")
+        print(f"  przed: {per_field_legacy:8.1f} B/pole")
+        print(f"  po:    {per_field_compact:8.1f} B/pole  ({per_field_compact / per_field_legacy:.0%})")
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] or ["3_1_1_1.xsd"]), *(int(a) for a in sys.argv[2:3]))
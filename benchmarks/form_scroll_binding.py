@@ -0,0 +1,95 @@
+# csire_message_studio/benchmarks/form_scroll_binding.py
+"""
+Budowanie pełnego formularza Tk (zestaw reguł 3_1_1_1): dotychczasowe rekurencyjne wiązanie
+<MouseWheel> (bind_scroll_recursively po każdej instancji sekcji i po leniwym wyrenderowaniu
+zawartości - ponowne przeglądanie już związanych poddrzew) kontra znacznik bindtags formularza
+nadawany raz każdemu nowemu widgetowi (DynamicForm.route_scroll).
+
+Wymaga ekranu (Tk); okno formularza nie jest wyświetlane.
+
+Uruchomienie: python -m benchmarks.form_scroll_binding [nazwa_zestawu_reguł] [liczba_powtórzeń]
+"""
+import sys
+import time
+import tkinter as tk
+from unittest import mock
+
+from app.views.widgets.dynamic_form import DynamicForm
+from app.views.widgets.dynamic_form_components.form_renderer import FormRenderer
+from services.message_generator import load_rule_set, resolve_message
+from services.schema_registry import schema_registry
+
+
+def _legacy_patches(counter):
+    """Przywraca dawne miejsca wywołań bind_scroll_recursively (licząc wywołania bind) i wyłącza route_scroll."""
+    def bind_recursively(form, widget):
+        widget.bind("<MouseWheel>", form._on_mouse_wheel)
+        counter[0] += 1
+        for child in widget.winfo_children():
+            bind_recursively(form, child)
+
+    original_add = FormRenderer.add_section_instance
+    original_toggle = FormRenderer._toggle_section_state
+
+    def add_section_instance(renderer, parent_widget, section_def, *args, **kwargs):
+        original_add(renderer, parent_widget, section_def, *args, **kwargs)
+        bind_recursively(renderer.form, renderer.form.rendered_sections[section_def.path][-1]['container'])
+
+    def toggle_section_state(renderer, instance_data, is_initial_call=False):
+        was_rendered = instance_data['content_rendered']
+        original_toggle(renderer, instance_data, is_initial_call)
+        if not was_rendered and instance_data['content_rendered']:
+            bind_recursively(renderer.form, instance_data['content'])
+
+    return (mock.patch.object(DynamicForm, "route_scroll", lambda form, *widgets: None),
+            mock.patch.object(FormRenderer, "add_section_instance", add_section_instance),
+            mock.patch.object(FormRenderer, "_toggle_section_state", toggle_section_state))
+
+
+def _build(root, sections, rule_set, process_info, message_info, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        form = DynamicForm(root, sections, rules=rule_set, process_info=process_info, message_info=message_info)
+        form.update_idletasks()
+        form.destroy()
+    return (time.perf_counter() - start) / repeats
+
+
+def main(rule_set_name: str = "3_1_1_1", repeats: int = 5) -> None:
+    process_info, message_info = resolve_message("3.1.1")
+    parser = schema_registry.get_parser(message_info["xsd_file"])
+    sections = parser.get_form_structure_for_element(parser.get_root_element_name())
+    rule_set = load_rule_set(message_info, rule_set_name)
+
+    root = tk.Tk()
+    root.withdraw()
+
+    routed = [0]
+    original_route = DynamicForm.route_scroll
+    def counting_route(form, *widgets):
+        routed[0] += len(widgets)
+        original_route(form, *widgets)
+    with mock.patch.object(DynamicForm, "route_scroll", counting_route):
+        _build(root, sections, rule_set, process_info, message_info, 1)
+    tagged_time = _build(root, sections, rule_set, process_info, message_info, repeats)
+
+    bound = [0]
+    patches = _legacy_patches(bound)
+    for patch in patches:
+        patch.start()
+    try:
+        _build(root, sections, rule_set, process_info, message_info, 1)
+        bound_per_build = bound[0]
+        legacy_time = _build(root, sections, rule_set, process_info, message_info, repeats)
+    finally:
+        for patch in patches:
+            patch.stop()
+
+    print(f"Formularz '{rule_set_name}': budowanie DynamicForm (średnio z {repeats})")
+    print(f"  rekurencyjne bind:  {legacy_time * 1000:8.1f} ms | wywołań bind: {bound_per_build}")
+    print(f"  znacznik bindtags:  {tagged_time * 1000:8.1f} ms | widgetów oznaczonych: {routed[0]}  (x{legacy_time / tagged_time:.2f})")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] or ["3_1_1_1"]), *(int(a) for a in sys.argv[2:3]))
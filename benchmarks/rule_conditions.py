@@ -0,0 +1,97 @@
+# csire_message_studio/benchmarks/rule_conditions.py
+"""
+Ocena warunków reguł: interpretacja słowników warunków przy każdym wywołaniu (dotychczasowy
+sposób działania RuleEngine) kontra domknięcia skompilowane przez domain.rules.rule_compiler.
+Warunki są oceniane na stanie formularza wypełnionym danymi testowymi; przy okazji
+sprawdzana jest zgodność wyników obu ścieżek oraz czas ponownego wczytania pliku reguł.
+
+Uruchomienie: python -m benchmarks.rule_conditions [nazwa_zestawu_reguł] [liczba_powtórzeń]
+"""
+import sys
+import time
+
+from infra import config
+from domain.rules.rule_compiler import OPERATOR_MAP, load_compiled_rules
+from services.message_generator import MessageGenerator, resolve_message
+from services.schema_registry import schema_registry
+
+
+def _interpret(condition, state, permissions) -> bool:
+    """Odpowiednik dawnego RuleEngine._evaluate_condition (na FormState zamiast widgetów)."""
+    if not condition: return True
+    operator_name = condition.get("operator", "AND").upper()
+    results = []
+    for cond in condition.get("conditions", [condition]):
+        if "field_path" not in cond:
+            if "permission_key" in cond:
+                results.append(permissions.get(cond["permission_key"], False))
+            elif "section_path" in cond:
+                results.append(state.is_section_active(cond["section_path"]))
+            continue
+        if cond["field_path"] not in state.fields:
+            results.append(False)
+            continue
+        current_value = state.get_value(cond["field_path"])
+        if "values" in cond:
+            results.append(current_value in cond["values"])
+        elif "not_values" in cond:
+            results.append(current_value not in cond["not_values"])
+        elif "operator" in cond and "value" in cond:
+            op_func = OPERATOR_MAP.get(cond["operator"])
+            try:
+                results.append(bool(op_func) and op_func(float(current_value), float(cond["value"])))
+            except (ValueError, TypeError):
+                results.append(False)
+        elif "is_not_empty" in cond:
+            results.append(bool(current_value.strip()) == cond["is_not_empty"])
+    return all(results) if operator_name == "AND" else any(results)
+
+
+def main(rule_set_name: str = "1. Umowa Dystrybucyjna", repeats: int = 200) -> None:
+    process_info, message_info = resolve_message("3.1.1")
+    rules_path = config.MESSAGE_RULES_DIR / message_info["rules_dir_name"] / f"{rule_set_name}.json"
+
+    start = time.perf_counter()
+    rule_set = load_compiled_rules(rules_path)
+    first_load = time.perf_counter() - start
+    start = time.perf_counter()
+    load_compiled_rules(rules_path)
+    cached_load = time.perf_counter() - start
+
+    generator = MessageGenerator(schema_registry.get_parser(message_info["xsd_file"]), rule_set, process_info, message_info)
+    state = generator.new_state()
+    generator.populate(state)
+    permissions = config.PERMISSIONS
+    conditional = rule_set.conditional
+
+    mismatches = [r.target_path for r in conditional
+                  if r.condition(state, permissions) != _interpret(r.rule["condition"], state, permissions)]
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for r in conditional:
+            _interpret(r.rule["condition"], state, permissions)
+    interpreted = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for r in conditional:
+            r.condition(state, permissions)
+    compiled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats // 10 or 1):
+        generator.new_state()
+    apply_all = (time.perf_counter() - start) / (repeats // 10 or 1)
+
+    calls = len(conditional) * repeats
+    print(f"'{rule_set_name}': {len(rule_set.compiled)} reguł, {len(conditional)} warunkowych")
+    print(f"  wczytanie i kompilacja: {first_load * 1000:7.2f} ms | ponownie (cache wg SHA-256): {cached_load * 1000:6.2f} ms")
+    print(f"  interpretacja:  {interpreted / calls * 1e6:6.3f} us/warunek")
+    print(f"  skompilowane:   {compiled / calls * 1e6:6.3f} us/warunek  (x{interpreted / compiled:.1f})")
+    print(f"  apply_all_rules na świeżym stanie: {apply_all * 1000:.2f} ms")
+    print(f"  niezgodne wyniki: {len(mismatches)}")
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] or ["1. Umowa Dystrybucyjna"]), *(int(a) for a in sys.argv[2:3]))
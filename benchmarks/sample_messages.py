@@ -0,0 +1,44 @@
+# csire_message_studio/benchmarks/sample_messages.py
+"""
+Budowa przykładowych komunikatów XML dla benchmarków - bez GUI i bez reguł biznesowych.
+
+Wypełniane są tylko sekcje i pola wymagane przez schemat, wartościami z `generate_valid_data`.
+"""
+from typing import Any, Dict, List
+
+from services.data_generators import generate_valid_data, reset_address_generation_state
+from services.schema_registry import schema_registry
+from services.xml_builder import XmlBuilder
+
+
+def _fill_sections(sections) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    for section in sections:
+        if section.min_occurs < 1:
+            continue
+        instance: Dict[str, Any] = {}
+        for field in section.fields:
+            if field.is_required:
+                value = generate_valid_data(field, {}, None)
+                if value is not None:
+                    instance[field.name] = str(value)
+        instance.update(_fill_sections(section.sub_sections))
+        data[section.name] = [instance] * section.min_occurs if section.max_occurs != 1 else instance
+    return data
+
+
+def build_sample_data(xsd_name: str) -> Dict[str, Any]:
+    parser = schema_registry.get_parser(xsd_name)
+    root_name = parser.get_root_element_name()
+    reset_address_generation_state()
+    return {root_name: _fill_sections(parser.get_form_structure_for_element(root_name))}
+
+
+def build_sample_messages(xsd_name: str, count: int) -> List[str]:
+    """Zwraca `count` przykładowych komunikatów XML (każdy z innymi losowymi wartościami)."""
+    parser = schema_registry.get_parser(xsd_name)
+    root_name = parser.get_root_element_name()
+    bindings = parser.get_xml_bindings(root_name)
+
+    builder = XmlBuilder()
+    return [builder.build(build_sample_data(xsd_name), bindings) for _ in range(count)]
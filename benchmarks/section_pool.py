@@ -0,0 +1,75 @@
+# csire_message_studio/benchmarks/section_pool.py
+"""
+Wczytywanie presetu z wieloma instancjami sekcji powtarzalnych do formularza Tk 3_1_1_1:
+bez puli (clear_form niszczy dodatkowe instancje, preset tworzy je od nowa) kontra pula
+odłączonych instancji (SectionInstancePool). Preset to dane z MessageGenerator z każdą
+listą sekcji powieloną do zadanej liczby instancji. Podaje też trafienia puli.
+
+Wymaga ekranu (Tk); okno formularza nie jest wyświetlane.
+
+Uruchomienie: python -m benchmarks.section_pool [nazwa_zestawu_reguł] [liczba_instancji] [liczba_powtórzeń]
+"""
+import copy
+import sys
+import time
+import tkinter as tk
+
+from app.views.widgets.dynamic_form import DynamicForm
+from app.views.widgets.dynamic_form_components.section_pool import SectionInstancePool
+from infra import config
+from services.message_generator import MessageGenerator, load_rule_set, resolve_message
+from services.schema_registry import schema_registry
+
+
+def _repeat_sections(data, section_defs, instances):
+    """Powiela instancje każdej sekcji powtarzalnej obecnej w danych (do max_occurs)."""
+    for section_def in section_defs:
+        value = data.get(section_def.name)
+        if value is None:
+            continue
+        items = value if isinstance(value, list) else [value]
+        for item in items:
+            _repeat_sections(item, section_def.sub_sections, instances)
+        if section_def.max_occurs is None or section_def.max_occurs > 1:
+            limit = instances if section_def.max_occurs is None else min(instances, section_def.max_occurs)
+            data[section_def.name] = [copy.deepcopy(items[i % len(items)]) for i in range(limit)]
+
+
+def _count_instances(form):
+    return sum(len(instances) for instances in form.rendered_sections.values())
+
+
+def main(rule_set_name: str = "1. Umowa Dystrybucyjna", instances: int = 8, repeats: int = 5) -> None:
+    process_info, message_info = resolve_message("3.1.1")
+    parser = schema_registry.get_parser(message_info["xsd_file"])
+    sections = parser.get_form_structure_for_element(parser.get_root_element_name())
+    rule_set = load_rule_set(message_info, rule_set_name)
+
+    # Preset przechowuje dane bez elementu głównego (jak _save_preset w OutboundController).
+    preset = MessageGenerator(parser, rule_set, process_info, message_info).generate()[parser.get_root_element_name()]
+    _repeat_sections(preset, sections, instances)
+
+    root = tk.Tk()
+    root.withdraw()
+    form = DynamicForm(root, sections, rules=rule_set, process_info=process_info, message_info=message_info)
+
+    results = {}
+    for label, pool in (("bez puli", SectionInstancePool(0, 0)),
+                        ("pula", SectionInstancePool(config.FORM_INSTANCE_POOL_PER_SECTION, config.FORM_INSTANCE_POOL_MAX))):
+        form.renderer.pool = pool
+        form.populate_from_dict(preset)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            form.populate_from_dict(preset)
+        results[label] = ((time.perf_counter() - start) / repeats, pool.stats)
+
+    print(f"Preset '{rule_set_name}': do {instances} instancji każdej sekcji powtarzalnej, {_count_instances(form)} instancji sekcji w formularzu")
+    for label, (elapsed, stats) in results.items():
+        print(f"  {label:8s}: {elapsed * 1000:8.1f} ms/preset | trafienia {stats.hits}/{stats.hits + stats.misses} ({stats.hit_rate:.0%}),"
+              f" odłożono {stats.recycled}, zniszczono {stats.discarded}")
+    print(f"  przyspieszenie: x{results['bez puli'][0] / results['pula'][0]:.2f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] or ["1. Umowa Dystrybucyjna"]), *(int(a) for a in sys.argv[2:4]))
@@ -0,0 +1,45 @@
+# csire_message_studio/benchmarks/validation_backends.py
+"""
+Porównanie silników walidacji XsdValidator ("xmlschema" i "lxml"):
+opóźnienie walidacji pojedynczego komunikatu i przepustowość walidacji wsadowej.
+
+Uruchomienie: python -m benchmarks.validation_backends [nazwa_xsd] [liczba_komunikatów]
+"""
+import sys
+import time
+
+from domain.validation.xsd_validator import VALIDATION_BACKENDS
+from services.schema_registry import schema_registry
+from benchmarks.sample_messages import build_sample_messages
+
+
+def main(xsd_name: str = "3_1_1_1.xsd", batch_size: int = 200) -> None:
+    messages = build_sample_messages(xsd_name, batch_size)
+    invalid = messages[0].replace("</", "<Unexpected/></", 1)
+    print(f"{xsd_name}: {batch_size} komunikatów, średnio {sum(map(len, messages)) // batch_size} B")
+
+    for backend in VALIDATION_BACKENDS:
+        validator = schema_registry.get_validator(xsd_name, backend=backend)
+
+        start = time.perf_counter()
+        validator.validate(messages[0])
+        first_call = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(20):
+            validator.validate(messages[0])
+        latency = (time.perf_counter() - start) / 20
+
+        start = time.perf_counter()
+        results = [validator.validate(m)[0] for m in messages]
+        throughput = batch_size / (time.perf_counter() - start)
+
+        invalid_result = validator.validate(invalid)
+        print(f"  {backend:10s} pierwsze wywołanie {first_call * 1000:7.1f} ms | "
+              f"pojedynczy {latency * 1000:7.2f} ms | wsad {throughput:8.1f} komunikatów/s | "
+              f"poprawnych {sum(results)}/{batch_size}")
+        print(f"  {'':10s} błąd: {invalid_result[1]!r}")
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] or ["3_1_1_1.xsd"]), *(int(a) for a in sys.argv[2:3]))
@@ -0,0 +1,137 @@
+# csire_message_studio/benchmarks/widget_store_tcl_calls.py
+"""
+Liczba wywołań Tcl na formularzu Tk 3_1_1_1 przy budowaniu, generowaniu danych (populate_with_data)
+i zbieraniu danych (get_values): dawne odczyty wartości i stanu pól prosto z widgetów
+(widget.get(), cget('state'), winfo_exists()) kontra magazyn WidgetValueStore po stronie Pythona.
+
+Wywołania są liczone przez pośrednika na interpreterze Tcl (root.tk), przez którego przechodzą
+wszystkie widgety i zmienne formularza.
+
+Wymaga ekranu (Tk); okno formularza nie jest wyświetlane.
+
+Uruchomienie: python -m benchmarks.widget_store_tcl_calls [nazwa_zestawu_reguł] [liczba_powtórzeń]
+"""
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+from unittest import mock
+
+from app.views.widgets.dynamic_form import DynamicForm
+from app.views.widgets.dynamic_form_components.widget_store import WidgetValueStore
+from services.data_generators import generate_valid_data, reset_address_generation_state
+from services.message_generator import load_rule_set, resolve_message
+from services.schema_registry import schema_registry
+
+
+class TclCallCounter:
+    """Pośrednik interpretera Tcl zliczający wywołania poleceń i odczyty/zapisy zmiennych."""
+    _COUNTED = ("call", "getvar", "setvar", "globalgetvar", "globalsetvar")
+
+    def __init__(self, tkapp):
+        self._tkapp = tkapp
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._tkapp, name)
+        if name not in self._COUNTED:
+            return attr
+        def counted(*args):
+            self.calls += 1
+            return attr(*args)
+        return counted
+
+
+class TkReadingStore(WidgetValueStore):
+    """Dawny sposób pracy z polami: każdy odczyt wartości i stanu to wywołanie Tcl na widgecie."""
+    def exists(self, widget):
+        return bool(widget.winfo_exists())
+
+    def value(self, widget):
+        return widget.get()
+
+    def is_enabled(self, widget):
+        return str(widget.cget('state')) != 'disabled'
+
+    def is_visible(self, widget):
+        return bool(widget.row_frame.winfo_manager())
+
+    def set_value(self, widget, value):
+        if widget.get() == value:
+            return False
+        was_disabled = str(widget.cget('state')) == 'disabled'
+        if was_disabled:
+            widget.config(state='normal')
+        if isinstance(widget, ttk.Combobox):
+            widget.set(value)
+        else:
+            widget.delete(0, tk.END)
+            widget.insert(0, value)
+        if was_disabled:
+            widget.config(state='disabled')
+        return True
+
+    def set_state(self, widget, state):
+        if str(widget.cget('state')) == state:
+            return False
+        widget.config(state=state)
+        return True
+
+
+def _measure(counter, action):
+    before = counter.calls
+    start = time.perf_counter()
+    action()
+    return counter.calls - before, time.perf_counter() - start
+
+
+def _run(root, counter, store_class, sections, rule_set, process_info, message_info, repeats):
+    """Zwraca {etap: (wywołania Tcl, czas)} - dla populate i get_values średnio z `repeats`."""
+    forms = []
+    with mock.patch("app.views.widgets.dynamic_form.WidgetValueStore", store_class):
+        results = {"budowanie": _measure(counter, lambda: forms.append(DynamicForm(
+            root, sections, rules=rule_set, process_info=process_info, message_info=message_info)))}
+    form = forms[0]
+
+    def populate():
+        graph = form.rule_engine.dependency_graph()
+        form.populate_with_data(generate_valid_data, form.rules, graph.levels)
+
+    populate_total, collect_total = [0, 0.0], [0, 0.0]
+    for _ in range(repeats):
+        reset_address_generation_state()
+        form.clear_generated_data(form.rules)
+        form.apply_all_rules()
+        for total, action in ((populate_total, populate), (collect_total, form.get_values)):
+            calls, elapsed = _measure(counter, action)
+            total[0] += calls
+            total[1] += elapsed
+    results["populate"] = (populate_total[0] // repeats, populate_total[1] / repeats)
+    results["get_values"] = (collect_total[0] // repeats, collect_total[1] / repeats)
+    form.destroy()
+    return results
+
+
+def main(rule_set_name: str = "3_1_1_1", repeats: int = 5) -> None:
+    process_info, message_info = resolve_message("3.1.1")
+    parser = schema_registry.get_parser(message_info["xsd_file"])
+    sections = parser.get_form_structure_for_element(parser.get_root_element_name())
+    rule_set = load_rule_set(message_info, rule_set_name)
+
+    root = tk.Tk()
+    root.withdraw()
+    counter = root.tk = TclCallCounter(root.tk)
+
+    legacy = _run(root, counter, TkReadingStore, sections, rule_set, process_info, message_info, repeats)
+    stored = _run(root, counter, WidgetValueStore, sections, rule_set, process_info, message_info, repeats)
+
+    print(f"Formularz '{rule_set_name}': wywołania Tcl (populate i get_values średnio z {repeats})")
+    for stage in legacy:
+        (legacy_calls, legacy_time), (stored_calls, stored_time) = legacy[stage], stored[stage]
+        print(f"  {stage:10s}: odczyt z widgetów {legacy_calls:7d} wywołań {legacy_time * 1000:8.1f} ms | "
+              f"magazyn {stored_calls:7d} wywołań {stored_time * 1000:8.1f} ms  (x{legacy_calls / max(stored_calls, 1):.2f} mniej wywołań)")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] or ["3_1_1_1"]), *(int(a) for a in sys.argv[2:3]))
@@ -0,0 +1,74 @@
+# csire_message_studio/benchmarks/xml_streaming.py
+"""
+Zużycie pamięci (tracemalloc, szczyt) i czas: XmlBuilder.build (drzewo w pamięci + napis)
+kontra XmlBuilder.write (zapis strumieniowy do pliku) dla komunikatów z rosnącą liczbą
+powtórzeń sekcji wielokrotnej. W trybie strumieniowym instancje sekcji są podawane generatorem.
+
+Uruchomienie: python -m benchmarks.xml_streaming [nazwa_xsd]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from services.schema_registry import schema_registry
+from services.xml_builder import XmlBuilder
+from benchmarks.sample_messages import build_sample_data
+
+
+def _find_repeated_section(sections):
+    for section in sections:
+        if section.max_occurs is None and section.fields:
+            return section
+        found = _find_repeated_section(section.sub_sections)
+        if found:
+            return found
+    return None
+
+
+def _with_repeated(data, root_name, section, instances):
+    """Wstawia `instances` pod ścieżką sekcji wielokrotnej (tworząc brakujące sekcje nadrzędne)."""
+    level = data[root_name]
+    for name in section.path.split('.')[1:-1]:
+        level = level.setdefault(name, {})
+    level[section.name] = instances
+    return data
+
+
+def _measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(xsd_name: str = "3_1_1_1.xsd") -> None:
+    parser = schema_registry.get_parser(xsd_name)
+    root_name = parser.get_root_element_name()
+    bindings = parser.get_xml_bindings(root_name)
+    section = _find_repeated_section(parser.get_form_structure_for_element(root_name))
+    instance = {f.name: "X" * 16 for f in section.fields}
+    builder = XmlBuilder()
+    print(f"{xsd_name}: powtarzana sekcja '{section.path}'")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_path = os.path.join(tmp_dir, "message.xml")
+        for count in (1_000, 10_000, 100_000):
+            list_data = _with_repeated(build_sample_data(xsd_name), root_name, section, [instance] * count)
+            build_time, build_peak = _measure(lambda: builder.build(list_data, bindings))
+
+            stream_data = _with_repeated(build_sample_data(xsd_name), root_name, section,
+                                         (instance for _ in range(count)))
+            write_time, write_peak = _measure(lambda: builder.write(stream_data, bindings, out_path))
+
+            print(f"  {count:7d} instancji | build: {build_time * 1000:8.1f} ms, szczyt {build_peak / 1e6:8.2f} MB"
+                  f" | write: {write_time * 1000:8.1f} ms, szczyt {write_peak / 1e6:6.2f} MB"
+                  f" | plik {os.path.getsize(out_path) / 1e6:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main(*(sys.argv[1:2] or ["3_1_1_1.xsd"]))
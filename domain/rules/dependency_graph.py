@@ -0,0 +1,128 @@
+# csire_message_studio/domain/rules/dependency_graph.py
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from infra.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class DependencyGraph:
+    """
+    Graf zależności między polami formularza wynikający z warunków reguł: pole docelowe reguły
+    zależy od pól, których wartości sprawdza jej warunek.
+
+    Udostępnia poziomy topologiczne (kolejność wypełniania danymi testowymi), przechodnie
+    zbiory pól zależnych, domknięcie reguł do ponownej oceny po zmianie pola oraz raport cykli.
+    Graf jest liczony raz dla pary (zestaw reguł, struktura formularza) - zob. CompiledRuleSet.dependency_graph.
+    """
+    def __init__(self, compiled_rules: Iterable, field_paths: Iterable[str]):
+        fields = frozenset(field_paths)
+        self._compiled = list(compiled_rules)
+        dependencies = defaultdict(set)
+        dependents = defaultdict(set)
+        for compiled_rule in self._compiled:
+            for trigger_path in compiled_rule.triggers:
+                if trigger_path in fields:
+                    dependencies[compiled_rule.target_path].add(trigger_path)
+                    dependents[trigger_path].add(compiled_rule.target_path)
+
+        self.dependencies: Dict[str, FrozenSet[str]] = {path: frozenset(d) for path, d in dependencies.items()}
+        self.dependents: Dict[str, FrozenSet[str]] = {path: frozenset(d) for path, d in dependents.items()}
+        self.levels: List[List[str]] = []
+        self.level_of: Dict[str, int] = {}
+        self._build_levels(fields)
+
+        # Pola, których nie dało się umieścić w hierarchii (cykle i pola od nich zależne).
+        self.unresolved: Dict[str, FrozenSet[str]] = {
+            path: frozenset(d for d in self.dependencies.get(path, ()) if d not in self.level_of)
+            for path in fields if path not in self.level_of
+        }
+        self.cycles: List[Tuple[str, ...]] = self._find_cycles()
+        self._transitive: Dict[str, Tuple[str, ...]] = {}
+        self._affected: Dict[str, Tuple] = {}
+
+    def _build_levels(self, fields: FrozenSet[str]) -> None:
+        in_degree = {path: len(self.dependencies.get(path, ())) for path in fields}
+        level = sorted(path for path, degree in in_degree.items() if degree == 0)
+        while level:
+            for path in level:
+                self.level_of[path] = len(self.levels)
+            self.levels.append(level)
+            next_level = []
+            for path in level:
+                for dependent in self.dependents.get(path, ()):
+                    if dependent in in_degree:
+                        in_degree[dependent] -= 1
+                        if in_degree[dependent] == 0:
+                            next_level.append(dependent)
+            level = sorted(next_level)
+
+    def _find_cycles(self) -> List[Tuple[str, ...]]:
+        """
+        Każde nierozwiązane pole czeka na inne nierozwiązane pole, więc idąc wstecz po zależnościach
+        musimy wrócić do odwiedzonego pola - odcinek od tego miejsca jest cyklem.
+        """
+        cycles, seen = [], set()
+        for start in sorted(self.unresolved):
+            walk, position = [], {}
+            node = start
+            while node not in position and node not in seen:
+                position[node] = len(walk)
+                walk.append(node)
+                node = min(self.unresolved[node])
+            if node in position:
+                cycles.append(tuple(walk[position[node]:]))
+            seen.update(walk)
+        return cycles
+
+    @property
+    def has_cycles(self) -> bool:
+        return bool(self.unresolved)
+
+    def transitive_dependents(self, path: str) -> Tuple[str, ...]:
+        """Wszystkie ścieżki zależne (bezpośrednio lub pośrednio) od pola, w kolejności topologicznej."""
+        cached = self._transitive.get(path)
+        if cached is not None:
+            return cached
+        found, stack = set(), [path]
+        while stack:
+            for dependent in self.dependents.get(stack.pop(), ()):
+                if dependent not in found and dependent != path:
+                    found.add(dependent)
+                    stack.append(dependent)
+        last = len(self.levels)
+        ordered = tuple(sorted(found, key=lambda p: (self.level_of.get(p, last), p)))
+        self._transitive[path] = ordered
+        return ordered
+
+    def affected_rules(self, path: str) -> Tuple:
+        """
+        Reguły do ponownej oceny po zmianie pola: wyzwalane przez nie samo lub przez pola od niego
+        zależne (przechodnio). Kolejność topologiczna - reguła po wszystkich regułach ustawiających
+        jej pola wyzwalające; przy równym poziomie kolejność z pliku reguł.
+        """
+        cached = self._affected.get(path)
+        if cached is not None:
+            return cached
+        paths = {path, *self.transitive_dependents(path)}
+        last = len(self.levels)
+        keyed = [
+            (max(self.level_of.get(t, last) for t in compiled_rule.triggers), position, compiled_rule)
+            for position, compiled_rule in enumerate(self._compiled)
+            if compiled_rule.condition is not None and paths.intersection(compiled_rule.triggers)
+        ]
+        ordered = tuple(compiled_rule for _, _, compiled_rule in sorted(keyed, key=lambda k: k[:2]))
+        self._affected[path] = ordered
+        return ordered
+
+    def log_cycle_report(self) -> None:
+        if not self.has_cycles:
+            return
+        log.error(f"Wykryto cykl w zależnościach reguł! Pola, których nie można było umieścić w hierarchii: {sorted(self.unresolved)}")
+        log.error("--- DIAGNOSTYKA CYKLU ---")
+        for cycle in self.cycles:
+            log.error(f"  -> Cykl: {' -> '.join(cycle + cycle[:1])}")
+        for path, waiting_for in sorted(self.unresolved.items()):
+            log.error(f"  -> Pole '{path}' nadal czeka na: {sorted(waiting_for)}")
+        log.error("--------------------------")
@@ -0,0 +1,273 @@
+# csire_message_studio/domain/rules/form_state.py
+from collections import Counter, deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from infra.logger import get_logger
+
+log = get_logger(__name__)
+
+# Obserwator zmian stanu: (rodzaj_zmiany, ścieżka, nowa_wartość).
+# Rodzaje: "value", "visible", "enabled", "required", "choices", "active", "allow_multiple".
+StateObserver = Callable[[str, str, Any], None]
+
+
+class FieldState:
+    """Stan pojedynczego pola formularza (wspólny dla wszystkich instancji ścieżki)."""
+    __slots__ = ('field_def', 'section_path', 'value', 'visible', 'enabled', 'required', 'choices')
+
+    def __init__(self, field_def, section_path: str):
+        self.field_def = field_def
+        self.section_path = section_path
+        self.value = ""
+        self.visible = True
+        self.enabled = True
+        self.required = field_def.is_required
+        self.choices: Optional[List[str]] = None
+
+
+class SectionState:
+    """Stan sekcji: czy jest aktywna (zaznaczona/widoczna) i czy dopuszcza wiele instancji."""
+    __slots__ = ('section_def', 'parent_path', 'active', 'allow_multiple', 'field_paths')
+
+    def __init__(self, section_def, parent_path: Optional[str], active: bool):
+        self.section_def = section_def
+        self.parent_path = parent_path
+        self.active = active
+        self.allow_multiple = True
+        self.field_paths = tuple(f.path for f in section_def.fields)
+
+
+class FormState:
+    """
+    Model stanu formularza niezależny od GUI: wartości, widoczność, dostępność,
+    wymagalność i dozwolone opcje pól oraz aktywność sekcji, kluczowane ścieżką kropkową.
+
+    Stan początkowy odpowiada formularzowi Tk tuż po renderowaniu: sekcje kontrolowane
+    regułami są nieaktywne do czasu, aż reguła je pokaże, pozostałe są aktywne.
+    Każda faktyczna zmiana jest zgłaszana obserwatorom (np. widokowi Tk).
+    """
+    def __init__(self, sections, controlled_sections: Iterable[str] = ()):
+        self.sections: Dict[str, SectionState] = {}
+        self.fields: Dict[str, FieldState] = {}
+        self._subtree_fields: Dict[str, Tuple[str, ...]] = {}
+        self._observers: List[StateObserver] = []
+        controlled = frozenset(controlled_sections)
+
+        def register(section_defs, parent_path) -> List[str]:
+            registered = []
+            for section_def in section_defs:
+                self.sections[section_def.path] = SectionState(section_def, parent_path,
+                                                              section_def.path not in controlled)
+                subtree = []
+                for field_def in section_def.fields:
+                    self.fields[field_def.path] = FieldState(field_def, section_def.path)
+                    subtree.append(field_def.path)
+                subtree.extend(register(section_def.sub_sections, section_def.path))
+                self._subtree_fields[section_def.path] = tuple(subtree)
+                registered.extend(subtree)
+            return registered
+
+        register(sections, None)
+
+    def add_observer(self, observer: StateObserver) -> None:
+        self._observers.append(observer)
+
+    def remove_observer(self, observer: StateObserver) -> None:
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def _notify(self, kind: str, path: str, value: Any) -> None:
+        for observer in self._observers:
+            observer(kind, path, value)
+
+    def has_path(self, path: str) -> bool:
+        return path in self.fields or path in self.sections
+
+    # --- Odczyt ---
+
+    def get_value(self, path: str) -> str:
+        field = self.fields.get(path)
+        return field.value if field else ""
+
+    def subtree_field_paths(self, path: str) -> Tuple[str, ...]:
+        """Ścieżki pól sekcji i wszystkich jej podsekcji (w kolejności schematu)."""
+        return self._subtree_fields.get(path, ())
+
+    def is_section_active(self, path: str) -> bool:
+        section = self.sections.get(path)
+        return bool(section and section.active)
+
+    def is_in_active_section(self, path: str) -> bool:
+        """Czy pole (lub sekcja) leży wyłącznie w aktywnych sekcjach - w Tk nieaktywna sekcja blokuje całe poddrzewo."""
+        section_path = self.fields[path].section_path if path in self.fields else path
+        while section_path is not None:
+            section = self.sections[section_path]
+            if not section.active:
+                return False
+            section_path = section.parent_path
+        return True
+
+    def is_editable(self, path: str) -> bool:
+        """Czy pole może zostać wypełnione przez użytkownika lub generator (widoczne, dostępne, w aktywnej sekcji)."""
+        field = self.fields.get(path)
+        return bool(field and field.visible and field.enabled and self.is_in_active_section(path))
+
+    # --- Zmiany ---
+
+    def set_value(self, path: str, value: Optional[str]) -> bool:
+        """Ustawia wartość pola. Zwraca True, jeśli wartość faktycznie się zmieniła."""
+        field = self.fields.get(path)
+        value = "" if value is None else str(value)
+        if field is None or field.value == value:
+            return False
+        field.value = value
+        self._notify("value", path, value)
+        return True
+
+    def clear(self, path: str) -> None:
+        """
+        Czyści wartość pola lub wszystkich pól własnych sekcji (bez podsekcji).
+
+        Czyszczenie jest zgłaszane obserwatorom także wtedy, gdy wartość w stanie była już pusta -
+        widok może mieć kilka instancji pola, a stan przechowuje wartość pierwszej z nich.
+        """
+        for field_path in self._own_field_paths(path):
+            if not self.set_value(field_path, ""):
+                self._notify("value", field_path, "")
+
+    def set_visible(self, path: str, visible: bool) -> None:
+        """Dla pola zmienia widoczność wiersza, dla sekcji - jej aktywność (jak pole wyboru w Tk)."""
+        if path in self.sections:
+            self.set_active(path, visible)
+            return
+        field = self.fields.get(path)
+        if field is not None and field.visible != visible:
+            field.visible = visible
+            self._notify("visible", path, visible)
+
+    def set_active(self, path: str, active: bool) -> None:
+        section = self.sections.get(path)
+        if section is not None and section.active != active:
+            section.active = active
+            self._notify("active", path, active)
+
+    def set_enabled(self, path: str, enabled: bool) -> None:
+        for field_path in self._own_field_paths(path):
+            field = self.fields[field_path]
+            if field.enabled != enabled:
+                field.enabled = enabled
+                self._notify("enabled", field_path, enabled)
+
+    def set_required(self, path: str, required: bool) -> None:
+        field = self.fields.get(path)
+        if field is not None and field.required != required:
+            field.required = required
+            self._notify("required", path, required)
+
+    def set_choices(self, path: str, choices: Optional[List[str]]) -> None:
+        """
+        Ustawia listę dozwolonych opcji pola (None - pełna lista z enumeracji).
+        Wartość spoza nowej listy jest czyszczona.
+        """
+        field = self.fields.get(path)
+        if field is None:
+            return
+        if field.value and choices is not None and field.value not in choices:
+            log.info(f"Wartość '{field.value}' w polu '{path}' nie jest już dozwolona. Czyszczenie pola.")
+            self.set_value(path, "")
+        if field.choices != choices:
+            field.choices = list(choices) if choices is not None else None
+            self._notify("choices", path, field.choices)
+
+    def set_allow_multiple(self, path: str, allow: bool) -> None:
+        section = self.sections.get(path)
+        if section is not None and section.allow_multiple != allow:
+            section.allow_multiple = allow
+            self._notify("allow_multiple", path, allow)
+
+    def _own_field_paths(self, path: str) -> Iterable[str]:
+        if path in self.fields:
+            return (path,)
+        section = self.sections.get(path)
+        return section.field_paths if section else ()
+
+    # --- Eksport ---
+
+    def to_dict(self, sections) -> Dict[str, Any]:
+        """
+        Zbiera niepuste wartości z aktywnych sekcji do zagnieżdżonego słownika dla XmlBuilder
+        (jedna instancja na sekcję, sekcje wielokrotne jako jednoelementowe listy).
+        """
+        def collect(parent: Dict[str, Any], section_defs) -> None:
+            for section_def in section_defs:
+                if not self.is_section_active(section_def.path):
+                    continue
+                instance: Dict[str, Any] = {}
+                for field_def in section_def.fields:
+                    value = self.fields[field_def.path].value
+                    if value:
+                        instance[field_def.name] = [value] if field_def.is_list else value
+                collect(instance, section_def.sub_sections)
+                if instance:
+                    parent[section_def.name] = [instance] if section_def.max_occurs != 1 else instance
+
+        if not sections:
+            return {}
+        root_name = sections[0].path.split('.')[0]
+        data: Dict[str, Any] = {root_name: {}}
+        collect(data[root_name], sections)
+        return data
+
+
+class FillWorklist:
+    """
+    Kolejka pól do wypełnienia zasilana zmianami stanu formularza.
+
+    Pole wraca do kolejki, gdy reguły je pokażą lub odblokują, zmienią mu listę opcji,
+    wyczyszczą jego wartość albo aktywują sekcję, w której leży. Wypełnianie odwiedza więc
+    tylko pola, na które wpłynął poprzedni zapis, zamiast wielokrotnie przeglądać cały formularz.
+    Każde pole może zostać odwiedzone najwyżej `max_visits` razy (ochrona przed cyklami reguł).
+    """
+    def __init__(self, state: FormState, paths: Iterable[str], max_visits: int = 10):
+        self.state = state
+        self.max_visits = max_visits
+        self.visits: Counter = Counter()
+        self.exhausted = set()
+        self._queue = deque()
+        self._queued = set()
+        for path in paths:
+            self.push(path)
+
+    def __enter__(self) -> "FillWorklist":
+        self.state.add_observer(self._on_state_changed)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.state.remove_observer(self._on_state_changed)
+
+    def __iter__(self) -> Iterator[str]:
+        while self._queue:
+            path = self._queue.popleft()
+            self._queued.discard(path)
+            self.visits[path] += 1
+            yield path
+
+    def push(self, path: str) -> None:
+        if path in self._queued or path not in self.state.fields:
+            return
+        if self.visits[path] >= self.max_visits:
+            self.exhausted.add(path)
+            return
+        self._queued.add(path)
+        self._queue.append(path)
+
+    def _on_state_changed(self, kind: str, path: str, value: Any) -> None:
+        if kind in ("visible", "enabled"):
+            if value:
+                self.push(path)
+        elif kind == "active":
+            if value:
+                for field_path in self.state.subtree_field_paths(path):
+                    self.push(field_path)
+        elif kind == "choices" or (kind == "value" and not value):
+            self.push(path)
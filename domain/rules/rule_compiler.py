@@ -0,0 +1,280 @@
+# csire_message_studio/domain/rules/rule_compiler.py
+import copy
+import hashlib
+import json
+import operator
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from infra.logger import get_logger
+from domain.rules.dependency_graph import DependencyGraph
+
+log = get_logger(__name__)
+
+OPERATOR_MAP = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge
+}
+
+# Skompilowany warunek: (stan_formularza, uprawnienia) -> bool.
+Condition = Callable[[Any, Mapping[str, bool]], bool]
+
+# Akcje pokazujące element tylko przy spełnionym warunku (w przeciwnym razie ukrywają go).
+SHOW_ACTIONS = ("show_if_permission", "show_if_section_exists", "show_if_value", "require_if_value")
+# Akcje, które przy niespełnionym warunku nic nie robią - reguła, która nigdy nie będzie spełniona, jest zbędna.
+NOOP_WHEN_FALSE_ACTIONS = ("set_value", "set_choices_from_process_matrix", "data_generation")
+
+
+def _always_false(state, permissions) -> bool:
+    return False
+
+
+def _always_true(state, permissions) -> bool:
+    return True
+
+
+def _compile_leaf(cond: Dict[str, Any]) -> Optional[Condition]:
+    """
+    Kompiluje pojedynczy warunek do domknięcia. Zwraca None dla warunku, który silnik
+    pomija (nie wpływa na wynik), zgodnie z dotychczasową interpretacją reguł.
+    """
+    if "field_path" not in cond:
+        if "permission_key" in cond:
+            key = cond["permission_key"]
+            return lambda state, permissions: permissions.get(key, False)
+        if "section_path" in cond:
+            section_path = cond["section_path"]
+            return lambda state, permissions: state.is_section_active(section_path)
+        return None
+
+    path = cond["field_path"]
+
+    if "values" in cond:
+        values = frozenset(cond["values"])
+        def test(value): return value in values
+    elif "not_values" in cond:
+        not_values = frozenset(cond["not_values"])
+        def test(value): return value not in not_values
+    elif "operator" in cond and "value" in cond:
+        op_func = OPERATOR_MAP.get(cond["operator"])
+        if not op_func:
+            log.warning(f"Nierozpoznany operator '{cond['operator']}' w regule dla '{path}'")
+            return _always_false
+        try:
+            rule_val = float(cond["value"])
+        except (ValueError, TypeError):
+            return _always_false
+        def test(value):
+            try:
+                return op_func(float(value), rule_val)
+            except (ValueError, TypeError):
+                return False
+    elif "is_not_empty" in cond:
+        expected = cond["is_not_empty"]
+        def test(value): return bool(value.strip()) == expected
+    else:
+        return None
+
+    def leaf(state, permissions):
+        field = state.fields.get(path)
+        return field is not None and test(field.value)
+    return leaf
+
+
+def compile_condition(condition: Optional[Dict[str, Any]]) -> Optional[Condition]:
+    """
+    Kompiluje warunek reguły (pojedynczy lub złożony z "conditions" i "operator") do domknięcia
+    z gotowymi zbiorami wartości, liczbami i funkcjami operatorów. Brak warunku - None.
+    """
+    if not condition:
+        return None
+    leaves = [leaf for leaf in map(_compile_leaf, condition.get("conditions", [condition])) if leaf is not None]
+    combine = all if condition.get("operator", "AND").upper() == "AND" else any
+
+    if len(leaves) == 1:
+        return leaves[0]
+    if not leaves:
+        result = combine(())
+        return lambda state, permissions: result
+    leaves = tuple(leaves)
+    if combine is all:
+        return lambda state, permissions: all(leaf(state, permissions) for leaf in leaves)
+    return lambda state, permissions: any(leaf(state, permissions) for leaf in leaves)
+
+
+def fold_condition(condition: Optional[Dict[str, Any]], permissions: Mapping[str, bool]) -> Optional[bool]:
+    """
+    Rozstrzyga warunek z góry, jeśli zależy wyłącznie od uprawnień (stałego profilu z konfiguracji).
+    Zwraca True/False albo None, gdy wynik zależy od stanu formularza.
+    """
+    if not condition:
+        return True
+    results = []
+    for cond in condition.get("conditions", [condition]):
+        if "field_path" not in cond and "permission_key" in cond:
+            results.append(permissions.get(cond["permission_key"], False))
+        elif _compile_leaf(cond) is not None:
+            results.append(None)
+    if condition.get("operator", "AND").upper() == "AND":
+        if False in results: return False
+        return None if None in results else True
+    if True in results: return True
+    return None if None in results else False
+
+
+class CompiledRule:
+    """Reguła z warunkiem skompilowanym do domknięcia i listą pól, które ją wyzwalają."""
+    __slots__ = ('target_path', 'name', 'action', 'rule', 'condition', 'triggers', 'constant')
+
+    def __init__(self, target_path: str, name: str, rule: Dict[str, Any]):
+        self.target_path = target_path
+        self.name = name
+        self.action = rule.get("action")
+        self.rule = rule
+        self.condition = compile_condition(rule.get("condition"))
+        condition = rule.get("condition") or {}
+        self.triggers = tuple(c["field_path"] for c in condition.get("conditions", [condition]) if "field_path" in c)
+        # Wynik warunku znany z góry (True dla reguł bezwarunkowych), None - zależy od stanu formularza.
+        self.constant: Optional[bool] = True if self.condition is None else None
+
+    def folded(self, result: bool) -> "CompiledRule":
+        """Kopia reguły z warunkiem zastąpionym stałą (zachowuje miejsce reguły w kolejności wykonywania)."""
+        clone = copy.copy(self)
+        clone.condition = _always_true if result else _always_false
+        clone.triggers = ()
+        clone.constant = result
+        return clone
+
+    def always_hides(self) -> Optional[bool]:
+        """True - reguła zawsze ukrywa swój element, False - może go pokazać, None - nie wpływa na widoczność."""
+        if self.action == "hide":
+            return True
+        if self.action in SHOW_ACTIONS:
+            return self.constant is False
+        if self.action == "forbid_if_value":
+            return self.constant is True
+        return None
+
+
+class CompiledRuleSet:
+    """
+    Skompilowany zestaw reguł: reguły bezwarunkowe, reguły warunkowe (w kolejności z pliku)
+    oraz indeks reguł według pola wyzwalającego. `rules` to oryginalny słownik z pliku JSON.
+
+    `hidden_paths` to elementy, które reguły ukrywają zawsze - formularz ich nie renderuje.
+    """
+    def __init__(self, rules: Dict[str, Dict[str, Any]], fingerprint: Optional[str] = None,
+                 compiled: Optional[List[CompiledRule]] = None, permissions: Optional[Mapping[str, bool]] = None):
+        self.rules = rules
+        self.fingerprint = fingerprint
+        self.permissions_key = frozenset(permissions.items()) if permissions is not None else None
+        if compiled is None:
+            compiled = [CompiledRule(target_path, name, rule)
+                        for target_path, rule_definitions in rules.items()
+                        for name, rule in rule_definitions.items()]
+        self.compiled: List[CompiledRule] = compiled
+        self.initial: Tuple[CompiledRule, ...] = tuple(r for r in self.compiled if r.condition is None)
+        self.conditional: Tuple[CompiledRule, ...] = tuple(r for r in self.compiled if r.condition is not None)
+
+        by_trigger = defaultdict(list)
+        for compiled_rule in self.conditional:
+            for trigger_path in compiled_rule.triggers:
+                by_trigger[trigger_path].append(compiled_rule)
+        self.by_trigger: Dict[str, Tuple[CompiledRule, ...]] = {path: tuple(r) for path, r in by_trigger.items()}
+        self.hidden_paths: FrozenSet[str] = self._find_hidden_paths()
+        self._specialized: Dict[FrozenSet, "CompiledRuleSet"] = {}
+        self._graphs: Dict[FrozenSet[str], DependencyGraph] = {}
+
+    def _find_hidden_paths(self) -> FrozenSet[str]:
+        verdicts = defaultdict(list)
+        for compiled_rule in self.compiled:
+            hides = compiled_rule.always_hides()
+            if hides is not None:
+                verdicts[compiled_rule.target_path].append(hides)
+        return frozenset(path for path, hides in verdicts.items() if all(hides))
+
+    def is_hidden(self, path: str) -> bool:
+        """Czy element (lub któraś z jego sekcji nadrzędnych) jest trwale ukryty przez reguły."""
+        return any(path == hidden or path.startswith(hidden + ".") for hidden in self.hidden_paths)
+
+    def dependency_graph(self, field_paths: Iterable[str]) -> DependencyGraph:
+        """Graf zależności reguł dla pól formularza, liczony raz na strukturę formularza i zapamiętany."""
+        key = frozenset(field_paths)
+        graph = self._graphs.get(key)
+        if graph is None:
+            graph = self._graphs[key] = DependencyGraph(self.compiled, key)
+            log.info(f"Zbudowano graf zależności reguł: {len(graph.levels)} poziomów, {len(graph.dependents)} pól wyzwalających, "
+                     f"cykli: {len(graph.cycles)}.")
+        return graph
+
+    def specialize(self, permissions: Mapping[str, bool]) -> "CompiledRuleSet":
+        """
+        Zwraca zestaw reguł dla danego profilu uprawnień: warunki zależne wyłącznie od uprawnień
+        są rozstrzygane z góry, a reguły, które nigdy nie zadziałają, pomijane.
+        Wynik jest zapamiętywany dla profilu, więc kolejne formularze korzystają z gotowego zestawu.
+        """
+        key = frozenset(permissions.items())
+        if key == self.permissions_key:
+            return self
+        specialized = self._specialized.get(key)
+        if specialized is not None:
+            return specialized
+
+        compiled, folded, dropped = [], 0, 0
+        for compiled_rule in self.compiled:
+            if compiled_rule.constant is None:
+                result = fold_condition(compiled_rule.rule.get("condition"), permissions)
+                if result is not None:
+                    folded += 1
+                    if not result and compiled_rule.action in NOOP_WHEN_FALSE_ACTIONS:
+                        dropped += 1
+                        continue
+                    compiled_rule = compiled_rule.folded(result)
+            compiled.append(compiled_rule)
+
+        specialized = CompiledRuleSet(self.rules, self.fingerprint, compiled, permissions)
+        self._specialized[key] = specialized
+        log.info(f"Zestaw reguł wyspecjalizowany dla profilu uprawnień: rozstrzygnięto {folded} warunków, "
+                 f"pominięto {dropped} reguł, trwale ukrytych elementów: {len(specialized.hidden_paths)}.")
+        return specialized
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+
+def compile_rule_set(rules: Dict[str, Dict[str, Any]], fingerprint: Optional[str] = None) -> CompiledRuleSet:
+    return CompiledRuleSet(rules, fingerprint)
+
+
+def as_rule_set(rules) -> CompiledRuleSet:
+    """Przyjmuje skompilowany zestaw reguł (np. z load_compiled_rules) albo słownik reguł do skompilowania."""
+    return rules if isinstance(rules, CompiledRuleSet) else compile_rule_set(rules or {})
+
+
+_compiled_cache: Dict[str, CompiledRuleSet] = {}
+_cache_lock = threading.Lock()
+
+
+def load_compiled_rules(path: Path) -> CompiledRuleSet:
+    """
+    Wczytuje i kompiluje plik reguł JSON. Wynik jest zapamiętywany pod skrótem SHA-256
+    zawartości pliku, więc ponowne wczytanie niezmienionego pliku (np. przy każdym
+    budowaniu formularza) nie parsuje ani nie kompiluje reguł, a zmiana pliku jest wykrywana.
+    """
+    content = Path(path).read_bytes()
+    fingerprint = hashlib.sha256(content).hexdigest()
+    with _cache_lock:
+        rule_set = _compiled_cache.get(fingerprint)
+    if rule_set is None:
+        rules = json.loads(content.decode('utf-8')).get("rules", {})
+        rule_set = compile_rule_set(rules, fingerprint)
+        with _cache_lock:
+            _compiled_cache[fingerprint] = rule_set
+        log.info(f"Skompilowano {len(rule_set.compiled)} reguł z pliku {Path(path).name} ({fingerprint[:12]}).")
+    return rule_set
@@ -0,0 +1,249 @@
+# csire_message_studio/domain/rules/rule_engine.py
+import time
+from typing import Dict, FrozenSet, NamedTuple, Optional
+
+from infra import config as app_config
+from infra.logger import get_logger
+from services import data_generators
+from services.data_generators import validation_registry
+from domain.rules.dependency_graph import DependencyGraph
+from domain.rules.form_state import FormState
+from domain.rules.rule_compiler import CompiledRuleSet, as_rule_set, compile_condition
+
+log = get_logger(__name__)
+
+# Akcje, które sterują widocznością/wymagalnością sekcji - taka sekcja startuje jako nieaktywna.
+VISIBILITY_ACTIONS = ("show_if_value", "require_if_value", "forbid_if_value", "hide")
+
+
+def controlled_section_paths(rules) -> FrozenSet[str]:
+    """Ścieżki elementów, których widoczność jest kontrolowana przez reguły (słownik lub CompiledRuleSet)."""
+    if isinstance(rules, CompiledRuleSet):
+        rules = rules.rules
+    return frozenset(
+        path for path, rule_definitions in rules.items()
+        if any(rule.get("action", "") in VISIBILITY_ACTIONS for rule in rule_definitions.values())
+    )
+
+
+class PropagationReport(NamedTuple):
+    """Wynik propagacji zmiany pola: ile reguł objęło domknięcie, ile oceniono, ile akcji wykonano."""
+    trigger_path: str
+    affected: int
+    evaluated: int
+    executed: int
+
+
+class FormModel(NamedTuple):
+    """Model formularza bez GUI: stan po zastosowaniu wszystkich reguł i silnik reguł działający na tym stanie."""
+    state: FormState
+    engine: "RuleEngine"
+    build_time: float
+
+
+def build_form_model(sections, rules, process_info=None, message_info=None) -> FormModel:
+    """
+    Buduje stan formularza i silnik reguł (ze specjalizacją zestawu i grafem zależności) oraz stosuje
+    wszystkie reguły. Nie odwołuje się do Tk, więc może działać w wątku roboczym - widok formularza
+    tworzy potem widgety od razu w stanie końcowym (DynamicForm z parametrem `model`).
+    """
+    start = time.perf_counter()
+    rule_set = as_rule_set(rules)
+    engine = RuleEngine(FormState(sections, controlled_section_paths(rule_set)), rule_set, process_info, message_info)
+    engine.dependency_graph()
+    engine.apply_all_rules()
+    return FormModel(engine.state, engine, time.perf_counter() - start)
+
+
+class RuleEngine:
+    """
+    Silnik reguł biznesowych (pliki JSON) działający na modelu FormState, bez zależności od GUI.
+
+    Akcje zmieniają wyłącznie stan formularza; widok Tk (lub dowolny inny obserwator FormState)
+    odwzorowuje te zmiany. Dzięki temu te same reguły obsługują formularz i generowanie wsadowe.
+    """
+    def __init__(self, state: FormState, rules, process_info=None, message_info=None, permissions=None):
+        self.state = state
+        self.process_info = process_info or {}
+        self.message_info = message_info or {}
+        self.permissions = permissions if permissions is not None else app_config.PERMISSIONS
+        # Uprawnienia są stałe dla sesji, więc warunki zależne tylko od nich rozstrzygamy przy wczytaniu.
+        self.rule_set = as_rule_set(rules).specialize(self.permissions)
+        self.rules = self.rule_set.rules
+        self.imported_data_context = None
+        # Ostatni wynik warunku każdej reguły warunkowej - akcje reguł, których wynik się nie zmienił, są pomijane.
+        self._outcomes: Dict[object, bool] = {}
+        self._propagating = False
+        self.last_propagation: Optional[PropagationReport] = None
+        log.info(f"Silnik reguł zainicjowany. Załadowano {len(self.rules)} reguł. Zindeksowano {len(self.rule_set.by_trigger)} pól wyzwalających.")
+
+    def update_rules(self, new_rules):
+        self.rule_set = as_rule_set(new_rules).specialize(self.permissions)
+        self.rules = self.rule_set.rules
+        self._outcomes.clear()
+        log.info(f"Silnik reguł zaktualizowany. Przeindeksowano {len(self.rule_set.by_trigger)} pól wyzwalających dla {len(self.rules)} reguł.")
+
+    def dependency_graph(self) -> DependencyGraph:
+        """Graf zależności aktualnego zestawu reguł dla pól formularza (z pamięci podręcznej zestawu)."""
+        return self.rule_set.dependency_graph(self.state.fields)
+
+    def apply_all_rules(self):
+        log.debug("Uruchamianie silnika reguł: Aplikowanie wszystkich reguł...")
+        state, permissions, outcomes = self.state, self.permissions, self._outcomes
+        outcomes.clear()
+
+        for compiled in self.rule_set.initial:
+            self.execute_action(compiled.target_path, compiled.rule, True)
+
+        for compiled in self.rule_set.conditional:
+            outcomes[compiled] = is_met = compiled.condition(state, permissions)
+            self.execute_action(compiled.target_path, compiled.rule, is_met)
+
+        log.debug("Zakończono aplikowanie wszystkich reguł.")
+
+    def apply_import_rules(self, imported_data: dict):
+        log.info("Aplikowanie reguł importowych na podstawie załadowanych danych...")
+        self.imported_data_context = imported_data
+
+        for compiled in self.rule_set.compiled:
+            if compiled.action == "set_value_from_import":
+                self.execute_action(compiled.target_path, compiled.rule, True)
+
+        self.imported_data_context = None
+        log.info("Zakończono aplikowanie reguł importowych.")
+
+    def evaluate_rules_for_trigger(self, trigger_path) -> Optional[PropagationReport]:
+        """
+        Propaguje zmianę pola: ocenia raz, w kolejności topologicznej, wszystkie reguły zależne od niego
+        bezpośrednio lub przez inne pola (domknięcie z grafu zależności). Akcja jest wykonywana tylko
+        wtedy, gdy wynik warunku reguły zmienił się od jej ostatniego wykonania. Wartości ustawiane
+        przez akcje w trakcie propagacji nie uruchamiają jej ponownie - ich zależności są już w domknięciu.
+        """
+        if trigger_path not in self.rule_set.by_trigger: return None
+        affected = self.dependency_graph().affected_rules(trigger_path)
+
+        state, permissions, outcomes = self.state, self.permissions, self._outcomes
+        evaluated = executed = 0
+        was_propagating, self._propagating = self._propagating, True
+        try:
+            for compiled in affected:
+                is_met = compiled.condition(state, permissions)
+                evaluated += 1
+                if outcomes.get(compiled) == is_met:
+                    continue
+                outcomes[compiled] = is_met
+                self.execute_action(compiled.target_path, compiled.rule, is_met)
+                executed += 1
+        finally:
+            self._propagating = was_propagating
+
+        self.last_propagation = PropagationReport(trigger_path, len(affected), evaluated, executed)
+        log.debug(f"Wartość w '{trigger_path}' zmieniona. Domknięcie: {len(affected)} reguł, wykonano akcji: {executed}.")
+        return self.last_propagation
+
+    def set_value(self, path: str, value: Optional[str]) -> bool:
+        """Ustawia wartość pola i - jeśli się zmieniła - propaguje zmianę do reguł od niej zależnych."""
+        if self.state.set_value(path, value):
+            if not self._propagating:
+                self.evaluate_rules_for_trigger(path)
+            return True
+        return False
+
+    def evaluate_condition(self, condition) -> bool:
+        """Ocena warunku podanego jako słownik (poza skompilowanym zestawem reguł)."""
+        compiled = compile_condition(condition)
+        return compiled(self.state, self.permissions) if compiled else True
+
+    def execute_action(self, target_path, rule, is_condition_met):
+        state = self.state
+        if not state.has_path(target_path): return
+
+        action = rule.get("action")
+        is_field = target_path in state.fields
+        log.debug(f"RULE_ENGINE: Wykonuję akcję '{action}' na elemencie '{target_path}'. Warunek spełniony: {is_condition_met}")
+
+        if action == "set_value":
+            if is_condition_met:
+                value = self.get_value_from_rule(rule["value"])
+                log.debug(f"RULE_ENGINE: Akcja 'set_value'. Ustawiam wartość '{value}' dla '{target_path}'.")
+                if is_field:
+                    self.set_value(target_path, value)
+                state.set_enabled(target_path, False)
+        elif action == "set_value_from_import":
+            if not self.imported_data_context:
+                log.warning("Próba wykonania akcji 'set_value_from_import' bez aktywnego kontekstu importu.")
+                return
+            source_path = rule.get("source_path")
+            value = self.imported_data_context.get(source_path)
+            if value is not None:
+                log.info(f"IMPORT_RULE: Ustawianie wartości '{value}' z '{source_path}' do pola '{target_path}'.")
+                if is_field:
+                    self.set_value(target_path, value)
+                if rule.get("lock_field", True):
+                    state.set_enabled(target_path, False)
+        elif action == "set_choices_from_process_matrix":
+            if is_condition_met and is_field:
+                choices = validation_registry.get_valid_codes_for_process(rule.get("process_type")) or []
+                log.debug(f"RULE_ENGINE: Ustawianie nowej listy opcji dla '{target_path}': {choices}")
+                state.set_choices(target_path, choices)
+                state.set_enabled(target_path, True)
+        elif action == "hide":
+            state.set_visible(target_path, False)
+        elif action in ("show_if_permission", "show_if_section_exists", "show_if_value"):
+            if not is_condition_met:
+                state.clear(target_path)
+            state.set_visible(target_path, is_condition_met)
+        elif action == "forbid_if_value":
+            if is_condition_met:
+                state.clear(target_path)
+            state.set_visible(target_path, not is_condition_met)
+        elif action == "require_if_value":
+            state.set_visible(target_path, is_condition_met)
+            state.set_required(target_path, is_condition_met)
+            if not is_condition_met:
+                state.clear(target_path)
+            state.set_enabled(target_path, is_condition_met)
+        elif action == "enable_if_value":
+            if not is_condition_met:
+                state.clear(target_path)
+            state.set_enabled(target_path, is_condition_met)
+        elif action == "allow_multiple_if_value":
+            state.set_allow_multiple(target_path, is_condition_met)
+        elif action == "filter_values":
+            field = state.fields.get(target_path)
+            if field is not None and field.field_def.enumerations:
+                allowed = rule.get("values", []) if is_condition_met else None
+                choices = [v for v in field.field_def.enumerations if v in allowed] if allowed is not None else None
+                state.set_choices(target_path, choices)
+        elif action == "data_generation":
+            if is_condition_met and is_field:
+                params = rule.get("params", {})
+                value = None
+                if rule.get("generator") == "error_code_for_process":
+                    value = data_generators.generate_error_code_for_process(params.get("process_type"))
+                if value is not None:
+                    log.info(f"RULE_ENGINE: Warunkowa generacja dla '{target_path}' zwróciła wartość '{value}'.")
+                    self.set_value(target_path, value)
+
+    def get_value_from_rule(self, rule_value):
+        if isinstance(rule_value, str):
+            if rule_value.startswith("config:"):
+                key = rule_value.split(":")[1]
+                return getattr(app_config, key, f"BŁĄD_CONFIG: Nie znaleziono klucza '{key}'")
+            if rule_value.startswith("generate:"):
+                gen_parts = rule_value.split(":", 2)
+                gen_type = gen_parts[1]
+
+                if gen_type == "uuid":
+                    return data_generators.generate_uuid()
+                if gen_type == "error_code_for_process" and len(gen_parts) > 2:
+                    return data_generators.generate_error_code_for_process(gen_parts[2])
+                log.error(f"Błąd parsowania reguły generatora: {rule_value}.")
+                return None
+            if rule_value.startswith("process."):
+                key = rule_value.split('.')[1]
+                return self.process_info.get(key, f"BŁĄD_PROCESS_INFO: Nie znaleziono klucza '{key}'")
+            if rule_value.startswith("message."):
+                key = rule_value.split('.')[1]
+                return self.message_info.get(key, f"BŁĄD_MESSAGE_INFO: Nie znaleziono klucza '{key}'")
+        return rule_value
@@ -1,26 +1,104 @@
 # csire_message_studio/domain/validation/xsd_validator.py
-from typing import Optional, Tuple
+import threading
+from typing import Any, List, NamedTuple, Optional, Tuple
 import xmlschema
+from lxml import etree
 
+from infra import config
 from infra.logger import get_logger
 
 log = get_logger(__name__)
 
+VALIDATION_BACKENDS = ("xmlschema", "lxml")
+
+
+class ValidationIssue(NamedTuple):
+    """
+    Pojedynczy błąd walidacji XSD przełożony na współrzędne formularza.
+
+    `field_path` to ścieżka kropkowa elementu (jak FormField.path / FormSection.path),
+    `instance_path` - numery instancji kolejnych sekcji od elementu głównego do sekcji
+    zawierającej element, każdy liczony wśród rodzeństwa o tej samej nazwie w instancji
+    rodzica (w kolejności dokumentu), `value_index` - pozycja wartości w polu wielokrotnym.
+    """
+    message: str
+    line: Optional[int]
+    column: Optional[int]
+    xpath: str
+    field_path: Optional[str]
+    instance_path: Tuple[int, ...] = ()
+    value_index: int = 0
+
+    def format(self) -> str:
+        location_info = f"Błąd w linii {self.line}, kolumnie {self.column}:" if self.line is not None else "Błąd walidacji:"
+        return f"{location_info}\n{self.message}\nŚcieżka: {self.xpath}"
+
+
+def format_issues(issues: List[ValidationIssue], limit: int = 10) -> str:
+    """Łączy opisy błędów w jeden komunikat dla użytkownika (maksymalnie `limit` pozycji)."""
+    text = "\n\n".join(issue.format() for issue in issues[:limit])
+    if len(issues) > limit:
+        text += f"\n\n... oraz {len(issues) - limit} kolejnych błędów."
+    return text
+
+
+def _dotted_path(element: etree._Element) -> str:
+    names = [etree.QName(e).localname for e in reversed(list(element.iterancestors()))]
+    names.append(etree.QName(element).localname)
+    return ".".join(names)
+
+
+def _issue_for_element(message: str, line: Optional[int], column: Optional[int], xpath: str,
+                       element: Optional[etree._Element]) -> ValidationIssue:
+    """Tłumaczy element, którego dotyczy błąd, na ścieżkę pola i indeksy instancji formularza."""
+    if element is None or not isinstance(element.tag, str):
+        return ValidationIssue(message, line, column, xpath, None)
+
+    field_path = _dotted_path(element)
+    parent = element.getparent()
+    has_element_children = any(isinstance(child.tag, str) for child in element)
+    # Liść odpowiada polu - instancją jest sekcja nadrzędna; element złożony sam jest instancją sekcji.
+    section_element = parent if parent is not None and not has_element_children else element
+
+    value_index = 0
+    if section_element is parent:
+        value_index = [c for c in parent if c.tag == element.tag].index(element)
+
+    instance_path = []
+    current = section_element
+    while current.getparent() is not None:
+        siblings = [c for c in current.getparent() if c.tag == current.tag]
+        instance_path.append(siblings.index(current))
+        current = current.getparent()
+
+    return ValidationIssue(message, line, column, xpath, field_path, tuple(reversed(instance_path)), value_index)
+
 class XsdValidator:
     """
     Enkapsuluje logikę walidacji dokumentu XML względem schematu XSD.
+
+    Dostępne są dwa silniki walidacji o tym samym kontrakcie `(is_valid, error_message)`:
+    - "xmlschema": czysto pythonowa walidacja obiektem xmlschema.XMLSchema,
+    - "lxml": walidacja przez libxml2 (lxml.etree.XMLSchema), kompilowana raz na walidator.
     """
-    def __init__(self, schema: xmlschema.XMLSchema):
+    def __init__(self, schema: xmlschema.XMLSchema, backend: Optional[str] = None):
         """
         Inicjalizuje walidator z załadowanym wcześniej obiektem schematu.
 
         Args:
             schema: Obiekt schematu z biblioteki xmlschema.
+            backend: Silnik walidacji ("xmlschema" lub "lxml"); domyślnie config.XSD_VALIDATION_BACKEND.
         """
         if not isinstance(schema, xmlschema.XMLSchema):
             raise TypeError("Argument 'schema' musi być instancją xmlschema.XMLSchema")
+        backend = backend or config.XSD_VALIDATION_BACKEND
+        if backend not in VALIDATION_BACKENDS:
+            raise ValueError(f"Nieznany silnik walidacji XSD: '{backend}'. Dostępne: {VALIDATION_BACKENDS}")
         self.schema = schema
-        log.debug(f"XsdValidator zainicjowany ze schematem: {schema.filepath or 'ze źródła w pamięci'}")
+        self.backend = backend
+        self._lxml_schema: Optional[etree.XMLSchema] = None
+        self._lxml_lock = threading.Lock()
+        log.debug(f"XsdValidator ({backend}) zainicjowany ze schematem: {schema.filepath or 'ze źródła w pamięci'}")
 
     def validate(self, xml_string: str) -> Tuple[bool, Optional[str]]:
         """
@@ -35,6 +113,8 @@ class XsdValidator:
             - error_message (str | None): Komunikat błędu, jeśli walidacja się nie powiodła,
               w przeciwnym razie None.
         """
+        if self.backend == "lxml":
+            return self._validate_lxml(xml_string)
         try:
             self.schema.validate(xml_string)
             log.info("Walidacja XML względem schematu XSD zakończona pomyślnie.")
@@ -54,4 +134,100 @@ class XsdValidator:
             
         except Exception as e:
             log.error("Wystąpił nieoczekiwany błąd podczas walidacji XML.", exc_info=True)
-            return False, f"Błąd krytyczny podczas walidacji: {e}"
\ No newline at end of file
+            return False, f"Błąd krytyczny podczas walidacji: {e}"
+
+    def validate_all(self, xml_string: str) -> Tuple[bool, List[ValidationIssue]]:
+        """
+        Waliduje dokument w jednym przebiegu i zwraca wszystkie błędy (a nie tylko pierwszy).
+
+        Returns:
+            Krotka (is_valid, issues), gdzie `issues` to lista ValidationIssue z błędami
+            przełożonymi na ścieżki i indeksy instancji formularza.
+        """
+        try:
+            document = self._parse_for_lxml(xml_string)
+        except etree.XMLSyntaxError as e:
+            log.warning(f"Dokument XML jest niepoprawny składniowo: {e}", exc_info=False)
+            return False, [ValidationIssue(f"Niepoprawna składnia XML: {e.msg}", e.lineno, e.offset, "-", None)]
+
+        try:
+            if self.backend == "lxml":
+                issues = self._collect_lxml_issues(document)
+            else:
+                issues = [
+                    _issue_for_element(e.reason or str(e), getattr(e.elem, 'sourceline', None), None, e.path or "-", e.elem)
+                    for e in self.schema.iter_errors(etree.ElementTree(document))
+                ]
+        except Exception as e:
+            log.error("Wystąpił nieoczekiwany błąd podczas walidacji XML.", exc_info=True)
+            return False, [ValidationIssue(f"Błąd krytyczny podczas walidacji: {e}", None, None, "-", None)]
+
+        if issues:
+            log.warning(f"Walidacja XML ({self.backend}) wykryła {len(issues)} błędów.")
+        else:
+            log.info(f"Walidacja XML ({self.backend}) względem schematu XSD zakończona pomyślnie.")
+        return not issues, issues
+
+    def _collect_lxml_issues(self, document: etree._Element) -> List[ValidationIssue]:
+        lxml_schema = self.lxml_schema
+        with self._lxml_lock:
+            if lxml_schema.validate(document):
+                return []
+            errors = list(lxml_schema.error_log)
+
+        namespaces = {prefix: uri for prefix, uri in document.nsmap.items() if prefix}
+        by_line = {}
+        for element in document.iter():
+            by_line.setdefault(element.sourceline, element)
+
+        issues = []
+        for error in errors:
+            element = None
+            if error.path:
+                try:
+                    found = document.getroottree().xpath(error.path, namespaces=namespaces)
+                    element = found[0] if found else None
+                except etree.XPathError:
+                    element = None
+            if element is None:
+                element = by_line.get(error.line)
+            issues.append(_issue_for_element(error.message, error.line, error.column, error.path or "-", element))
+        return issues
+
+    @property
+    def lxml_schema(self) -> etree.XMLSchema:
+        """Schemat libxml2 kompilowany przy pierwszym użyciu z tego samego pliku XSD co schemat xmlschema."""
+        if self._lxml_schema is None:
+            with self._lxml_lock:
+                if self._lxml_schema is None:
+                    if not self.schema.url:
+                        raise ValueError("Silnik lxml wymaga schematu wczytanego z pliku.")
+                    self._lxml_schema = etree.XMLSchema(etree.parse(self.schema.url))
+                    log.info(f"Skompilowano schemat lxml dla walidacji: {self.schema.url}")
+        return self._lxml_schema
+
+    def _parse_for_lxml(self, xml_string) -> etree._Element:
+        data = xml_string.encode('utf-8') if isinstance(xml_string, str) else xml_string
+        parser = etree.XMLParser(resolve_entities=False, no_network=True)
+        return etree.fromstring(data, parser)
+
+    def _validate_lxml(self, xml_string) -> Tuple[bool, Optional[str]]:
+        try:
+            document = self._parse_for_lxml(xml_string)
+            lxml_schema = self.lxml_schema
+            # Obiekt etree.XMLSchema przechowuje error_log, więc nie jest współdzielony między wątkami.
+            with self._lxml_lock:
+                if lxml_schema.validate(document):
+                    log.info("Walidacja XML (lxml) względem schematu XSD zakończona pomyślnie.")
+                    return True, None
+                error = lxml_schema.error_log[0]
+            log.warning(f"Walidacja XML (lxml) nie powiodła się. Powód: {error.message}", exc_info=False)
+            return False, f"Błąd w linii {error.line}, kolumnie {error.column}:\n{error.message}\nŚcieżka: {error.path}"
+
+        except etree.XMLSyntaxError as e:
+            log.warning(f"Dokument XML jest niepoprawny składniowo: {e}", exc_info=False)
+            return False, f"Błąd w linii {e.lineno}, kolumnie {e.offset}:\nNiepoprawna składnia XML: {e.msg}\nŚcieżka: -"
+
+        except Exception as e:
+            log.error("Wystąpił nieoczekiwany błąd podczas walidacji XML (lxml).", exc_info=True)
+            return False, f"Błąd krytyczny podczas walidacji: {e}"
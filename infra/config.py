@@ -70,6 +70,9 @@ LOG_DIR = PROJECT_ROOT / "logs"
 DEFINITIONS_DIR = PROJECT_ROOT / "domain" / "definitions"
 MESSAGE_RULES_DIR = DEFINITIONS_DIR / "message_rules"
 PRESETS_DIR = PROJECT_ROOT / "presets"
+CACHE_DIR = PROJECT_ROOT / "cache"
+SCHEMA_CACHE_DIR = CACHE_DIR / "schemas"
+FORM_STRUCTURE_CACHE_DIR = CACHE_DIR / "forms"
 
 # Ścieżki do konkretnych zasobów
 XSD_INBOUND_DIR = XSD_DIR / "inbound_responses"
@@ -78,6 +81,25 @@ OPERATORS_CSV_PATH = RESOURCES_DIR / "CSIRE_Kody_EIC_Operatorow.csv"
 XSD_RESPONSE_R1_PATH = XSD_INBOUND_DIR / SYSTEM_MESSAGES["Response_R1"]["xsd_file"]
 VALIDATION_MATRIX_CSV_PATH = RESOURCES_DIR / "Zestawienie_walidacji_w_procesach_CSIRE.csv"
 
+# --- Cache skompilowanych schematów XSD ---
+SCHEMA_CACHE_ENABLED = True
+# Liczba nieużywanych schematów komunikatów trzymanych w pamięci przez rejestr (LRU)
+SCHEMA_REGISTRY_MAX_IDLE = 4
+# Wstępne ładowanie (rozgrzewanie) wszystkich schematów w tle przy starcie aplikacji
+SCHEMA_PREWARM_ENABLED = True
+SCHEMA_PREWARM_WORKERS = 2
+# Silnik walidacji wygenerowanych komunikatów: "xmlschema" (czysty Python) lub "lxml" (libxml2)
+XSD_VALIDATION_BACKEND = "xmlschema"
+
+# --- Budowanie formularza ---
+# Tryb przyrostowy: model formularza budowany w tle, widgety tworzone porcjami między zdarzeniami Tk
+FORM_INCREMENTAL_BUILD = True
+# Budżet czasu jednej porcji tworzenia widgetów (ms)
+FORM_BUILD_CHUNK_MS = 30
+# Pula odłączonych instancji sekcji powtarzalnych (ponowne użycie zamiast niszczenia); 0 wyłącza pulę
+FORM_INSTANCE_POOL_PER_SECTION = 8
+FORM_INSTANCE_POOL_MAX = 64
+
 # --- Konfiguracja logowania ---
 LOG_FILE = LOG_DIR / "app.log"
 LOG_LEVEL = logging.DEBUG
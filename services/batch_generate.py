@@ -0,0 +1,185 @@
+# csire_message_studio/services/batch_generate.py
+"""
+Wsadowe generowanie komunikatów XML bez GUI (np. do testów obciążeniowych odbiorców CSIRE).
+
+Uruchomienie:
+    python -m services.batch_generate --process 3.1.1 --rules "1. Umowa Dystrybucyjna" -n 100000 --out dir/
+
+Komunikaty są generowane w puli procesów. Każdy proces roboczy przy starcie wczytuje schemat
+(z cache na dysku), strukturę formularza, powiązania XML i walidator, więc zadania zawierają
+jedynie zakres numerów komunikatów do wygenerowania.
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from infra.logger import setup_logging, get_logger
+from domain.validation.xsd_validator import VALIDATION_BACKENDS
+from services import data_generators
+from services.message_generator import MessageGenerator, load_rule_set, list_rule_sets, resolve_message
+from services.schema_registry import schema_registry
+from services.xml_builder import XmlBuilder
+
+log = get_logger(__name__)
+
+# Ile błędów walidacji każdy fragment odsyła do raportu.
+MAX_REPORTED_ISSUES = 3
+
+# Stan procesu roboczego, ustawiany raz przez _init_worker.
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(xsd_name: str, rules: Dict[str, Any], process_info: Dict[str, Any], message_info: Dict[str, Any],
+                 backend: Optional[str], out_dir: str, log_level: int) -> None:
+    """Rozgrzewa proces roboczy: schemat, struktura formularza, powiązania XML i walidator."""
+    logging.getLogger().setLevel(log_level)
+    # Po fork() procesy robocze dziedziczą stan generatorów losowych - każdy musi mieć własny.
+    random.seed()
+    data_generators.faker.seed_instance(random.getrandbits(64))
+
+    parser = schema_registry.get_parser(xsd_name)
+    generator = MessageGenerator(parser, rules, process_info, message_info)
+    bindings = parser.get_xml_bindings(generator.root_name)
+    builder = XmlBuilder()
+    validator = schema_registry.get_validator(xsd_name, backend=backend) if backend else None
+    if validator is not None:
+        validator.validate(builder.build(generator.generate(), bindings))
+
+    _worker.update(generator=generator, bindings=bindings, builder=builder, validator=validator,
+                   out_dir=Path(out_dir), prefix=Path(xsd_name).stem)
+
+
+def _generate_range(start: int, count: int, width: int) -> Dict[str, Any]:
+    """Generuje, waliduje i zapisuje komunikaty o numerach [start, start + count)."""
+    generator, bindings, builder, validator = (_worker[k] for k in ("generator", "bindings", "builder", "validator"))
+    timings = {"generate": 0.0, "build": 0.0, "validate": 0.0, "write": 0.0}
+    invalid = 0
+    issues: List[str] = []
+    written_bytes = 0
+
+    for index in range(start, start + count):
+        t0 = time.perf_counter()
+        data = generator.generate()
+        t1 = time.perf_counter()
+        xml_string = builder.build(data, bindings)
+        t2 = time.perf_counter()
+        if validator is not None:
+            is_valid, message_issues = validator.validate_all(xml_string)
+            if not is_valid:
+                invalid += 1
+                if len(issues) < MAX_REPORTED_ISSUES:
+                    issues.append(f"#{index}: {message_issues[0].format() if message_issues else 'nieznany błąd'}")
+        t3 = time.perf_counter()
+        payload = xml_string.encode('utf-8')
+        (_worker["out_dir"] / f"{_worker['prefix']}_{index:0{width}d}.xml").write_bytes(payload)
+        written_bytes += len(payload)
+        t4 = time.perf_counter()
+
+        timings["generate"] += t1 - t0
+        timings["build"] += t2 - t1
+        timings["validate"] += t3 - t2
+        timings["write"] += t4 - t3
+
+    return {"count": count, "invalid": invalid, "issues": issues, "bytes": written_bytes, "timings": timings}
+
+
+def _chunks(total: int, chunk_size: int) -> List[Tuple[int, int]]:
+    return [(start, min(chunk_size, total - start)) for start in range(0, total, chunk_size)]
+
+
+def run_batch(process: str, rule_set: Optional[str], count: int, out_dir: Path, workers: int,
+              backend: Optional[str], chunk_size: Optional[int] = None, log_level: int = logging.ERROR) -> int:
+    """
+    Generuje `count` komunikatów do katalogu `out_dir` i wypisuje podsumowanie z przepustowością.
+
+    Returns:
+        Kod wyjścia: 0 - wszystkie komunikaty poprawne, 1 - część nie przeszła walidacji XSD.
+    """
+    process_info, message_info = resolve_message(process)
+    xsd_name = message_info["xsd_file"]
+    if rule_set is None:
+        available = list_rule_sets(message_info)
+        rule_set = available[0] if available else None
+    # Do procesów roboczych trafia słownik reguł - każdy proces kompiluje go raz w inicjalizatorze.
+    rules = load_rule_set(message_info, rule_set).rules if rule_set else {}
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Rozgrzanie w procesie głównym zapisuje schemat i strukturę formularza w cache na dysku,
+    # więc procesy robocze tylko je wczytują zamiast kompilować schemat równolegle.
+    start = time.perf_counter()
+    parser = schema_registry.get_parser(xsd_name)
+    parser.get_xml_bindings(parser.get_root_element_name())
+    print(f"Schemat '{xsd_name}' gotowy w {time.perf_counter() - start:.2f} s. "
+          f"Reguły: '{rule_set or '-'}', walidacja: {backend or 'wyłączona'}, procesy: {workers}.")
+
+    chunk_size = chunk_size or max(1, min(500, count // (workers * 8) or 1))
+    width = max(6, len(str(count - 1)))
+    totals = {"count": 0, "invalid": 0, "bytes": 0}
+    timings = {"generate": 0.0, "build": 0.0, "validate": 0.0, "write": 0.0}
+    issues: List[str] = []
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(xsd_name, rules, process_info, message_info, backend, str(out_dir), log_level)) as pool:
+        futures = [pool.submit(_generate_range, chunk_start, chunk_count, width)
+                   for chunk_start, chunk_count in _chunks(count, chunk_size)]
+        last_report = start
+        for future in as_completed(futures):
+            result = future.result()
+            for key in totals:
+                totals[key] += result[key]
+            for key in timings:
+                timings[key] += result["timings"][key]
+            issues.extend(result["issues"][:max(0, MAX_REPORTED_ISSUES - len(issues))])
+            now = time.perf_counter()
+            if now - last_report >= 1.0:
+                last_report = now
+                print(f"  {totals['count']}/{count} komunikatów ({totals['count'] / (now - start):.0f} kom./s)")
+
+    elapsed = time.perf_counter() - start
+    busy = sum(timings.values()) or 1.0
+    print(f"Wygenerowano {totals['count']} komunikatów ({totals['bytes'] / 1e6:.1f} MB) do '{out_dir}' "
+          f"w {elapsed:.2f} s: {totals['count'] / elapsed:.0f} komunikatów/s.")
+    print("  Udział etapów: " + ", ".join(f"{name} {value / busy:.0%}" for name, value in timings.items()))
+    if backend:
+        print(f"  Walidacja XSD: poprawnych {totals['count'] - totals['invalid']}, niepoprawnych {totals['invalid']}.")
+        for issue in issues:
+            print(f"    {issue}")
+    return 1 if totals["invalid"] else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(prog="python -m services.batch_generate",
+                                         description="Wsadowe generowanie komunikatów XML bez GUI.")
+    arg_parser.add_argument("--process", required=True,
+                            help="Kod lub nazwa komunikatu, np. 3.1.1, 3_1_1_1.xsd lub nazwa z listy w GUI.")
+    arg_parser.add_argument("--rules", help="Nazwa zestawu reguł (plik JSON bez rozszerzenia). Domyślnie pierwszy z listy.")
+    arg_parser.add_argument("-n", "--count", type=int, default=100, help="Liczba komunikatów (domyślnie 100).")
+    arg_parser.add_argument("--out", type=Path, required=True, help="Katalog wyjściowy.")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Liczba procesów roboczych.")
+    arg_parser.add_argument("--backend", choices=VALIDATION_BACKENDS, default="lxml", help="Silnik walidacji XSD.")
+    arg_parser.add_argument("--no-validate", action="store_true", help="Pomiń walidację XSD.")
+    arg_parser.add_argument("--chunk-size", type=int, help="Liczba komunikatów w jednym zadaniu dla procesu roboczego.")
+    arg_parser.add_argument("--log-level", default="ERROR", help="Poziom logowania (domyślnie ERROR).")
+    args = arg_parser.parse_args(argv)
+
+    setup_logging()
+    log_level = logging.getLevelName(args.log_level.upper())
+    logging.getLogger().setLevel(log_level)
+
+    try:
+        return run_batch(args.process, args.rules, args.count, args.out, max(1, args.workers),
+                         None if args.no_validate else args.backend, args.chunk_size, log_level)
+    except (ValueError, FileNotFoundError) as e:
+        log.error(str(e))
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -219,7 +219,6 @@ def generate_valid_data(field_info, rules: Optional[Dict] = None, available_choi
     rules = rules or {}
     path = field_info.path
     name_lower = field_info.name.lower()
-    xsd_type_obj = field_info.xsd_type_obj
     xsd_type = field_info.xsd_type
     
     if path in rules:
@@ -313,11 +312,10 @@ def generate_valid_data(field_info, rules: Optional[Dict] = None, available_choi
     if 'lastname' in name_lower: return generate_last_name()
     if 'companyname' in name_lower: return generate_company_name()
     
-    if xsd_type_obj:
-        type_name = xsd_type_obj.local_name
-        base_type_name = ""
-        if hasattr(xsd_type_obj, 'base_type') and xsd_type_obj.base_type is not None:
-            base_type_name = xsd_type_obj.base_type.local_name
+    if xsd_type:
+        # Nazwy typów pochodzą ze struktury formularza - nie wymagają wczytania schematu XSD.
+        type_name = xsd_type
+        base_type_name = field_info.xsd_base_type
 
         log.debug(f" -> Analiza typu: type_name='{type_name}', base_type_name='{base_type_name}'")
 
@@ -0,0 +1,271 @@
+# csire_message_studio/services/field_validators.py
+import calendar
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import xmlschema
+
+# Walidator pola zwraca komunikat błędu albo None, jeśli wartość jest poprawna.
+FieldValidator = Callable[[str], Optional[str]]
+
+_NUMERIC_BUILTINS = {
+    'decimal', 'integer', 'long', 'int', 'short', 'byte',
+    'nonNegativeInteger', 'positiveInteger', 'nonPositiveInteger', 'negativeInteger',
+    'unsignedLong', 'unsignedInt', 'unsignedShort', 'unsignedByte',
+}
+_STRING_BUILTINS = {'string', 'normalizedString', 'token'}
+_OTHER_BUILTINS = {'boolean', 'date', 'dateTime'}
+
+_INTEGER_RANGES = {
+    'long': (-2 ** 63, 2 ** 63 - 1), 'int': (-2 ** 31, 2 ** 31 - 1),
+    'short': (-2 ** 15, 2 ** 15 - 1), 'byte': (-2 ** 7, 2 ** 7 - 1),
+    'nonNegativeInteger': (0, None), 'positiveInteger': (1, None),
+    'nonPositiveInteger': (None, 0), 'negativeInteger': (None, -1),
+    'unsignedLong': (0, 2 ** 64 - 1), 'unsignedInt': (0, 2 ** 32 - 1),
+    'unsignedShort': (0, 2 ** 16 - 1), 'unsignedByte': (0, 2 ** 8 - 1),
+}
+
+# Reprezentacje leksykalne XSD dopuszczają tylko cyfry ASCII - bez re.ASCII \d przyjąłby np. '٣'.
+_DECIMAL_RE = re.compile(r'^[+-]?(?:\d+(?:\.\d*)?|\.\d+)$', re.ASCII)
+_INTEGER_RE = re.compile(r'^[+-]?\d+$', re.ASCII)
+_TZ = r'(?:Z|[+-](?:(?:0\d|1[0-3]):[0-5]\d|14:00))?'
+_DATE_RE = re.compile(r'^(-?\d{4,})-(\d{2})-(\d{2})' + _TZ + r'$', re.ASCII)
+_DATETIME_RE = re.compile(r'^(-?\d{4,})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.\d+)?' + _TZ + r'$', re.ASCII)
+
+_LENGTH_FACETS = {'length', 'minLength', 'maxLength'}
+_DIGIT_FACETS = {'totalDigits', 'fractionDigits'}
+_RANGE_FACETS = {'minInclusive', 'maxInclusive', 'minExclusive', 'maxExclusive'}
+
+
+def build_validation_spec(xsd_type: Any) -> Optional[Dict[str, Any]]:
+    """
+    Zbiera fasety całego łańcucha wyprowadzeń typu prostego do serializowalnego słownika.
+
+    Zwraca None dla typów, których kompilator nie obsługuje (listy, unie, typy złożone,
+    asercje, nieobsługiwane typy wbudowane) - dla nich walidacja pozostaje w xmlschema.
+    """
+    if xsd_type is None or not isinstance(xsd_type, xmlschema.validators.XsdAtomic):
+        return None
+
+    enumerations: List[List[str]] = []
+    patterns: List[List[str]] = []
+    facets: List[Tuple[str, Any]] = []
+    current = xsd_type
+    while isinstance(current, xmlschema.validators.XsdAtomicRestriction):
+        for name, facet in current.facets.items():
+            if name is None or facet is None:
+                continue
+            simple_name = name.split('}')[-1]
+            if simple_name == 'whiteSpace':
+                continue
+            if simple_name == 'enumeration':
+                enumerations.append([str(v) for v in facet.enumeration])
+            elif simple_name == 'pattern':
+                patterns.append([p.pattern for p in facet.patterns])
+            elif simple_name in _LENGTH_FACETS or simple_name in _DIGIT_FACETS:
+                facets.append([simple_name, int(facet.value)])
+            elif simple_name in _RANGE_FACETS:
+                facets.append([simple_name, str(facet.value)])
+            else:
+                return None
+        current = current.base_type
+
+    if not isinstance(current, xmlschema.validators.XsdAtomicBuiltin):
+        return None
+    builtin = current.local_name
+    if builtin not in _NUMERIC_BUILTINS and builtin not in _STRING_BUILTINS and builtin not in _OTHER_BUILTINS:
+        return None
+    if builtin not in _NUMERIC_BUILTINS and any(name in _RANGE_FACETS or name in _DIGIT_FACETS for name, _ in facets):
+        return None
+
+    return {
+        "builtin": builtin,
+        "whiteSpace": getattr(xsd_type, 'white_space', None) or 'preserve',
+        "enumerations": enumerations,
+        "patterns": patterns,
+        "facets": facets,
+    }
+
+
+def _normalizer(white_space: str) -> Callable[[str], str]:
+    if white_space == 'collapse':
+        return lambda value: ' '.join(value.split())
+    if white_space == 'replace':
+        return lambda value: value.replace('\t', ' ').replace('\n', ' ').replace('\r', ' ')
+    return lambda value: value
+
+
+def _count_digits(number: Decimal) -> Tuple[int, int]:
+    """Liczba cyfr części całkowitej i ułamkowej (jak w xmlschema, bez zer wiodących i końcowych)."""
+    sign, digits, exponent = number.normalize().as_tuple()
+    if digits == (0,):
+        return 0, 0
+    if exponent >= 0:
+        return len(digits) + exponent, 0
+    fraction = -exponent
+    return max(len(digits) - fraction, 0), fraction
+
+
+def _valid_date(match) -> bool:
+    year, month, day = int(match.group(1)), int(match.group(2)), int(match.group(3))
+    if year == 0 or not 1 <= month <= 12:
+        return False
+    return 1 <= day <= calendar.monthrange(2000 if calendar.isleap(abs(year)) else 2001, month)[1]
+
+
+def _valid_time(match) -> bool:
+    hour, minute, second = int(match.group(4)), int(match.group(5)), int(match.group(6))
+    return (hour < 24 and minute < 60 and second < 60) or (hour == 24 and minute == 0 and second == 0)
+
+
+def _builtin_parser(builtin: str) -> Callable[[str], Any]:
+    """Zwraca funkcję zamieniającą napis na wartość typu wbudowanego (ValueError przy błędzie)."""
+    if builtin in _NUMERIC_BUILTINS:
+        lexical_re = _DECIMAL_RE if builtin == 'decimal' else _INTEGER_RE
+        bounds = _INTEGER_RANGES.get(builtin)
+
+        def parse_number(value: str) -> Decimal:
+            if not lexical_re.match(value):
+                raise ValueError(f"Niepoprawna wartość liczbowa typu '{builtin}'.")
+            number = Decimal(value)
+            if bounds:
+                low, high = bounds
+                if (low is not None and number < low) or (high is not None and number > high):
+                    raise ValueError(f"Wartość poza zakresem typu '{builtin}'.")
+            return number
+        return parse_number
+
+    if builtin == 'boolean':
+        def parse_boolean(value: str) -> str:
+            if value not in ('true', 'false', '1', '0'):
+                raise ValueError("Dozwolone wartości logiczne: true, false, 1, 0.")
+            return value
+        return parse_boolean
+
+    if builtin in ('date', 'dateTime'):
+        lexical_re = _DATE_RE if builtin == 'date' else _DATETIME_RE
+        label = "daty (RRRR-MM-DD)" if builtin == 'date' else "daty i czasu (RRRR-MM-DDThh:mm:ss)"
+
+        def parse_date(value: str) -> str:
+            match = lexical_re.match(value)
+            if not match or not _valid_date(match) or (builtin == 'dateTime' and not _valid_time(match)):
+                raise ValueError(f"Niepoprawny format {label}.")
+            return value
+        return parse_date
+
+    return lambda value: value
+
+
+def compile_validator(spec: Dict[str, Any]) -> FieldValidator:
+    """
+    Kompiluje specyfikację z `build_validation_spec` do szybkiego predykatu.
+
+    Wzorce są kompilowane raz, granice liczbowe parsowane z góry, a kolejne
+    sprawdzenia łączone w listę funkcji wykonywanych po kolei.
+    """
+    builtin = spec["builtin"]
+    is_numeric = builtin in _NUMERIC_BUILTINS
+    normalize = _normalizer(spec["whiteSpace"])
+    parse = _builtin_parser(builtin)
+    checks: List[Callable[[str, Any], Optional[str]]] = []
+
+    for alternatives in spec["patterns"]:
+        compiled = [re.compile(p) for p in alternatives]
+
+        def check_pattern(text, value, compiled=compiled):
+            if not any(p.match(text) for p in compiled):
+                return "Wartość nie pasuje do wymaganego wzorca."
+        checks.append(check_pattern)
+
+    for allowed in spec["enumerations"]:
+        allowed_values = frozenset(Decimal(v) for v in allowed) if is_numeric else frozenset(allowed)
+
+        def check_enumeration(text, value, allowed_values=allowed_values):
+            if value not in allowed_values:
+                return "Wartość spoza listy dozwolonych wartości."
+        checks.append(check_enumeration)
+
+    for name, limit in spec["facets"]:
+        checks.append(_FACET_CHECKS[name](Decimal(limit) if name in _RANGE_FACETS else limit))
+
+    def validate(raw_value: str) -> Optional[str]:
+        text = normalize(raw_value)
+        try:
+            value = parse(text)
+        except (ValueError, InvalidOperation) as e:
+            return str(e)
+        for check in checks:
+            error = check(text, value)
+            if error:
+                return error
+        return None
+
+    return validate
+
+
+def _length_check(limit: int) -> Callable:
+    return lambda text, value: None if len(text) == limit else f"Wymagana długość: {limit} znaków."
+
+
+def _min_length_check(limit: int) -> Callable:
+    return lambda text, value: None if len(text) >= limit else f"Minimalna długość: {limit} znaków."
+
+
+def _max_length_check(limit: int) -> Callable:
+    return lambda text, value: None if len(text) <= limit else f"Maksymalna długość: {limit} znaków."
+
+
+def _total_digits_check(limit: int) -> Callable:
+    return lambda text, value: None if sum(_count_digits(value)) <= limit else f"Maksymalna liczba cyfr: {limit}."
+
+
+def _fraction_digits_check(limit: int) -> Callable:
+    return lambda text, value: None if _count_digits(value)[1] <= limit else f"Maksymalna liczba cyfr po przecinku: {limit}."
+
+
+def _min_inclusive_check(limit: Decimal) -> Callable:
+    return lambda text, value: None if value >= limit else f"Wartość musi być większa lub równa {limit}."
+
+
+def _max_inclusive_check(limit: Decimal) -> Callable:
+    return lambda text, value: None if value <= limit else f"Wartość musi być mniejsza lub równa {limit}."
+
+
+def _min_exclusive_check(limit: Decimal) -> Callable:
+    return lambda text, value: None if value > limit else f"Wartość musi być większa od {limit}."
+
+
+def _max_exclusive_check(limit: Decimal) -> Callable:
+    return lambda text, value: None if value < limit else f"Wartość musi być mniejsza od {limit}."
+
+
+_FACET_CHECKS = {
+    'length': _length_check,
+    'minLength': _min_length_check,
+    'maxLength': _max_length_check,
+    'totalDigits': _total_digits_check,
+    'fractionDigits': _fraction_digits_check,
+    'minInclusive': _min_inclusive_check,
+    'maxInclusive': _max_inclusive_check,
+    'minExclusive': _min_exclusive_check,
+    'maxExclusive': _max_exclusive_check,
+}
+
+
+def validate_field_value(field_def, value: str) -> Optional[str]:
+    """
+    Waliduje wartość pola: skompilowanym predykatem, a gdy typ nie jest obsługiwany
+    przez kompilator - przez xmlschema (`xsd_type_obj.validate`).
+    """
+    validator = field_def.field_type.validator
+    if validator is not None:
+        return validator(value)
+    xsd_type_obj = field_def.xsd_type_obj
+    if xsd_type_obj is None:
+        return None
+    try:
+        xsd_type_obj.validate(value)
+    except Exception as e:
+        return str(e).splitlines()[0]
+    return None
@@ -0,0 +1,131 @@
+# csire_message_studio/services/form_model.py
+import json
+import sys
+import weakref
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.field_validators import FieldValidator, compile_validator
+
+
+class StringTable:
+    """
+    Tablica współdzielonych napisów (ścieżki, nazwy, qname).
+
+    `intern()` zwraca kanoniczną instancję napisu, dzięki czemu powtarzające się
+    nazwy i qname w modelu formularza istnieją w pamięci raz. `add()` zwraca
+    indeks napisu, używany przy serializacji artefaktu struktury.
+    """
+    def __init__(self, strings: Optional[List[str]] = None):
+        self.strings: List[str] = strings if strings is not None else []
+        self._index: Dict[str, int] = {s: i for i, s in enumerate(self.strings)}
+
+    def add(self, value: str) -> int:
+        idx = self._index.get(value)
+        if idx is None:
+            idx = len(self.strings)
+            self.strings.append(value)
+            self._index[value] = idx
+        return idx
+
+    @staticmethod
+    def intern(value: Optional[str]) -> Optional[str]:
+        return sys.intern(value) if value else value
+
+
+class FieldType:
+    """
+    Współdzielony (flyweight) opis typu pola: nazwa typu XSD, typ bazowy,
+    ograniczenia i enumeracje. Pola o identycznym typie wskazują na ten sam obiekt.
+
+    `validation` to specyfikacja faset całego łańcucha typu (patrz services.field_validators),
+    kompilowana raz na typ do predykatu `validator`. Brak specyfikacji oznacza walidację przez xmlschema.
+    """
+    __slots__ = ('xsd_type', 'xsd_base_type', 'restrictions', 'enumerations', 'validation', 'validator', '__weakref__')
+
+    _pool: "weakref.WeakValueDictionary[Tuple, FieldType]" = weakref.WeakValueDictionary()
+
+    def __init__(self, xsd_type: str, xsd_base_type: str, restrictions: Dict[str, Any], enumerations: Tuple[str, ...],
+                 validation: Optional[Dict[str, Any]] = None):
+        self.xsd_type = xsd_type
+        self.xsd_base_type = xsd_base_type
+        self.restrictions = MappingProxyType(restrictions)
+        self.enumerations = enumerations
+        self.validation = validation
+        self.validator: Optional[FieldValidator] = compile_validator(validation) if validation else None
+
+    @classmethod
+    def get(cls, xsd_type: str, xsd_base_type: str, restrictions: Dict[str, Any], enumerations: Iterable[str],
+            validation: Optional[Dict[str, Any]] = None) -> "FieldType":
+        enumerations = tuple(StringTable.intern(e) for e in enumerations)
+        validation_key = json.dumps(validation, sort_keys=True) if validation else None
+        key = (xsd_type, xsd_base_type, tuple(sorted(restrictions.items())), enumerations, validation_key)
+        field_type = cls._pool.get(key)
+        if field_type is None:
+            field_type = cls(StringTable.intern(xsd_type), StringTable.intern(xsd_base_type), dict(restrictions),
+                             enumerations, validation)
+            cls._pool[key] = field_type
+        return field_type
+
+
+class FormField:
+    """
+    Pole formularza wygenerowane ze schematu XSD.
+
+    Model nie przechowuje referencji do widgetów - powiązania z GUI trzyma warstwa widoku.
+    """
+    __slots__ = ('name', 'qname', 'path', 'is_required', 'is_list', 'documentation',
+                 'field_type', '_xsd_type_obj', '_type_resolver')
+
+    def __init__(self, name, qname, path, xsd_type, is_required, is_list,
+                 restrictions, documentation, xsd_type_obj, enumerations,
+                 xsd_base_type="", type_resolver=None, validation=None):
+        self.name = StringTable.intern(name)
+        self.qname = StringTable.intern(qname)
+        self.path = StringTable.intern(path)
+        self.is_required = is_required
+        self.is_list = is_list
+        self.documentation = StringTable.intern(documentation)
+        self.field_type = FieldType.get(xsd_type, xsd_base_type, restrictions, enumerations, validation)
+        self._xsd_type_obj = xsd_type_obj
+        self._type_resolver: Optional[Callable[[str], Any]] = type_resolver
+
+    @property
+    def xsd_type(self) -> str:
+        return self.field_type.xsd_type
+
+    @property
+    def xsd_base_type(self) -> str:
+        return self.field_type.xsd_base_type
+
+    @property
+    def restrictions(self) -> MappingProxyType:
+        return self.field_type.restrictions
+
+    @property
+    def enumerations(self) -> Tuple[str, ...]:
+        return self.field_type.enumerations
+
+    @property
+    def xsd_type_obj(self):
+        """Typ xmlschema pola; dla struktury z artefaktu rozwiązywany leniwie przy pierwszym użyciu."""
+        if self._xsd_type_obj is None and self._type_resolver is not None:
+            self._xsd_type_obj = self._type_resolver(self.path)
+        return self._xsd_type_obj
+
+
+class FormSection:
+    """Sekcja formularza (element złożony) z niemutowalnymi krotkami pól i podsekcji."""
+    __slots__ = ('name', 'qname', 'path', 'min_occurs', 'max_occurs', 'fields', 'sub_sections')
+
+    def __init__(self, name, qname, path, min_occurs, max_occurs, fields, sub_sections):
+        self.name = StringTable.intern(name)
+        self.qname = StringTable.intern(qname)
+        self.path = StringTable.intern(path)
+        self.min_occurs = min_occurs
+        self.max_occurs = max_occurs
+        self.fields: Tuple[FormField, ...] = tuple(fields)
+        self.sub_sections: Tuple["FormSection", ...] = tuple(sub_sections)
+
+    def __repr__(self) -> str:
+        return f"FormSection(path='{self.path}', fields={len(self.fields)}, sub_sections={len(self.sub_sections)})"
@@ -0,0 +1,116 @@
+# csire_message_studio/services/form_structure_store.py
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from infra import config
+from infra.logger import get_logger
+from services.form_model import StringTable
+
+log = get_logger(__name__)
+
+# Zmiana formatu artefaktu wymusza jego ponowne wygenerowanie.
+FORM_STRUCTURE_FORMAT_VERSION = 3
+
+
+def serialize_structure(root_section, strings: StringTable) -> list:
+    """Zamienia drzewo FormSection/FormField na zwartą listę z indeksami do tablicy napisów."""
+    def encode_field(field) -> list:
+        return [
+            strings.add(field.name), strings.add(field.qname), strings.add(field.path),
+            strings.add(field.xsd_type), strings.add(field.xsd_base_type),
+            int(field.is_required), int(field.is_list),
+            dict(field.restrictions), field.documentation, list(field.enumerations),
+            field.field_type.validation,
+        ]
+
+    def encode_section(section) -> list:
+        return [
+            strings.add(section.name), strings.add(section.qname), strings.add(section.path),
+            section.min_occurs, section.max_occurs,
+            [encode_field(f) for f in section.fields],
+            [encode_section(s) for s in section.sub_sections],
+        ]
+
+    return encode_section(root_section)
+
+
+def deserialize_structure(data: list, strings: List[str], section_cls, field_cls,
+                          type_resolver: Callable[[str], Any]):
+    """Odtwarza drzewo FormSection/FormField z artefaktu bez udziału xmlschema."""
+    def decode_field(item: list):
+        name, qname, path, xsd_type, base_type, is_required, is_list, restrictions, documentation, enums, validation = item
+        return field_cls(
+            name=strings[name], qname=strings[qname], path=strings[path],
+            xsd_type=strings[xsd_type], is_required=bool(is_required), is_list=bool(is_list),
+            restrictions=restrictions, documentation=documentation, xsd_type_obj=None,
+            enumerations=enums, xsd_base_type=strings[base_type], type_resolver=type_resolver,
+            validation=validation,
+        )
+
+    def decode_section(item: list):
+        name, qname, path, min_occurs, max_occurs, fields, sub_sections = item
+        return section_cls(
+            name=strings[name], qname=strings[qname], path=strings[path],
+            min_occurs=min_occurs, max_occurs=max_occurs,
+            fields=[decode_field(f) for f in fields],
+            sub_sections=[decode_section(s) for s in sub_sections],
+        )
+
+    return decode_section(data)
+
+
+class FormStructureStore:
+    """
+    Dyskowy magazyn artefaktów struktury formularza (JSON), trzymany obok cache schematów.
+
+    Jeden plik odpowiada jednemu schematowi (kluczowanemu skrótem domknięcia importów)
+    i zawiera listę elementów globalnych, przestrzenie nazw schematu oraz zserializowane
+    drzewa dla każdego użytego elementu głównego.
+    """
+    def __init__(self, cache_dir: Path, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        artifact_file = self.cache_dir / f"{key}.json"
+        if not artifact_file.exists():
+            return None
+        try:
+            with artifact_file.open('r', encoding='utf-8') as f:
+                artifact = json.load(f)
+            if artifact.get("format") != FORM_STRUCTURE_FORMAT_VERSION:
+                log.info(f"Artefakt struktury '{artifact_file.name}' ma nieaktualny format. Zostanie wygenerowany ponownie.")
+                return None
+            return artifact
+        except Exception:
+            log.warning(f"Nie udało się wczytać artefaktu struktury formularza: {artifact_file}", exc_info=True)
+            return None
+
+    def save(self, key: str, artifact: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        artifact["format"] = FORM_STRUCTURE_FORMAT_VERSION
+        artifact_file = self.cache_dir / f"{key}.json"
+        with self._lock:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                prefix = key.rsplit('-', 1)[0]
+                for stale in self.cache_dir.glob(f"{prefix}-*.json"):
+                    if stale != artifact_file:
+                        stale.unlink()
+                tmp_file = artifact_file.with_suffix(f".{os.getpid()}.tmp")
+                with tmp_file.open('w', encoding='utf-8') as f:
+                    json.dump(artifact, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(tmp_file, artifact_file)
+                log.debug(f"Zapisano artefakt struktury formularza: {artifact_file}")
+            except Exception:
+                log.warning(f"Nie udało się zapisać artefaktu struktury formularza: {artifact_file}", exc_info=True)
+
+
+form_structure_store = FormStructureStore(config.FORM_STRUCTURE_CACHE_DIR, enabled=config.SCHEMA_CACHE_ENABLED)
@@ -0,0 +1,136 @@
+# csire_message_studio/services/message_generator.py
+import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from infra import config
+from infra.logger import get_logger
+from domain.rules.form_state import FillWorklist, FormState
+from domain.rules.rule_compiler import CompiledRuleSet, load_compiled_rules
+from domain.rules.rule_engine import RuleEngine, controlled_section_paths
+from services.data_generators import generate_valid_data, reset_address_generation_state
+
+log = get_logger(__name__)
+
+# Ile razy najwyżej wracamy do jednego pola ujawnionego lub wyczyszczonego przez reguły (jak w formularzu Tk).
+MAX_FILL_PASSES = 10
+
+
+def _normalize_code(code: str) -> str:
+    return code.replace('_', '.').strip('. ')
+
+
+def resolve_message(query: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Znajduje komunikat w SUPPORTED_PROCESSES po kodzie lub nazwie, np. "3.1.1", "3.1_1",
+    "3_1_1_1.xsd" albo pełnej nazwie z listy w GUI. Kod procesu (np. "3.1") wskazuje komunikat,
+    jeśli proces ma tylko jeden.
+
+    Returns:
+        Para (process_info, message_info).
+
+    Raises:
+        ValueError: Gdy nie znaleziono komunikatu lub wskazanie jest niejednoznaczne.
+    """
+    wanted = _normalize_code(query.removesuffix(".xsd"))
+    matches = []
+    for process_name, process_info in config.SUPPORTED_PROCESSES.items():
+        messages = process_info.get("messages", {})
+        process_keys = {process_name, _normalize_code(process_info.get("type_code", ""))}
+        for message_name, message_info in messages.items():
+            message_keys = {
+                message_name,
+                _normalize_code(message_info.get("type_code", "")),
+                _normalize_code(Path(message_info.get("xsd_file", "")).stem),
+            }
+            if "(" in message_name:
+                message_keys.add(message_name.rsplit("(", 1)[1].rstrip(")"))
+            if wanted in message_keys or query in message_keys or (len(messages) == 1 and wanted in process_keys):
+                matches.append((process_info, message_info))
+
+    if len(matches) != 1:
+        available = [f"{name} / {message}" for name, info in config.SUPPORTED_PROCESSES.items()
+                     for message in info.get("messages", {})]
+        reason = "niejednoznaczne" if matches else "nie znaleziono"
+        raise ValueError(f"Wskazanie komunikatu '{query}': {reason}. Dostępne: {available}")
+    return matches[0]
+
+
+def list_rule_sets(message_info: Dict[str, Any]) -> List[str]:
+    """Nazwy zestawów reguł (pliki JSON w katalogu reguł komunikatu), jak w liście wyboru w GUI."""
+    rules_dir_name = message_info.get("rules_dir_name")
+    if not rules_dir_name:
+        return []
+    rules_dir = config.MESSAGE_RULES_DIR / rules_dir_name
+    return sorted(p.stem for p in rules_dir.glob('*.json')) if rules_dir.is_dir() else []
+
+
+def load_rule_set(message_info: Dict[str, Any], rule_set: str) -> CompiledRuleSet:
+    """
+    Wczytuje skompilowany zestaw reguł `rule_set` dla komunikatu (z pamięci podręcznej kompilatora).
+
+    Raises:
+        FileNotFoundError: Gdy zestaw reguł nie istnieje.
+    """
+    rules_path = config.MESSAGE_RULES_DIR / message_info.get("rules_dir_name", "") / f"{rule_set}.json"
+    if not rules_path.is_file():
+        raise FileNotFoundError(f"Zestaw reguł '{rule_set}' nie istnieje. Dostępne: {list_rule_sets(message_info)}")
+    return load_compiled_rules(rules_path)
+
+
+class MessageGenerator:
+    """
+    Generator danych komunikatu bez GUI: odtwarza "Wypełnij danymi testowymi" z formularza Tk
+    na modelu FormState z tym samym silnikiem reguł i tymi samymi generatorami wartości.
+
+    Pola są wypełniane w kolejności schematu, a potem uzupełniane są tylko pola ujawnione
+    przez reguły (FillWorklist), aż stan się ustabilizuje. Pola ukryte regułą nie są wypełniane.
+    """
+    def __init__(self, parser, rules, process_info: Optional[Dict[str, Any]] = None,
+                 message_info: Optional[Dict[str, Any]] = None):
+        self.root_name = parser.get_root_element_name()
+        self.sections = parser.get_form_structure_for_element(self.root_name)
+        self._controlled = controlled_section_paths(rules)
+        self._fields = []
+        self._collect_fields(self.sections)
+        self.engine = RuleEngine(FormState(self.sections, self._controlled), rules, process_info, message_info)
+        self.rules = self.engine.rules
+
+    def _collect_fields(self, sections) -> None:
+        for section in sections:
+            self._fields.extend(section.fields)
+            self._collect_fields(section.sub_sections)
+
+    def new_state(self) -> FormState:
+        """Tworzy stan formularza po zastosowaniu wszystkich reguł (jak tuż po zbudowaniu formularza)."""
+        state = FormState(self.sections, self._controlled)
+        self.engine.state = state
+        self.engine.apply_all_rules()
+        return state
+
+    def populate(self, state: FormState) -> int:
+        """Wypełnia puste, edytowalne pola wygenerowanymi danymi. Zwraca liczbę wypełnionych pól."""
+        reset_address_generation_state()
+        total = 0
+        with FillWorklist(state, (f.path for f in self._fields), MAX_FILL_PASSES) as worklist:
+            for path in worklist:
+                if state.get_value(path) or not state.is_editable(path):
+                    continue
+                field_state = state.fields[path]
+                value = generate_valid_data(field_state.field_def, self.rules, field_state.choices)
+                if value is not None:
+                    self.engine.set_value(path, value)
+                    total += 1
+        if worklist.exhausted:
+            log.warning(f"Przekroczono maksymalną liczbę odwiedzin pól: {sorted(worklist.exhausted)}. Stan formularza nie ustabilizował się.")
+        return total
+
+    def generate(self) -> Dict[str, Any]:
+        """Zwraca dane jednego komunikatu w formacie dla XmlBuilder ({element_główny: {...}})."""
+        state = self.new_state()
+        self.populate(state)
+        data = state.to_dict(self.sections)
+        header = data.get(self.root_name, {}).get("Header")
+        if isinstance(header, dict):
+            header["MessageTimestamp"] = datetime.datetime.now().replace(microsecond=0).isoformat()
+        return data
@@ -0,0 +1,260 @@
+# csire_message_studio/services/schema_cache.py
+import hashlib
+import os
+import pickle
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import xmlschema
+
+from infra import config
+from infra.logger import get_logger
+
+log = get_logger(__name__)
+
+# Zmiana formatu pliku cache wymusza przebudowę wszystkich wpisów.
+CACHE_FORMAT_VERSION = 1
+
+_SCHEMA_LOCATION_RE = re.compile(
+    rb'<(?:[\w.-]+:)?(?:import|include|redefine|override)\b[^>]*?\bschemaLocation\s*=\s*["\']([^"\']+)["\']',
+    re.DOTALL
+)
+
+_IMPORT_LOCATION_RE = re.compile(
+    rb'<(?:[\w.-]+:)?import\b[^>]*?\bschemaLocation\s*=\s*["\']([^"\']+)["\']',
+    re.DOTALL
+)
+
+SchemaSource = Union[str, Path]
+
+# Globalne mapy komponentów schematu-rodzica, do których schemat potomny odwołuje się po nazwie.
+_SHARED_COMPONENT_MAPS = ('types', 'attributes', 'attribute_groups', 'groups', 'notations', 'elements', 'identities')
+
+
+def find_imported_schemas(xsd_path: SchemaSource) -> List[Path]:
+    """Zwraca lokalne pliki XSD importowanych bezpośrednio (xs:import) przestrzeni nazw."""
+    path = Path(xsd_path).resolve()
+    locations = _IMPORT_LOCATION_RE.findall(path.read_bytes())
+    return sorted({(path.parent / loc.decode('utf-8')).resolve() for loc in locations if b'://' not in loc})
+
+
+def _shared_components(parent: xmlschema.XMLSchema) -> Dict[Tuple, Any]:
+    """Obiekty schematu-rodzica (schematy, mapy globalne, komponenty globalne) z ich trwałymi kluczami."""
+    shared: Dict[Tuple, Any] = {('maps',): parent.maps}
+    for schema in parent.maps.iter_schemas():
+        shared[('schema', schema.url or schema.name)] = schema
+    for map_name in _SHARED_COMPONENT_MAPS:
+        components = getattr(parent.maps, map_name)
+        shared[('map', map_name)] = components
+        for qname, component in components.items():
+            if isinstance(component, xmlschema.validators.XsdComponent):
+                shared[(map_name, qname)] = component
+    return shared
+
+
+class _ChildSchemaPickler(pickle.Pickler):
+    """Zapisuje schemat potomny bez kopii rodzica - obiekty rodzica zastępuje ich kluczami."""
+    def __init__(self, file, parent: xmlschema.XMLSchema):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._keys = {id(obj): key for key, obj in _shared_components(parent).items()}
+
+    def persistent_id(self, obj):
+        return self._keys.get(id(obj))
+
+
+class _ChildSchemaUnpickler(pickle.Unpickler):
+    """Odtwarza schemat potomny, podstawiając w miejsce kluczy obiekty rodzica obecnego w pamięci."""
+    def __init__(self, file, parent: xmlschema.XMLSchema):
+        super().__init__(file)
+        self._shared = _shared_components(parent)
+
+    def persistent_load(self, key):
+        return self._shared[tuple(key)]
+
+
+class SchemaCache:
+    """
+    Trwały (dyskowy) cache skompilowanych obiektów xmlschema.XMLSchema.
+
+    Kluczem wpisu jest skrót SHA-256 treści całego domknięcia importów/inkludów
+    schematu, więc zmiana dowolnego importowanego pliku XSD automatycznie
+    unieważnia wpis. Zbudowany schemat jest zapisywany jako pickle.
+
+    Schemat zbudowany z rodzicem (`parent`, np. wspólne komponenty z rejestru schematów)
+    jest zapisywany bez kopii rodzica: obiekty rodzica są w pliku zastąpione kluczami
+    i przy odczycie wskazują na przekazany rodzic, więc jego komponenty pozostają wspólne.
+    Klucz wpisu obejmuje wtedy także pliki, z których zbudowano rodzica.
+    """
+    def __init__(self, cache_dir: Path, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.load_time = 0.0
+        self.build_time = 0.0
+        self._digests: Dict[Path, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, source: Union[SchemaSource, List[SchemaSource]], parent: Optional[xmlschema.XMLSchema] = None,
+             **schema_kwargs) -> xmlschema.XMLSchema:
+        """
+        Zwraca schemat z cache lub buduje go i zapisuje na dysku.
+
+        Args:
+            source: Ścieżka do pliku XSD lub lista ścieżek (schemat złożony).
+            parent: Schemat-rodzic (xmlschema `parent`), którego komponenty schemat współdzieli.
+            **schema_kwargs: Dodatkowe argumenty przekazywane do xmlschema.XMLSchema.
+        """
+        sources = [Path(s).resolve() for s in (source if isinstance(source, (list, tuple)) else [source])]
+        if parent is not None:
+            schema_kwargs["parent"] = parent
+        if not self.enabled:
+            return self._build(sources, schema_kwargs)
+
+        parent_sources = self._parent_sources(parent) if parent is not None else []
+        fingerprint = self.fingerprint(sources, parent_sources)
+        cache_file = self._cache_file_for(sources, fingerprint, child=parent is not None)
+
+        if cache_file.exists():
+            start = time.perf_counter()
+            try:
+                with cache_file.open('rb') as f:
+                    schema = pickle.load(f) if parent is None else _ChildSchemaUnpickler(f, parent).load()
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.hits += 1
+                    self.load_time += elapsed
+                log.info(f"Schemat '{sources[0].name}' wczytany z cache w {elapsed * 1000:.1f} ms.")
+                return schema
+            except Exception:
+                log.warning(f"Uszkodzony wpis cache schematu '{cache_file.name}'. Przebudowuję.", exc_info=True)
+                self._safe_unlink(cache_file)
+
+        with self._lock:
+            self.misses += 1
+        schema = self._build(sources, schema_kwargs)
+        self._store(schema, cache_file, parent)
+        return schema
+
+    def fingerprint(self, sources: List[Path], parent_sources: Optional[List[Path]] = None) -> str:
+        """Liczy skrót treści domknięcia importów (wraz z wersjami bibliotek i plikami schematu-rodzica)."""
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_FORMAT_VERSION}|xmlschema={xmlschema.__version__}|py={sys.version_info[:2]}".encode())
+        if parent_sources:
+            digest.update(b"parent|")
+            for path in self.collect_import_closure(parent_sources):
+                digest.update(str(path).encode('utf-8'))
+                digest.update(self._file_digest(path).encode())
+            digest.update(b"|child|")
+        for path in self.collect_import_closure(sources):
+            digest.update(str(path).encode('utf-8'))
+            digest.update(self._file_digest(path).encode())
+        return digest.hexdigest()
+
+    def collect_import_closure(self, sources: List[Path]) -> List[Path]:
+        """Zwraca posortowaną listę wszystkich plików XSD osiągalnych przez import/include."""
+        seen = set()
+        stack = list(sources)
+        while stack:
+            path = stack.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            try:
+                content = path.read_bytes()
+            except OSError:
+                log.warning(f"Nie można odczytać pliku XSD z domknięcia importów: {path}")
+                continue
+            for location in _SCHEMA_LOCATION_RE.findall(content):
+                location = location.decode('utf-8')
+                if '://' in location:
+                    continue
+                stack.append((path.parent / location).resolve())
+        return sorted(seen)
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "load_time": self.load_time,
+            "build_time": self.build_time,
+        }
+
+    def clear(self) -> None:
+        if self.cache_dir.exists():
+            for cache_file in self.cache_dir.glob('*.pickle'):
+                self._safe_unlink(cache_file)
+        log.info(f"Wyczyszczono cache schematów w '{self.cache_dir}'.")
+
+    def _build(self, sources: List[Path], schema_kwargs: Dict) -> xmlschema.XMLSchema:
+        start = time.perf_counter()
+        source = [str(p) for p in sources] if len(sources) > 1 else str(sources[0])
+        schema_kwargs.setdefault("base_url", str(sources[0]))
+        schema = xmlschema.XMLSchema(source, **schema_kwargs)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.build_time += elapsed
+        log.info(f"Schemat '{sources[0].name}' zbudowany przez xmlschema w {elapsed * 1000:.1f} ms.")
+        return schema
+
+    @staticmethod
+    def _parent_sources(parent: xmlschema.XMLSchema) -> List[Path]:
+        """Lokalne pliki XSD, z których zbudowano schemat-rodzica (bez metaschematów xmlschema)."""
+        sources = set()
+        for schema in parent.maps.iter_schemas():
+            if schema.meta_schema is None or not schema.url:
+                continue
+            url = urlparse(schema.url)
+            if url.scheme in ('', 'file') or len(url.scheme) == 1:  # jednoliterowy schemat to dysk Windows
+                sources.add(Path(url2pathname(url.path) if url.scheme == 'file' else schema.url).resolve())
+        return sorted(sources)
+
+    def _store(self, schema: xmlschema.XMLSchema, cache_file: Path, parent: Optional[xmlschema.XMLSchema] = None) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for stale in self.cache_dir.glob(f"{cache_file.name.rsplit('-', 1)[0]}-*.pickle"):
+                self._safe_unlink(stale)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with tmp_file.open('wb') as f:
+                if parent is None:
+                    pickle.dump(schema, f, protocol=pickle.HIGHEST_PROTOCOL)
+                else:
+                    _ChildSchemaPickler(f, parent).dump(schema)
+            os.replace(tmp_file, cache_file)
+            log.debug(f"Zapisano schemat w cache: {cache_file}")
+        except Exception:
+            log.warning(f"Nie udało się zapisać schematu w cache: {cache_file}", exc_info=True)
+
+    def _cache_file_for(self, sources: List[Path], fingerprint: str, child: bool = False) -> Path:
+        name = sources[0].stem if len(sources) == 1 else f"{sources[0].stem}+{len(sources) - 1}"
+        if child:
+            name = f"{name}.child"
+        return self.cache_dir / f"{name}-{fingerprint[:20]}.pickle"
+
+    def _file_digest(self, path: Path) -> str:
+        try:
+            stat = path.stat()
+        except OSError:
+            return "missing"
+        cached = self._digests.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        file_digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        self._digests[path] = (stat.st_mtime_ns, stat.st_size, file_digest)
+        return file_digest
+
+    @staticmethod
+    def _safe_unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+schema_cache = SchemaCache(config.SCHEMA_CACHE_DIR, enabled=config.SCHEMA_CACHE_ENABLED)
@@ -0,0 +1,106 @@
+# csire_message_studio/services/schema_prewarmer.py
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from infra import config
+from infra.logger import get_logger
+from services.schema_registry import SchemaRegistry, schema_registry
+
+log = get_logger(__name__)
+
+
+def default_schema_names() -> List[str]:
+    """Zwraca nazwy wszystkich schematów z SUPPORTED_PROCESSES i SYSTEM_MESSAGES (bez duplikatów)."""
+    names = list(config.SYSTEM_MESSAGES.keys())
+    for process_info in config.SUPPORTED_PROCESSES.values():
+        for message_info in process_info.get("messages", {}).values():
+            xsd_file = message_info.get("xsd_file")
+            if xsd_file and xsd_file not in names:
+                names.append(xsd_file)
+    return names
+
+
+class SchemaPrewarmer:
+    """
+    Wstępne ładowanie schematów XSD w tle, uruchamiane przy starcie aplikacji.
+
+    Każdy schemat jest ładowany do rejestru (z cache lub kompilowany), a następnie
+    budowana jest struktura formularza elementu głównego i walidator. Kontrolery
+    sprawdzają `is_ready()` i tylko wtedy, gdy użytkownik wyprzedzi rozgrzewanie,
+    czekają na wynik (`run_when_ready` / `wait`).
+    """
+    def __init__(self, registry: SchemaRegistry, max_workers: int = 2):
+        self.registry = registry
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def start(self, names: Optional[List[str]] = None) -> None:
+        """Zleca rozgrzanie podanych schematów (domyślnie wszystkich znanych z konfiguracji)."""
+        names = names if names is not None else default_schema_names()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="schema-prewarm")
+            for name in names:
+                if name not in self._futures:
+                    self._futures[name] = self._executor.submit(self._warm, name)
+        log.info(f"Rozpoczęto wstępne ładowanie schematów w tle: {names}")
+
+    def shutdown(self) -> None:
+        """Anuluje oczekujące zadania (np. przy zamykaniu aplikacji)."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def is_ready(self, name: str) -> bool:
+        """True, jeśli schemat nie jest rozgrzewany albo rozgrzewanie już się zakończyło."""
+        future = self._futures.get(name)
+        return future is None or future.done()
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> None:
+        """Blokuje do zakończenia rozgrzewania schematu. Błędy rozgrzewania są tylko logowane."""
+        future = self._futures.get(name)
+        if future is None or future.cancelled():
+            return
+        try:
+            future.result(timeout=timeout)
+        except Exception:
+            pass
+
+    def run_when_ready(self, widget, name: str, callback: Callable[[], None], poll_ms: int = 100) -> None:
+        """
+        Wywołuje `callback` w wątku GUI, gdy schemat jest gotowy.
+
+        Jeśli rozgrzewanie już się zakończyło, callback jest wywoływany natychmiast;
+        w przeciwnym razie stan jest sprawdzany cyklicznie przez `widget.after()`,
+        więc pętla zdarzeń Tk nie jest blokowana.
+        """
+        if self.is_ready(name):
+            callback()
+        else:
+            widget.after(poll_ms, lambda: self.run_when_ready(widget, name, callback, poll_ms))
+
+    def get_progress(self) -> Tuple[int, int]:
+        """Zwraca krotkę (liczba_zakończonych, liczba_wszystkich)."""
+        futures = list(self._futures.values())
+        return sum(1 for f in futures if f.done()), len(futures)
+
+    def _warm(self, name: str) -> float:
+        start = time.perf_counter()
+        try:
+            parser = self.registry.get_parser(name)
+            parser.get_form_structure_for_element(parser.get_root_element_name())
+            self.registry.get_validator(name)
+        except Exception:
+            log.error(f"Wstępne ładowanie schematu '{name}' nie powiodło się.", exc_info=True)
+            raise
+        elapsed = time.perf_counter() - start
+        log.info(f"Schemat '{name}' rozgrzany w tle w {elapsed * 1000:.1f} ms.")
+        return elapsed
+
+
+schema_prewarmer = SchemaPrewarmer(schema_registry, max_workers=config.SCHEMA_PREWARM_WORKERS)
@@ -0,0 +1,199 @@
+# csire_message_studio/services/schema_registry.py
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import xmlschema
+
+from domain.validation.xsd_validator import XsdValidator
+from infra import config
+from infra.logger import get_logger
+from services.schema_cache import SchemaCache, schema_cache, find_imported_schemas
+from services.xsd_parser import XsdParser
+
+log = get_logger(__name__)
+
+
+class SchemaEntry:
+    """Schemat komunikatu w rejestrze wraz z parserem i (leniwie tworzonym) walidatorem."""
+    def __init__(self, name: str, xsd_path: Path):
+        self.name = name
+        self.xsd_path = xsd_path
+        self.parser: Optional[XsdParser] = None
+        self.components_key: Optional[Tuple[Path, ...]] = None
+        self.refcount = 0
+        self._validators: Dict[str, XsdValidator] = {}
+
+    @property
+    def schema(self) -> xmlschema.XMLSchema:
+        return self.parser.schema
+
+    @property
+    def validator(self) -> XsdValidator:
+        return self.get_validator()
+
+    def get_validator(self, backend: Optional[str] = None) -> XsdValidator:
+        """Zwraca walidator dla silnika (domyślnie z konfiguracji); każdy silnik jest tworzony raz na schemat."""
+        backend = backend or config.XSD_VALIDATION_BACKEND
+        validator = self._validators.get(backend)
+        if validator is None:
+            validator = self._validators.setdefault(backend, XsdValidator(self.parser.schema, backend=backend))
+        return validator
+
+
+class SchemaRegistry:
+    """
+    Procesowy rejestr schematów XSD współdzielony przez kontrolery i narzędzia bezokienkowe.
+
+    Schematy importowanych komponentów (np. businessDataTypes.xsd, technical.xsd) są
+    ładowane raz (przez SchemaCache) i używane jako rodzic wszystkich schematów
+    komunikatów, więc ich typy istnieją w pamięci w jednej kopii. Schematy komunikatów też
+    trafiają do SchemaCache - zapisane bez kopii komponentów, wskazują po odczycie na
+    komponenty załadowane w rejestrze. Wpisy są zliczane
+    referencyjnie; nieużywane wpisy trafiają do kolejki LRU ograniczonej przez `max_idle`.
+    """
+    def __init__(self, cache: SchemaCache, max_idle: int = 4):
+        self.cache = cache
+        self.max_idle = max_idle
+        self._entries: Dict[str, SchemaEntry] = {}
+        self._idle: "OrderedDict[str, SchemaEntry]" = OrderedDict()
+        self._components: Dict[Tuple[Path, ...], xmlschema.XMLSchema] = {}
+        self._component_refs: Dict[Tuple[Path, ...], int] = {}
+        self._lock = threading.RLock()
+        self._components_lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def acquire(self, name: str) -> SchemaEntry:
+        """Zwraca wpis schematu (ładując go w razie potrzeby) i zwiększa licznik referencji."""
+        return self._get_or_load(name, acquire=True)
+
+    def release(self, name: str) -> None:
+        """Zmniejsza licznik referencji; nieużywany wpis może zostać usunięty z pamięci (LRU)."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if not entry or entry.refcount == 0:
+                log.warning(f"Próba zwolnienia schematu '{name}', który nie jest używany.")
+                return
+            entry.refcount -= 1
+            if entry.refcount == 0:
+                self._idle[name] = entry
+                self._evict_idle()
+
+    def get_parser(self, name: str) -> XsdParser:
+        return self._get_or_load(name).parser
+
+    def get_validator(self, name: str, backend: Optional[str] = None) -> XsdValidator:
+        return self._get_or_load(name).get_validator(backend)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "loaded": len(self._entries),
+                "idle": len(self._idle),
+                "components": len(self._components),
+            }
+
+    def resolve_xsd_path(self, name: str) -> Path:
+        """Zamienia nazwę schematu (klucz SYSTEM_MESSAGES, nazwę pliku lub ścieżkę) na ścieżkę XSD."""
+        if name in config.SYSTEM_MESSAGES:
+            return config.XSD_INBOUND_DIR / config.SYSTEM_MESSAGES[name]["xsd_file"]
+        for directory in (config.XSD_OUTBOUND_DIR, config.XSD_INBOUND_DIR):
+            candidate = directory / name
+            if candidate.exists():
+                return candidate
+        candidate = Path(name)
+        if candidate.exists():
+            return candidate
+        raise KeyError(f"Nie znaleziono schematu XSD o nazwie '{name}'.")
+
+    def _get_or_load(self, name: str, acquire: bool = False) -> SchemaEntry:
+        """
+        Zwraca wpis schematu, ładując go w razie potrzeby. Z `acquire` licznik referencji jest
+        zwiększany w tej samej sekcji krytycznej, w której wpis jest znajdowany lub dodawany,
+        więc _evict_idle() w innym wątku nie usunie wpisu, zanim wywołujący go przejmie.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry:
+                self._touch(name, entry, acquire)
+                return entry
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry:
+                    self._touch(name, entry, acquire)
+                    return entry
+            entry = self._load_entry(name)
+            with self._lock:
+                self._entries[name] = entry
+                self._idle[name] = entry
+                self._touch(name, entry, acquire)
+                self._evict_idle()
+            return entry
+
+    def _touch(self, name: str, entry: SchemaEntry, acquire: bool) -> None:
+        """Przejmuje wpis (acquire) albo odświeża jego pozycję w kolejce LRU. Wywoływane pod self._lock."""
+        if acquire:
+            entry.refcount += 1
+            self._idle.pop(name, None)
+        elif name in self._idle:
+            self._idle.move_to_end(name)
+
+    def _load_entry(self, name: str) -> SchemaEntry:
+        xsd_path = self.resolve_xsd_path(name).resolve()
+        entry = SchemaEntry(name, xsd_path)
+        # Sam schemat jest ładowany dopiero przy pierwszym dostępie - struktura formularza
+        # może zostać odczytana z artefaktu bez udziału xmlschema.
+        entry.parser = XsdParser(str(xsd_path), schema_loader=lambda e=entry: self._load_schema(e))
+        log.info(f"Rejestr schematów: zarejestrowano '{name}' ({xsd_path.name}).")
+        return entry
+
+    def _load_schema(self, entry: SchemaEntry) -> xmlschema.XMLSchema:
+        imports = find_imported_schemas(entry.xsd_path)
+        if not imports:
+            return self.cache.load(entry.xsd_path)
+
+        components_key = tuple(imports)
+        components = self._acquire_components(components_key)
+        try:
+            schema = self.cache.load(entry.xsd_path, parent=components)
+        except Exception:
+            self._release_components(components_key)
+            raise
+        entry.components_key = components_key
+        log.info(f"Rejestr schematów: załadowano schemat '{entry.name}'.")
+        return schema
+
+    def _acquire_components(self, key: Tuple[Path, ...]) -> xmlschema.XMLSchema:
+        with self._components_lock:
+            with self._lock:
+                components = self._components.get(key)
+            if components is None:
+                components = self.cache.load(list(key))
+                log.info(f"Rejestr schematów: załadowano współdzielone komponenty {[p.name for p in key]}.")
+            with self._lock:
+                self._components[key] = components
+                self._component_refs[key] = self._component_refs.get(key, 0) + 1
+            return components
+
+    def _release_components(self, key: Tuple[Path, ...]) -> None:
+        with self._lock:
+            self._component_refs[key] -= 1
+            if self._component_refs[key] == 0:
+                del self._component_refs[key]
+                del self._components[key]
+                log.info(f"Rejestr schematów: zwolniono współdzielone komponenty {[p.name for p in key]}.")
+
+    def _evict_idle(self) -> None:
+        while len(self._idle) > self.max_idle:
+            name, entry = self._idle.popitem(last=False)
+            del self._entries[name]
+            if entry.components_key:
+                self._release_components(entry.components_key)
+            log.info(f"Rejestr schematów: usunięto nieużywany schemat '{name}' (LRU).")
+
+
+schema_registry = SchemaRegistry(schema_cache, max_idle=config.SCHEMA_REGISTRY_MAX_IDLE)
@@ -0,0 +1,60 @@
+# csire_message_studio/services/xml_bindings.py
+from typing import Dict, Iterable, Optional
+
+from infra.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class XmlBindings:
+    """
+    Powiązania nazw dla XmlBuilder: mapa {ścieżka_kropkowa: QName} oraz mapa przestrzeni nazw.
+
+    Budowane raz dla pary (schemat, element główny) i przechowywane razem ze schematem
+    (w XsdParser). Kluczem jest pełna ścieżka elementu, więc elementy o tej samej nazwie
+    lokalnej w różnych sekcjach nie kolidują ze sobą.
+    """
+    __slots__ = ('root_name', 'qnames', 'nsmap')
+
+    def __init__(self, root_name: str, qnames: Dict[str, str], nsmap: Dict[Optional[str], str]):
+        self.root_name = root_name
+        self.qnames = qnames
+        self.nsmap = nsmap
+
+    @classmethod
+    def from_structure(cls, root_section, namespaces: Dict[str, str]) -> "XmlBindings":
+        """
+        Args:
+            root_section: Sekcja elementu głównego (FormSection) z pełnym drzewem podsekcji.
+            namespaces: Przestrzenie nazw schematu w postaci {prefix: URI} (jak XMLSchema.namespaces).
+        """
+        qnames: Dict[str, str] = {}
+
+        def collect(section) -> None:
+            qnames[section.path] = section.qname
+            for field in section.fields:
+                qnames[field.path] = field.qname
+            for sub_section in section.sub_sections:
+                collect(sub_section)
+
+        collect(root_section)
+        return cls(root_section.name, qnames, cls.build_nsmap(namespaces))
+
+    @staticmethod
+    def build_nsmap(namespaces: Dict[str, str]) -> Dict[Optional[str], str]:
+        """
+        Zamienia przestrzenie nazw schematu na nsmap dla lxml (domyślna pod kluczem None,
+        bez 'xs' i bez zawsze zadeklarowanego prefiksu 'xml').
+        """
+        nsmap: Dict[Optional[str], str] = dict(namespaces)
+        if '' in nsmap:
+            nsmap[None] = nsmap.pop('')
+        nsmap.pop('xs', None)
+        nsmap.pop('xml', None)
+        return nsmap
+
+    def qname_for(self, path: str) -> Optional[str]:
+        return self.qnames.get(path)
+
+    def paths(self) -> Iterable[str]:
+        return self.qnames.keys()
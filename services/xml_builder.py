@@ -1,8 +1,11 @@
 # csire_message_studio/services/xml_builder.py
+from collections.abc import Iterator
 from lxml import etree
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, BinaryIO, Union
+from pathlib import Path
 
 from infra.logger import get_logger
+from services.xml_bindings import XmlBindings
 
 log = get_logger(__name__)
 
@@ -10,35 +13,29 @@ class XmlBuilder:
     """
     Buduje dokument XML na podstawie zagnieżdżonego słownika Python,
     poprawnie obsługując złożone przestrzenie nazw (namespaces).
+
+    `build` tworzy całe drzewo w pamięci i zwraca napis; `write` zapisuje dokument
+    strumieniowo (lxml.etree.xmlfile) do pliku lub strumienia binarnego.
     """
-    def build(self, data: Dict[str, Any], qname_map: Dict[str, str], nsmap: Dict[str, str]) -> str:
+    def build(self, data: Dict[str, Any], bindings: XmlBindings) -> str:
         """
         Główna metoda budująca XML.
 
         Args:
             data: Słownik z danymi (klucze to nazwy lokalne).
-            qname_map: Mapa z {nazwa_lokalna: pełna_nazwa_kwalifikowana}.
-            nsmap: Mapa z {prefix: URI_przestrzeni_nazw}.
+            bindings: Powiązania {ścieżka_kropkowa: QName} i mapa przestrzeni nazw schematu
+                (XsdParser.get_xml_bindings), budowane raz na schemat.
 
         Returns:
             Sformatowany ciąg znaków XML.
         """
-        if not data or len(data) != 1:
-            msg = "Dane wejściowe dla XmlBuilder muszą być słownikiem z jednym kluczem głównym."
-            log.error(msg)
-            raise ValueError(msg)
-
-        root_name = list(data.keys())[0]
+        root_name, root_qname = self._resolve_root(data, bindings)
         root_data = data[root_name]
         
         log.debug(f"Rozpoczynanie budowania XML dla elementu głównego: '{root_name}'")
         
-        root_qname = qname_map.get(root_name)
-        if not root_qname:
-            raise ValueError(f"Nie znaleziono kwalifikowanej nazwy dla elementu głównego '{root_name}'")
-        
-        root_element = etree.Element(root_qname, nsmap=nsmap)
-        self._build_recursive(root_element, root_data, qname_map)
+        root_element = etree.Element(root_qname, nsmap=bindings.nsmap)
+        self._build_recursive(root_element, root_data, root_name, bindings)
 
         xml_string = etree.tostring(
             root_element,
@@ -50,23 +47,92 @@ class XmlBuilder:
         log.info(f"Pomyślnie zbudowano dokument XML dla '{root_name}'.")
         return xml_string
 
-    def _build_recursive(self, parent_element: etree.Element, data: Any, qname_map: Dict[str, str]):
+    def write(self, data: Dict[str, Any], bindings: XmlBindings, output: Union[str, Path, BinaryIO],
+              pretty_print: bool = True) -> None:
+        """
+        Strumieniowo zapisuje dokument XML do pliku lub strumienia binarnego.
+
+        Elementy są zapisywane od razu podczas przechodzenia po danych, bez budowania drzewa,
+        więc zużycie pamięci nie rośnie z rozmiarem komunikatu. Sekcje wielokrotne mogą być
+        podane jako iterator/generator - instancje są wtedy pobierane dopiero przy zapisie.
+
+        Args:
+            data: Słownik z danymi (klucze to nazwy lokalne).
+            bindings: Powiązania QName i przestrzeni nazw (jak w `build`).
+            output: Ścieżka pliku albo strumień binarny otwarty do zapisu.
+            pretty_print: Czy wcinać elementy (wynik jak w `build`).
+        """
+        root_name, root_qname = self._resolve_root(data, bindings)
+        log.debug(f"Rozpoczynanie strumieniowego zapisu XML dla elementu głównego: '{root_name}'")
+
+        output = str(output) if isinstance(output, Path) else output
+        with etree.xmlfile(output, encoding="UTF-8") as xf:
+            xf.write_declaration()
+            with xf.element(root_qname, nsmap=bindings.nsmap):
+                self._write_recursive(xf, data[root_name], root_name, bindings, 1 if pretty_print else None)
+
+        log.info(f"Pomyślnie zapisano strumieniowo dokument XML dla '{root_name}'.")
+
+    def _resolve_root(self, data: Dict[str, Any], bindings: XmlBindings):
+        if not data or len(data) != 1:
+            msg = "Dane wejściowe dla XmlBuilder muszą być słownikiem z jednym kluczem głównym."
+            log.error(msg)
+            raise ValueError(msg)
+
+        root_name = next(iter(data))
+        root_qname = bindings.qname_for(root_name)
+        if not root_qname:
+            raise ValueError(f"Nie znaleziono kwalifikowanej nazwy dla elementu głównego '{root_name}'")
+        return root_name, root_qname
+
+    def _write_recursive(self, xf, data: Any, path: str, bindings: XmlBindings, depth: Optional[int]):
+        """
+        Rekurencyjnie zapisuje elementy do strumienia xmlfile (`depth` None = bez wcięć).
+        """
+        if not isinstance(data, dict):
+            if data is not None:
+                xf.write(str(data))
+            return
+
+        indent = "\n" + "  " * depth if depth is not None else None
+        child_depth = depth + 1 if depth is not None else None
+        wrote_children = False
+        for key, value in data.items():
+            child_path = f"{path}.{key}"
+            qname = bindings.qname_for(child_path)
+            if not qname:
+                log.warning(f"Nie znaleziono QName dla ścieżki '{child_path}', używam nazwy lokalnej. Może to prowadzić do błędów walidacji.")
+                qname = key
+
+            items = value if isinstance(value, (list, tuple, Iterator)) else (value,)
+            for item in items:
+                if indent:
+                    xf.write(indent)
+                with xf.element(qname):
+                    self._write_recursive(xf, item, child_path, bindings, child_depth)
+                wrote_children = True
+
+        if indent and wrote_children:
+            xf.write(indent[:-2])
+
+    def _build_recursive(self, parent_element: etree.Element, data: Any, path: str, bindings: XmlBindings):
         """
         Rekurencyjnie buduje drzewo XML.
         """
         if isinstance(data, dict):
             for key, value in data.items():
-                qname = qname_map.get(key)
+                child_path = f"{path}.{key}"
+                qname = bindings.qname_for(child_path)
                 if not qname:
-                    log.warning(f"Nie znaleziono QName dla klucza '{key}', używam nazwy lokalnej. Może to prowadzić do błędów walidacji.")
+                    log.warning(f"Nie znaleziono QName dla ścieżki '{child_path}', używam nazwy lokalnej. Może to prowadzić do błędów walidacji.")
                     qname = key
                 
                 if isinstance(value, list):
                     for item in value:
                         child_element = etree.SubElement(parent_element, qname)
-                        self._build_recursive(child_element, item, qname_map)
+                        self._build_recursive(child_element, item, child_path, bindings)
                 else:
                     child_element = etree.SubElement(parent_element, qname)
-                    self._build_recursive(child_element, value, qname_map)
+                    self._build_recursive(child_element, value, child_path, bindings)
         elif data is not None:
             parent_element.text = str(data)
\ No newline at end of file
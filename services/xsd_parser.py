@@ -1,48 +1,85 @@
 # csire_message_studio/services/xsd_parser.py
 
+import threading
 import xmlschema
-from collections import namedtuple
-from typing import List, Dict, Any, Optional
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
 
 from infra.logger import get_logger
+from services.schema_cache import schema_cache
+from services.form_model import FormField, FormSection, StringTable
+from services.field_validators import build_validation_spec
+from services.xml_bindings import XmlBindings
+from services.form_structure_store import form_structure_store, serialize_structure, deserialize_structure
 
 log = get_logger(__name__)
 
-class FormField:
-    def __init__(self, name, qname, path, xsd_type, is_required, is_list,
-                 restrictions, documentation, xsd_type_obj, enumerations):
-        self.name = name
-        self.qname = qname
-        self.path = path
-        self.xsd_type = xsd_type
-        self.is_required = is_required
-        self.is_list = is_list
-        self.restrictions = restrictions
-        self.documentation = documentation
-        self.xsd_type_obj = xsd_type_obj
-        self.enumerations = enumerations
-
-FormSection = namedtuple('FormSection', [
-    'name', 'qname', 'path', 'min_occurs', 'max_occurs', 'fields', 'sub_sections'
-])
-
 class XsdParser:
-    def __init__(self, xsd_path: str):
-        self.schema: Optional[xmlschema.XMLSchema] = None
+    def __init__(self, xsd_path: str, schema: Optional[xmlschema.XMLSchema] = None,
+                 schema_loader: Optional[Callable[[], xmlschema.XMLSchema]] = None):
+        """
+        Args:
+            xsd_path: Ścieżka do głównego pliku XSD.
+            schema: Gotowy obiekt schematu (pomija ładowanie).
+            schema_loader: Funkcja ładująca schemat przy pierwszym dostępie do `schema`.
+        """
+        self.xsd_path = str(xsd_path)
+        self._schema: Optional[xmlschema.XMLSchema] = schema
+        self._schema_loader = schema_loader or (lambda: schema_cache.load(self.xsd_path))
+        self._schema_lock = threading.Lock()
+        self._artifact: Optional[Dict[str, Any]] = None
+        self._artifact_key: Optional[str] = None
+        self._type_index: Dict[str, Any] = {}
+        self._indexed_roots = set()
+        self._root_sections: Dict[str, FormSection] = {}
+        self._bindings: Dict[str, XmlBindings] = {}
+
+    @property
+    def schema(self) -> xmlschema.XMLSchema:
+        """Schemat xmlschema ładowany leniwie (z cache) przy pierwszym użyciu."""
+        if self._schema is None:
+            with self._schema_lock:
+                if self._schema is None:
+                    self._schema = self._load_schema()
+        return self._schema
+
+    @property
+    def is_schema_loaded(self) -> bool:
+        return self._schema is not None
+
+    def _load_schema(self) -> xmlschema.XMLSchema:
         try:
-            self.schema = xmlschema.XMLSchema(xsd_path, base_url=xsd_path)
-            log.info(f"Schemat XSD '{xsd_path}' załadowany pomyślnie.")
-            log.info(f"Schemat załadowany. Target Namespace: '{self.schema.target_namespace}'")
-            if not self.schema.is_valid:
+            schema = self._schema_loader()
+            log.info(f"Schemat XSD '{self.xsd_path}' załadowany pomyślnie.")
+            log.info(f"Schemat załadowany. Target Namespace: '{schema.target_namespace}'")
+            if not schema.is_valid:
                 raise xmlschema.XMLSchemaParseError("Schemat zawiera błędy lub brakujące importy.")
+            return schema
         except xmlschema.XMLSchemaParseError as e:
             log.error(f"Błąd parsowania schematu XSD: {e}")
             raise ValueError(f"Nie udało się załadować schematu XSD z powodu błędów: {e}") from e
         except Exception as e:
-            log.critical(f"Krytyczny błąd podczas ładowania schematu XSD: {xsd_path}", exc_info=True)
+            log.critical(f"Krytyczny błąd podczas ładowania schematu XSD: {self.xsd_path}", exc_info=True)
             raise ValueError(f"Nie udało się załadować schematu XSD: {e}") from e
 
+    def get_root_element_name(self) -> str:
+        """Zwraca nazwę pierwszego elementu globalnego (z artefaktu, jeśli istnieje)."""
+        artifact = self._get_artifact()
+        if artifact.get("elements"):
+            return artifact["elements"][0]
+        return list(self.schema.elements.keys())[0]
+
     def get_form_structure_for_element(self, element_name: str) -> List[FormSection]:
+        artifact = self._get_artifact()
+        cached_root = artifact.get("roots", {}).get(element_name)
+        if cached_root is not None:
+            log.info(f"Struktura formularza dla '{element_name}' wczytana z artefaktu (bez parsowania schematu).")
+            root_section_node = deserialize_structure(
+                cached_root, artifact["strings"], FormSection, FormField, self.resolve_field_type
+            )
+            self._root_sections[element_name] = root_section_node
+            return root_section_node.sub_sections
+
         if not self.schema: raise ValueError("Schemat XSD nie załadowany.")
         if element_name not in self.schema.elements: raise KeyError(f"Element '{element_name}' nie istnieje w schemacie.")
 
@@ -50,11 +87,61 @@ class XsdParser:
         log.info(f"Rozpoczynanie parsowania struktury dla elementu głównego: '{element_name}'")
         
         root_section_node = self._build_section_tree_recursive(root_element, path_prefix="")
+        self._indexed_roots.add(element_name)
+        self._root_sections[element_name] = root_section_node
+        self._store_artifact(element_name, root_section_node)
         
         log.info(f"Zakończono parsowanie struktury dla '{element_name}'.")
         
         return root_section_node.sub_sections if root_section_node else []
 
+    def get_xml_bindings(self, element_name: str) -> XmlBindings:
+        """
+        Zwraca (budowane raz i przechowywane w parserze) powiązania QName/przestrzeni nazw
+        dla XmlBuilder. Przestrzenie nazw pochodzą z artefaktu, więc schemat nie musi być ładowany.
+        """
+        bindings = self._bindings.get(element_name)
+        if bindings is None:
+            if element_name not in self._root_sections:
+                self.get_form_structure_for_element(element_name)
+            namespaces = self._get_artifact().get("namespaces")
+            if namespaces is None:
+                namespaces = dict(self.schema.namespaces)
+            bindings = XmlBindings.from_structure(self._root_sections[element_name], namespaces)
+            self._bindings[element_name] = bindings
+            log.debug(f"Zbudowano powiązania XML dla '{element_name}' ({len(bindings.qnames)} ścieżek).")
+        return bindings
+
+    def resolve_field_type(self, field_path: str):
+        """Zwraca obiekt typu xmlschema dla ścieżki pola, indeksując drzewo schematu przy pierwszym użyciu."""
+        root_name = field_path.split('.', 1)[0]
+        if root_name not in self._indexed_roots and root_name in self.schema.elements:
+            log.debug(f"Leniwe indeksowanie typów XSD dla elementu '{root_name}'.")
+            self._build_section_tree_recursive(self.schema.elements[root_name], path_prefix="")
+            self._indexed_roots.add(root_name)
+        return self._type_index.get(field_path)
+
+    def _get_artifact(self) -> Dict[str, Any]:
+        if self._artifact is None:
+            source = Path(self.xsd_path).resolve()
+            fingerprint = schema_cache.fingerprint([source])
+            self._artifact_key = f"{source.stem}-{fingerprint[:20]}"
+            self._artifact = form_structure_store.load(self._artifact_key) or {}
+        return self._artifact
+
+    def _store_artifact(self, element_name: str, root_section_node: FormSection) -> None:
+        artifact = self._get_artifact()
+        strings = StringTable(artifact.get("strings"))
+        roots = artifact.get("roots", {})
+        roots[element_name] = serialize_structure(root_section_node, strings)
+        artifact.update({
+            "elements": list(self.schema.elements.keys()),
+            "namespaces": dict(self.schema.namespaces),
+            "strings": strings.strings,
+            "roots": roots,
+        })
+        form_structure_store.save(self._artifact_key, artifact)
+
     # --- POCZĄTEK OSTATECZNEJ POPRAWKI: Przepisanie logiki parsera ---
     def _build_section_tree_recursive(self, element: xmlschema.XsdElement, path_prefix: str) -> FormSection:
         """
@@ -96,20 +183,21 @@ class XsdParser:
         restrictions, enums = {}, []
 
         if hasattr(xsd_type, 'enumeration') and xsd_type.enumeration is not None:
-            enums = list(xsd_type.enumeration)
+            enums = [str(v) for v in xsd_type.enumeration]
             
         if hasattr(xsd_type, 'facets'):
             for name, facet in xsd_type.facets.items():
                 if name is None or facet is None: continue
                 simple_name = name.split('}')[-1]
                 
+                # Wartości są normalizowane do typów JSON, aby struktura była serializowalna.
                 if simple_name == 'pattern':
                     if hasattr(facet, 'patterns') and isinstance(facet.patterns, list) and facet.patterns:
-                        restrictions[simple_name] = facet.patterns[0]
+                        restrictions[simple_name] = facet.patterns[0].pattern
                 else:
                     value = getattr(facet, 'value', None)
                     if value is not None:
-                        restrictions[simple_name] = value
+                        restrictions[simple_name] = value if isinstance(value, (bool, int)) else str(value)
                         
         return restrictions, enums
 
@@ -121,6 +209,7 @@ class XsdParser:
         doc = element.annotation.documentation[0].text.strip() if element.annotation and element.annotation.documentation else ""
         
         log.debug(f" [FIELD CREATED] Tworzenie pola dla elementu: path='{full_field_path}', type='{element.type.local_name}', qname='{element.name}', required={is_required}")
+        self._type_index[full_field_path] = element.type
         
         return FormField(
             name=element.local_name,
@@ -132,7 +221,9 @@ class XsdParser:
             restrictions=restrictions,
             documentation=doc,
             xsd_type_obj=element.type,
-            enumerations=enums
+            enumerations=enums,
+            xsd_base_type=self._base_type_name(element.type),
+            validation=build_validation_spec(element.type)
         )
 
     def _create_form_field_from_attribute(self, attribute: xmlschema.XsdAttribute, parent_section_path: str) -> FormField:
@@ -142,6 +233,7 @@ class XsdParser:
         doc = attribute.annotation.documentation[0].text.strip() if attribute.annotation and attribute.annotation.documentation else ""
 
         log.debug(f" [FIELD CREATED] Tworzenie pola dla atrybutu: path='{full_field_path}', type='{attribute.type.local_name}', qname='{attribute.name}', required={is_required}")
+        self._type_index[full_field_path] = attribute.type
 
         return FormField(
             name=attribute.local_name,
@@ -153,5 +245,12 @@ class XsdParser:
             restrictions=restrictions,
             documentation=doc,
             xsd_type_obj=attribute.type,
-            enumerations=enums
-        )
\ No newline at end of file
+            enumerations=enums,
+            xsd_base_type=self._base_type_name(attribute.type),
+            validation=build_validation_spec(attribute.type)
+        )
+
+    @staticmethod
+    def _base_type_name(xsd_type: xmlschema.XsdType) -> str:
+        base_type = getattr(xsd_type, 'base_type', None)
+        return (base_type.local_name or "") if base_type is not None else ""
\ No newline at end of file